@@ -224,10 +224,9 @@ def update_metadata_expiration_date(
         if update_timestamp_expiration_date:
             auth_repo.add_to_open_metadata([Timestamp.type])
 
-        for role in roles:
-            auth_repo.set_metadata_expiration_date(
-                role, start_date=start_date, interval=interval
-            )
+        auth_repo.set_metadata_expiration_dates(
+            roles, start_date=start_date, interval=interval
+        )
 
         auth_repo.remove_from_open_metadata([Snapshot.type])
         # it is important to update snapshot first
@@ -361,7 +361,7 @@ def _perform_checks(
         auth_repo.reset_to_commit(auth_commit, hard=True)
     # Fail early if commit is not on the default branch:
     default_branch = auth_repo.get_default_branch()
-    if auth_commit not in auth_repo.all_commits_on_branch(default_branch):
+    if auth_commit not in auth_repo.iter_commits(default_branch):
         raise ResetFailedError(
             f"Auth repo commit {auth_commit.hash} not found on branch ({default_branch})."
         )
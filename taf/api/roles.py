@@ -908,13 +908,9 @@ def _format_role_keys_block(role_label: str, key_ids: List[str], certs_dir: str)
 
 
 def _roles_for_keys(auth_repo: AuthenticationRepository) -> Dict[str, set]:
-    roles_for_key: Dict[str, set] = defaultdict(set)
-    for role_name in auth_repo.get_all_roles():
-        role_key_ids = auth_repo.get_role_keys(role=role_name)
-        if role_key_ids:
-            for key_id in role_key_ids:
-                roles_for_key[key_id].add(role_name)
-    return roles_for_key
+    return {
+        key_id: set(roles) for key_id, roles in auth_repo.get_roles_of_keys().items()
+    }
 
 
 @log_on_error(
@@ -313,12 +313,11 @@ def list_targets(
                     last_signed_commit = branch_data[0]["commit"]
                     if branch in repo.branches_containing_commit(last_signed_commit):
                         branch_top_commit = repo.top_commit_of_branch(branch)
-                        unsigned_commits = repo.all_commits_since_commit(
-                            last_signed_commit, branch
+                        unsigned_commits = repo.iter_commits(
+                            branch, since_commit=last_signed_commit
                         )
-                        if (
-                            len(unsigned_commits)
-                            and branch_top_commit in unsigned_commits
+                        if branch_top_commit is not None and any(
+                            commit == branch_top_commit for commit in unsigned_commits
                         ):
                             repo_output["unsigned"].append(branch)
             repo_output["something-to-commit"] = repo.something_to_commit()
@@ -421,12 +420,15 @@ def register_target_files(
         no_commit_warning=no_commit_warning,
         paths_to_reset_on_error=paths_to_reset,
     ):
-        for role, targets in roles_and_targets.items():
-            auth_repo.update_target_role(role, targets)
-        if force_update_of_roles:
-            for role in force_update_of_roles:
-                if role not in roles_and_targets:
-                    auth_repo.update_target_role(role, None, True)
+        # sign each modified role once
+        with auth_repo.targets_edit_session() as session:
+            for target_path in added_targets_data:
+                session.add_target(target_path)
+            for target_path in removed_targets_data:
+                session.remove_target(target_path)
+            if force_update_of_roles:
+                for role in force_update_of_roles:
+                    session.update_role(role)
 
         if update_snapshot_and_timestamp:
             auth_repo.update_snapshot_and_timestamp()
@@ -734,3 +736,48 @@ def _update_target_repos(
         path = targets_dir / target_repo_name
         path.write_text(json.dumps(data, indent=4))
         taf_logger.log("NOTICE", f"Updated {path}")
+
+
+@log_on_start(DEBUG, "Verifying target hashes cache", logger=taf_logger)
+@log_on_end(DEBUG, "Finished verifying target hashes cache", logger=taf_logger)
+@log_on_error(
+    ERROR,
+    "An error occurred while verifying target hashes cache: {e}",
+    logger=taf_logger,
+    on_exceptions=TAFError,
+    reraise=True,
+)
+def verify_target_hashes_cache(
+    path: Union[Path, str], rebuild: Optional[bool] = False
+) -> List[str]:
+    """
+    Check that lengths and hashes of target files stored in the target hashes cache
+    are correct. Files modified since they were cached are hashed again when needed
+    and are not checked.
+
+    Arguments:
+        path: Authentication repository's path.
+        rebuild (optional): Delete the cache and hash all target files again.
+
+    Side Effects:
+       Deletes entries of invalid files from the cache or, if rebuild is True,
+       recreates the whole cache.
+
+    Returns:
+        Target paths, relative to the targets directory, whose cached data was not correct
+    """
+    auth_repo = AuthenticationRepository(path=path)
+    target_hashes_cache = auth_repo.target_hashes_cache
+    invalid_target_files = target_hashes_cache.verify()
+    for target_file in invalid_target_files:
+        taf_logger.warning(f"Cached hashes of {target_file} are not correct")
+
+    if rebuild:
+        target_hashes_cache.clear()
+        for target_file in auth_repo.all_target_files():
+            target_hashes_cache.get_file_details(target_file)
+        taf_logger.log("NOTICE", "Rebuilt target hashes cache")
+    else:
+        target_hashes_cache.forget(invalid_target_files)
+    target_hashes_cache.save()
+    return invalid_target_files
@@ -1,5 +1,4 @@
 import json
-import os
 import fnmatch
 import pygit2
 
@@ -125,15 +124,27 @@ class AuthenticationRepository(GitRepository):
         configuration files. That is, the last validated commit.
         Create the directory if it does not exist.
         """
-        # the repository's name consists of the namespace and name (namespace/name)
-        # the configuration directory should be _name
         if self._conf_dir is None:
-            last_dir = os.path.basename(os.path.normpath(self.path))
-            conf_path = self.conf_directory_root / f"_{last_dir}"
+            conf_path = self.get_conf_dir_path(self.path, self.conf_directory_root)
             conf_path.mkdir(parents=True, exist_ok=True)
             self._conf_dir = str(conf_path)
         return self._conf_dir
 
+    @staticmethod
+    def get_conf_dir_path(
+        path: Union[Path, str], conf_directory_root: Optional[Union[Path, str]] = None
+    ) -> Path:
+        """
+        Returns location of the configuration directory of the authentication
+        repository at the given path (see conf_dir) without creating it
+        """
+        path = Path(path).expanduser().resolve()
+        if conf_directory_root is None:
+            conf_directory_root = path.parent
+        # the repository's name consists of the namespace and name (namespace/name)
+        # the configuration directory should be _name
+        return Path(conf_directory_root).resolve() / f"_{path.name}"
+
     @property
     def certs_dir(self):
         certs_dir = self.path / "certs"
@@ -306,9 +317,13 @@ class AuthenticationRepository(GitRepository):
                 "Getting role repositories from a bare repository is not yet supported."
             )
 
-        role_paths = self._tuf_repository.get_role_paths(role)
-
         target_repositories = self._get_target_repositories_from_disk()
+        if self._tuf_repository.get_hash_bins_name(role) is not None:
+            # bins have no paths, repositories are assigned to them by hashes
+            signing_roles = self._tuf_repository.map_signing_roles(target_repositories)
+            return [repo for repo in target_repositories if signing_roles[repo] == role]
+
+        role_paths = self._tuf_repository.get_role_paths(role)
         return [
             repo
             for repo in target_repositories
@@ -317,7 +332,7 @@ class AuthenticationRepository(GitRepository):
 
     def is_commit_authenticated(self, target_name: str, commit: Commitish) -> bool:
         """Checks if passed commit is ever authenticated for given target name."""
-        for auth_commit in self.all_commits_on_branch(reverse=False):
+        for auth_commit in self.iter_commits():
             target = self.get_target(target_name, auth_commit)
             if target is None:
                 continue
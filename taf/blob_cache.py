@@ -0,0 +1,120 @@
+"""Bounded, thread-safe cache of git blob contents.
+
+Blobs are content-addressed, so a blob id always maps to the same bytes and
+cached entries never need to be invalidated - only evicted. A single cache is
+shared by all ``PyGitRepository`` instances of a process (including those used
+by the updater's worker threads), so it has to be both thread-safe and bounded:
+long-running update workers validate thousands of auth repo commits and would
+otherwise keep every metadata file ever read in memory.
+
+Only the raw bytes of a blob are stored. The decoded string is produced on
+demand, so a blob read both as ``raw`` and as text is stored once.
+"""
+
+from collections import OrderedDict
+import threading
+from typing import Dict, Optional
+
+import taf.settings as settings
+
+
+class BlobCache:
+    """
+    Least recently used blob cache with a byte budget.
+
+    The budget is measured in stored bytes. Entries are evicted, least
+    recently used first, until the new entry fits. A blob larger than the
+    whole budget is never stored. Set ``max_bytes`` to 0 to disable caching.
+
+    Subclasses can override ``get`` and ``put`` to implement a different
+    eviction policy and be installed using ``set_blob_cache``.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = settings.BLOB_CACHE_MAX_BYTES
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, git_id: str) -> bool:
+        with self._lock:
+            return git_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Number of bytes currently stored"""
+        return self._size
+
+    def get(self, git_id: str) -> Optional[bytes]:
+        """Return the raw content of the blob or None if it is not cached"""
+        with self._lock:
+            content = self._entries.get(git_id)
+            if content is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(git_id)
+            self.hits += 1
+            return content
+
+    def put(self, git_id: str, content: bytes) -> None:
+        """Store the raw content of a blob, evicting old entries if needed"""
+        length = len(content)
+        if length > self.max_bytes:
+            return
+        with self._lock:
+            if git_id in self._entries:
+                self._entries.move_to_end(git_id)
+                return
+            while self._entries and self._size + length > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+            self._entries[git_id] = content
+            self._size += length
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are not reset."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters and the current usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_blob_cache = BlobCache()
+
+
+def get_blob_cache() -> BlobCache:
+    """Return the process-wide blob cache"""
+    return _blob_cache
+
+
+def set_blob_cache(cache: BlobCache) -> BlobCache:
+    """Replace the process-wide blob cache and return the previous one"""
+    global _blob_cache
+    previous = _blob_cache
+    _blob_cache = cache
+    return previous
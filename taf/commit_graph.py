@@ -0,0 +1,166 @@
+"""In-memory commit graph index of a repository.
+
+Finding branches which contain a commit (``git branch --contains``) or checking
+if a commit is an ancestor of another one walks the history every time it is
+done. The updater does this repeatedly for the same repositories, which is slow
+for histories with many commits. ``CommitGraph`` assigns a sequential index and
+a generation number to every commit reachable from a branch and stores, for
+each branch tip, a bitmap of all commits reachable from it. Once built,
+containment queries are a single bit test per branch and ancestor queries
+between commits of different generations are rejected without walking the
+history. When a branch moves, only the commits which were not reachable from an
+already indexed tip are walked.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pygit2
+
+_BRANCH_PREFIXES = {"refs/heads/": False, "refs/remotes/": True}
+
+
+class CommitGraph:
+    def __init__(
+        self,
+        repo: pygit2.Repository,
+        get_refs: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        get_refs returns the repository's current ``RefSnapshot``. If it is
+        specified, branch tips are read from it instead of the references.
+        """
+        self._repo = repo
+        self._get_refs = get_refs
+        # snapshot the branch tips were last read from
+        self._refs = None
+        self._lock = threading.Lock()
+        # commit id -> position of the commit's bit in reachability bitmaps
+        self._indexes: Dict[pygit2.Oid, int] = {}
+        # generation number of each indexed commit: 1 for root commits,
+        # otherwise one more than the largest generation of its parents
+        self._generations: List[int] = []
+        # tip commit id -> bitmap of all commits reachable from that tip
+        self._tip_bitmaps: Dict[pygit2.Oid, int] = {}
+        # (branch name, is remote) -> tip commit id
+        self._branch_tips: Dict[Tuple[str, bool], pygit2.Oid] = {}
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def _read_branch_tips(self, refs=None) -> Dict[Tuple[str, bool], pygit2.Oid]:
+        tips = {}
+        if refs is not None:
+            for branch, target in refs.branch_tips().items():
+                target = pygit2.Oid(hex=target)
+                if isinstance(self._repo.get(target), pygit2.Commit):
+                    tips[branch] = target
+            return tips
+        for ref_name in self._repo.references:
+            for prefix, is_remote in _BRANCH_PREFIXES.items():
+                if not ref_name.startswith(prefix):
+                    continue
+                try:
+                    target = self._repo.references[ref_name].resolve().target
+                except (KeyError, pygit2.GitError):
+                    break
+                if isinstance(self._repo.get(target), pygit2.Commit):
+                    tips[(ref_name[len(prefix) :], is_remote)] = target
+                break
+        return tips
+
+    def refresh(self) -> None:
+        """
+        Index commits of branches which were created or moved since the last
+        refresh. Commits which were already indexed are not walked again.
+        """
+        refs = self._get_refs() if self._get_refs is not None else None
+        with self._lock:
+            if refs is not None and refs is self._refs:
+                return
+            tips = self._read_branch_tips(refs)
+            if tips != self._branch_tips:
+                for tip in tips.values():
+                    if tip not in self._tip_bitmaps:
+                        self._tip_bitmaps[tip] = self._reachable_from(tip)
+                self._branch_tips = tips
+                # forget bitmaps of tips which are no longer referenced by a branch
+                current_tips = set(tips.values())
+                for tip in list(self._tip_bitmaps):
+                    if tip not in current_tips:
+                        del self._tip_bitmaps[tip]
+            self._refs = refs
+
+    def _reachable_from(self, tip: pygit2.Oid) -> int:
+        """
+        Index all commits reachable from tip and return their bitmap.
+        History reachable from already indexed tips is not walked again,
+        their bitmaps are reused instead.
+        """
+        bitmap = 0
+        walker = self._repo.walk(
+            tip, pygit2.GIT_SORT_TOPOLOGICAL | pygit2.GIT_SORT_REVERSE
+        )
+        for indexed_tip, indexed_bitmap in self._tip_bitmaps.items():
+            if indexed_tip == tip or self._repo.descendant_of(tip, indexed_tip):
+                walker.hide(indexed_tip)
+                bitmap |= indexed_bitmap
+        # parents are visited before their children, so their generation
+        # numbers are always known when a commit is indexed
+        for commit in walker:
+            index = self._indexes.get(commit.id)
+            if index is None:
+                index = self._index_commit(commit)
+            bitmap |= 1 << index
+        return bitmap
+
+    def _index_commit(self, commit: pygit2.Commit) -> int:
+        generation = 1
+        for parent_id in commit.parent_ids:
+            parent_index = self._indexes.get(parent_id)
+            # parents of commits at the boundary of a shallow clone are missing
+            if parent_index is not None:
+                generation = max(generation, self._generations[parent_index] + 1)
+        index = len(self._generations)
+        self._indexes[commit.id] = index
+        self._generations.append(generation)
+        return index
+
+    def generation(self, commit_id: pygit2.Oid) -> Optional[int]:
+        """Return generation number of the commit, if it is indexed"""
+        index = self._indexes.get(commit_id)
+        return None if index is None else self._generations[index]
+
+    def branches_containing(self, commit_id: pygit2.Oid) -> Tuple[List[str], List[str]]:
+        """
+        Return names of local and remote branches which contain the commit.
+        """
+        self.refresh()
+        local_branches: List[str] = []
+        remote_branches: List[str] = []
+        index = self._indexes.get(commit_id)
+        if index is None:
+            return local_branches, remote_branches
+        bit = 1 << index
+        for (name, is_remote), tip in self._branch_tips.items():
+            if self._tip_bitmaps[tip] & bit:
+                (remote_branches if is_remote else local_branches).append(name)
+        return local_branches, remote_branches
+
+    def is_ancestor(self, ancestor_id: pygit2.Oid, descendant_id: pygit2.Oid) -> bool:
+        """
+        Check if ancestor_id is reachable from descendant_id. A commit is
+        considered to be an ancestor of itself, as in `git merge-base --is-ancestor`.
+        """
+        if ancestor_id == descendant_id:
+            return True
+        self.refresh()
+        ancestor_generation = self.generation(ancestor_id)
+        descendant_generation = self.generation(descendant_id)
+        if ancestor_generation is not None and descendant_generation is not None:
+            if ancestor_generation >= descendant_generation:
+                return False
+            descendant_bitmap = self._tip_bitmaps.get(descendant_id)
+            if descendant_bitmap is not None:
+                return bool(descendant_bitmap & (1 << self._indexes[ancestor_id]))
+        return self._repo.descendant_of(descendant_id, ancestor_id)
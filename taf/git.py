@@ -29,15 +29,29 @@ from taf.exceptions import (
     UpdateFailedError,
     PygitError,
 )
+from taf.git_cat_file import GitCatFile
 from taf.log import NOTICE, taf_logger
 from taf.utils import format_command_args, run
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 _PyGitRepositoryClass: Any = None
 
 try:
     import pygit2
     from .pygit import PyGitRepository as _PyGitRepositoryClass
+    from .ref_snapshot import RefSnapshot, get_ref_cache, invalidate_ref_cache
 
     PYGIT2_AVAILABLE = True
 except ImportError:
@@ -46,6 +60,33 @@ except ImportError:
 
 EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
 
+# number of files read using a single pipelined git cat-file request
+# when iterating over files without pygit2
+_ITER_FILES_BATCH_SIZE = 100
+
+# git commands which never move references, so running them does not
+# invalidate the repository's reference snapshot
+_READ_ONLY_GIT_COMMANDS = frozenset(
+    (
+        "--no-pager",
+        "add",
+        "cat-file",
+        "clean",
+        "diff",
+        "for-each-ref",
+        "log",
+        "ls-files",
+        "ls-remote",
+        "ls-tree",
+        "merge-base",
+        "rev-list",
+        "rev-parse",
+        "rm",
+        "show",
+        "status",
+    )
+)
+
 # Per-process cache for default branch detection.
 # A repository's default branch never changes during a single run.
 _default_branch_cache: Dict[str, Optional[str]] = {}
@@ -147,6 +188,16 @@ class GitRepository:
                 raise PygitError(error_message)
         return self._pygit
 
+    _cat_file = None
+
+    @property
+    def cat_file(self) -> GitCatFile:
+        """Persistent ``git cat-file`` processes used when objects cannot be
+        read through pygit2. Stopped by ``cleanup``."""
+        if self._cat_file is None:
+            self._cat_file = GitCatFile(self)
+        return self._cat_file
+
     @classmethod
     def from_json_dict(cls, json_data: Dict):
         """Create a new instance based on data contained by the `json_data` dictionary,
@@ -272,6 +323,19 @@ class GitRepository:
             raise PygitError("Failed to instantiate PyGitRepository")
         return self.pygit.repo
 
+    @property
+    def ref_snapshot(self) -> RefSnapshot:
+        """Snapshot of the repository's references, shared by all instances of
+        the repository and reloaded only when references change"""
+        return self.pygit.refs.snapshot(lambda: self.pygit_repo)
+
+    def _invalidate_refs(self) -> None:
+        """Make the next reference query reload the reference snapshot"""
+        if self._pygit is not None:
+            self._pygit.refs.invalidate()
+        elif PYGIT2_AVAILABLE:
+            invalidate_ref_cache(str(self.path))
+
     @property
     def is_bare_repository(self) -> bool:
         if self._is_bare_repo is None:
@@ -298,37 +362,42 @@ class GitRepository:
             command += ["-c", f"safe.directory={self.path}"]
         command += format_command_args(cmd, *args)
         result = None
-        if log_error or log_error_msg:
-            try:
-                result = run(*command, **kwargs)
+        try:
+            if log_error or log_error_msg:
+                try:
+                    result = run(*command, **kwargs)
+                    if log_success_msg:
+                        self._log_debug(log_success_msg)
+                except subprocess.CalledProcessError as e:
+                    if error_if_not_exists and (
+                        not self.path.is_dir() or not self.is_git_repository
+                    ):
+                        log_error_msg = (
+                            f"{self.path} does not exist or is not a git repository"
+                        )
+                        reraise_error = True
+                    if log_error_msg:
+                        error = GitError(self, message=log_error_msg, error=e)
+                        self._log_error(error.message)
+                    else:
+                        error = GitError(self, command=" ".join(command), error=e)
+                        # not every git error indicates a problem
+                        # if it does, we expect that either custom error message will be provided
+                        # or that the error will be reraised
+                        self._log_debug(error.message)
+                    if reraise_error:
+                        raise error
+            else:
+                try:
+                    result = run(*command, **kwargs)
+                except subprocess.CalledProcessError as e:
+                    raise GitError(self, command=" ".join(command), error=e)
                 if log_success_msg:
                     self._log_debug(log_success_msg)
-            except subprocess.CalledProcessError as e:
-                if error_if_not_exists and (
-                    not self.path.is_dir() or not self.is_git_repository
-                ):
-                    log_error_msg = (
-                        f"{self.path} does not exist or is not a git repository"
-                    )
-                    reraise_error = True
-                if log_error_msg:
-                    error = GitError(self, message=log_error_msg, error=e)
-                    self._log_error(error.message)
-                else:
-                    error = GitError(self, command=" ".join(command), error=e)
-                    # not every git error indicates a problem
-                    # if it does, we expect that either custom error message will be provided
-                    # or that the error will be reraised
-                    self._log_debug(error.message)
-                if reraise_error:
-                    raise error
-        else:
-            try:
-                result = run(*command, **kwargs)
-            except subprocess.CalledProcessError as e:
-                raise GitError(self, command=" ".join(command), error=e)
-            if log_success_msg:
-                self._log_debug(log_success_msg)
+        finally:
+            if cmd.split(" ", 1)[0] not in _READ_ONLY_GIT_COMMANDS:
+                # the command might have moved a reference
+                self._invalidate_refs()
         return result
 
     def _get_default_branch_from_local(self) -> str:
@@ -412,11 +481,16 @@ class GitRepository:
             ):
                 # discovered a different (e.g. parent) repository
                 return None
-            repo = pygit2.Repository(discovered)
-            ref = repo.references.get(ref_name)
-            if ref is None or ref.type != pygit2.GIT_REF_SYMBOLIC:
+            # read from the reference snapshot shared with GitRepository
+            # instances of this repository, the throwaway repository is only
+            # opened if the snapshot needs to be (re)loaded
+            refs = get_ref_cache(discovered).snapshot(
+                lambda: pygit2.Repository(discovered)
+            )
+            # e.g. "refs/remotes/origin/main" or "refs/heads/main"
+            target = refs.symbolic_refs.get(ref_name)
+            if target is None:
                 return None
-            target = ref.target  # e.g. "refs/remotes/origin/main" or "refs/heads/main"
             for prefix in ("refs/remotes/origin/", "refs/heads/"):
                 if target.startswith(prefix):
                     return target[len(prefix) :]
@@ -461,11 +535,9 @@ class GitRepository:
     def _log_critical(self, message: str) -> None:
         self._log(self.logging_functions[logging.CRITICAL], message)
 
-    def all_commits_on_branch(
-        self, branch: Optional[str] = None, reverse: Optional[bool] = True
-    ) -> List[Commitish]:
-        """Returns a list of all commits on the specified branch.
-        If branch is None, all commits on the currently checked out branch will be returned
+    def _get_commits_walk_start(self, branch: Optional[str] = None) -> pygit2.Oid:
+        """Returns id of the top commit of the specified branch, or of the
+        currently checked out branch if branch is None
         """
         repo = self.pygit_repo
 
@@ -476,20 +548,96 @@ class GitRepository:
                     self,
                     message=f"Error occurred while getting commits of branch {branch}. Branch does not exist",
                 )
-            latest_commit_id = branch_obj.target
-        else:
-            if self.head_commit() is None:
+            return branch_obj.target
+        if self.head_commit() is None:
+            raise GitError(
+                self,
+                message=f"Error occurred while getting commits of branch {branch}. No HEAD reference",
+            )
+        return repo[repo.head.target].id
+
+    def iter_commits(
+        self,
+        branch: Optional[str] = None,
+        since_commit: Optional[Commitish] = None,
+        reverse: Optional[bool] = False,
+    ) -> Iterator[Commitish]:
+        """Lazily iterates over commits of the specified or currently checked out
+        branch, newest first, or oldest first if reverse is True. If since_commit is
+        specified, only commits newer than it are returned.
+        Commits are read while iterating, so stopping early (e.g. when searching for
+        a commit) does not walk the rest of the history.
+
+        Raises:
+            exceptions.GitError: The branch or since_commit do not exist
+        """
+        return map(
+            Commitish.from_hash,
+            self.iter_commit_hashes(branch, since_commit, reverse),
+        )
+
+    def iter_commit_hashes(
+        self,
+        branch: Optional[str] = None,
+        since_commit: Optional[Commitish] = None,
+        reverse: Optional[bool] = False,
+    ) -> Iterator[str]:
+        """Same as iter_commits, but returns commit hashes instead of
+        Commitish objects
+
+        Raises:
+            exceptions.GitError: The branch or since_commit do not exist
+        """
+        since_commit_id = None
+        if since_commit is not None:
+            if not self.commit_exists(commit=since_commit):
                 raise GitError(
-                    self,
-                    message=f"Error occurred while getting commits of branch {branch}. No HEAD reference",
+                    repo=self,
+                    message=f"Commit {since_commit.hash} not found in local repository.",
                 )
-            latest_commit_id = repo[repo.head.target].id
+            since_commit_id = self.pygit_repo.get(since_commit.hash).id
+        start_commit_id = self._get_commits_walk_start(branch)
+        return self._iter_commit_hashes(start_commit_id, since_commit_id, bool(reverse))
+
+    def _iter_commit_hashes(
+        self,
+        start_commit_id: pygit2.Oid,
+        since_commit_id: Optional[pygit2.Oid],
+        reverse: bool,
+    ) -> Iterator[str]:
+        repo = self.pygit_repo
 
+        if since_commit_id is not None:
+            if repo.descendant_of(since_commit_id, start_commit_id):
+                return
+            if reverse and not (
+                since_commit_id == start_commit_id
+                or repo.descendant_of(start_commit_id, since_commit_id)
+            ):
+                # since_commit is not on the branch, so all of its commits are newer
+                since_commit_id = None
+
+        # when walking in reverse, commits older than since_commit come first
+        # and are skipped, otherwise the walk stops once since_commit is reached
+        skip = reverse and since_commit_id is not None
         sort = pygit2.GIT_SORT_REVERSE if reverse else pygit2.GIT_SORT_NONE
-        commits = [
-            Commitish.from_hash(commit.id.hex)
-            for commit in repo.walk(latest_commit_id, sort)
-        ]
+        for commit in repo.walk(start_commit_id, sort):
+            if commit.id == since_commit_id:
+                if not reverse:
+                    return
+                skip = False
+                continue
+            if skip:
+                continue
+            yield str(commit.id)
+
+    def all_commits_on_branch(
+        self, branch: Optional[str] = None, reverse: Optional[bool] = True
+    ) -> List[Commitish]:
+        """Returns a list of all commits on the specified branch.
+        If branch is None, all commits on the currently checked out branch will be returned
+        """
+        commits = list(self.iter_commits(branch=branch, reverse=reverse))
         self._log_debug(
             f"found the following commits: {', '.join([commit.value for commit in commits])}"
         )
@@ -524,30 +672,19 @@ class GitRepository:
                 message=f"Commit {since_commit.hash} not found in local repository.",
             )
 
-        repo = self.pygit_repo
-
-        if branch:
-            branch_obj = repo.branches.get(branch)
-            if branch_obj is None:
-                return []
-            latest_commit_id = branch_obj.target
-        else:
-            if self.head_commit() is None:
-                return []
-            latest_commit_id = repo[repo.head.target].id
-
-        if repo.descendant_of(since_commit.hash, latest_commit_id):
+        try:
+            start_commit_id = self._get_commits_walk_start(branch)
+        except GitError:
             return []
 
-        commits: List[Commitish] = []
-        for commit in repo.walk(latest_commit_id):
-            commit = Commitish.from_hash(commit.id.hex)
-            if commit == since_commit:
-                break
-            commits.insert(0, commit)
-
-        if not reverse:
-            commits = commits[::-1]
+        commits = [
+            Commitish.from_hash(commit_hash)
+            for commit_hash in self._iter_commit_hashes(
+                start_commit_id,
+                self.pygit_repo.get(since_commit.hash).id,
+                bool(reverse),
+            )
+        ]
         self._log_debug(
             f"found the following commits: {', '.join([commit.value for commit in commits])}"
         )
@@ -574,14 +711,14 @@ class GitRepository:
         self, remote: bool = False, all: bool = False, strip_remote: bool = False
     ) -> List[str]:
         """Returns all branches."""
-        repo = self.pygit_repo
+        refs = self.ref_snapshot
 
         if all:
-            branches = set(repo.branches)
+            branches = set(refs.local_branches) | set(refs.remote_branches)
         elif remote:
-            branches = set(repo.branches.remote)
+            branches = set(refs.remote_branches)
         else:
-            branches = set(repo.branches.local)
+            branches = set(refs.local_branches)
 
         if strip_remote:
             remotes = self.remotes
@@ -600,17 +737,20 @@ class GitRepository:
         strip_remote: Optional[bool] = False,
         sort_key: Optional[Callable] = None,
     ) -> OrderedDict:
-        """Finds all branches that contain the given commit"""
-        repo = self.pygit_repo
-
-        local_branches = remote_branches = []
-        try:
-            local_branches = list(repo.branches.local.with_commit(commit.hash))
-        except pygit2.GitError:
-            pass
+        """Finds all branches that contain the given commit.
+        Uses the repository's commit graph index, so the history is only
+        walked the first time and when branches are created or moved.
+        """
+        local_branches: List[str] = []
+        remote_branches: List[str] = []
         try:
-            remote_branches = list(repo.branches.remote.with_commit(commit.hash))
-        except pygit2.GitError:
+            commit_obj = self.pygit_repo.get(commit.hash)
+            if isinstance(commit_obj, pygit2.Commit):
+                (
+                    local_branches,
+                    remote_branches,
+                ) = self.pygit.commit_graph.branches_containing(commit_obj.id)
+        except (ValueError, pygit2.GitError):
             pass
         filtered_remote_branches = []
         if len(remote_branches):
@@ -621,9 +761,9 @@ class GitRepository:
                     and "HEAD" not in local_name
                     and local_name not in local_branches
                 ):
-                    if strip_remote:
-                        branch = self.branch_local_name(branch)
-                    filtered_remote_branches.append(branch)
+                    filtered_remote_branches.append(
+                        local_name if strip_remote else branch
+                    )
         branches = {branch: False for branch in local_branches}
         branches.update({branch: True for branch in filtered_remote_branches})
         return OrderedDict(sorted(branches.items(), key=sort_key, reverse=True))
@@ -636,18 +776,14 @@ class GitRepository:
         If include_remotes is set to True, this checks if
         a remote branch exists.
         """
-        repo = self.pygit_repo
+        refs = self.ref_snapshot
 
-        branch = repo.branches.get(branch_name)
-        # this git command should return the branch's name if it exists
-        # empty string otherwise
-        if branch is not None:
+        if branch_name in refs.local_branches or branch_name in refs.remote_branches:
             return True
         if include_remotes:
             for remote in self.remotes:
-                remote_branch = repo.branches.remote.get(f"{remote}/{branch_name}")
-                if remote_branch is not None:
-                    return remote_branch
+                if f"{remote}/{branch_name}" in refs.remote_branches:
+                    return True
 
                 # finally, check remote branch
                 if self.has_remote():
@@ -673,6 +809,7 @@ class GitRepository:
             self._log_error(str(e))
             raise
         finally:
+            self._invalidate_refs()
             self._log_info(
                 f"Created a new branch {branch_name} from branching off of {commit}"
             )
@@ -701,6 +838,7 @@ class GitRepository:
             if branch is not None:
                 ref = repo.lookup_reference(branch.name)
                 repo.checkout(ref)
+                self._invalidate_refs()
             else:
                 self._git(
                     "checkout {}",
@@ -793,6 +931,9 @@ class GitRepository:
         if self._pygit is not None:
             self._pygit.cleanup()
             self._pygit = None
+        if self._cat_file is not None:
+            self._cat_file.close()
+            self._cat_file = None
 
     def clean_and_reset(self, excluded_paths=None):
         """Cleans the untracked files and resets the HEAD to the latest commit."""
@@ -1028,6 +1169,7 @@ class GitRepository:
             self._log_error(str(e))
             raise
         finally:
+            self._invalidate_refs()
             self._log_info(f"Created a new branch {branch_name}")
 
     def create_branch(
@@ -1045,6 +1187,7 @@ class GitRepository:
             self._log_error(str(e))
             raise
         finally:
+            self._invalidate_refs()
             self._log_info(f"Created a new branch {branch_name}")
 
     def checkout_commit(self, commit: Commitish) -> None:
@@ -1090,7 +1233,7 @@ class GitRepository:
                 break
 
         return bool(unpushed_commits), [
-            Commitish.from_hash(commit.id) for commit in unpushed_commits
+            Commitish.from_oid(commit.id) for commit in unpushed_commits
         ]
 
     def commit(
@@ -1105,6 +1248,7 @@ class GitRepository:
         except GitError:
             try:
                 run("git", "-C", str(self.path), "commit", "--quiet", "-m", message)
+                self._invalidate_refs()
                 return Commitish.from_hash(self._git("rev-parse HEAD"))
             except subprocess.CalledProcessError as e:
                 raise GitError(
@@ -1124,6 +1268,7 @@ class GitRepository:
             "-m",
             message,
         )
+        self._invalidate_refs()
         return Commitish.from_hash(self._git("rev-parse HEAD"))
 
     def commit_exists(self, commit: Commitish) -> bool:
@@ -1140,10 +1285,14 @@ class GitRepository:
         Check if a specified commit is an ancestor of another commit or branch.
         """
         try:
-            output = self._git(
-                f"merge-base --is-ancestor {commit.hash} {commit_hash_or_branch_name}"
+            repo = self.pygit_repo
+            ancestor = repo.get(commit.hash)
+            descendant = repo.revparse_single(commit_hash_or_branch_name).peel(
+                pygit2.Commit
             )
-            return True if output == "" else False
+            if not isinstance(ancestor, pygit2.Commit):
+                raise GitError(self, message=f"Commit {commit.hash} does not exist")
+            return self.pygit.commit_graph.is_ancestor(ancestor.id, descendant.id)
         except Exception as e:
             print(
                 f"An error occured during ancestor check for commit {commit.hash} and branch/commit {commit_hash_or_branch_name}. Error message: {e}"
@@ -1186,6 +1335,7 @@ class GitRepository:
                 # Create a new local branch from the remote branch
                 target_commit = repo[remote_branch.target]
                 repo.create_branch(branch, target_commit)
+                self._invalidate_refs()
 
     def delete_local_branch(self, branch_name: str) -> None:
         """Deletes local branch."""
@@ -1193,6 +1343,7 @@ class GitRepository:
             repo = self.pygit_repo
 
             repo.branches.delete(branch_name)
+            self._invalidate_refs()
         except KeyError:
             raise GitError(
                 repo=self,
@@ -1258,13 +1409,64 @@ class GitRepository:
             return json.loads(s)
         return None
 
+    @overload
+    def get_file(
+        self,
+        commit: Commitish,
+        path: str,
+        raw: Literal[False] = False,
+        with_id: Literal[False] = False,
+    ) -> str:
+        """Content of the file at the given revision"""
+
+    @overload
+    def get_file(
+        self,
+        commit: Commitish,
+        path: str,
+        raw: Literal[True],
+        with_id: Literal[False] = False,
+    ) -> bytes:
+        """Raw content of the file at the given revision"""
+
+    @overload
+    def get_file(
+        self,
+        commit: Commitish,
+        path: str,
+        raw: Literal[False] = False,
+        *,
+        with_id: Literal[True],
+    ) -> Tuple[str, str]:
+        """Git id and content of the file at the given revision"""
+
+    @overload
+    def get_file(
+        self,
+        commit: Commitish,
+        path: str,
+        raw: Literal[True],
+        with_id: Literal[True],
+    ) -> Tuple[str, bytes]:
+        """Git id and raw content of the file at the given revision"""
+
+    @overload
     def get_file(
         self,
         commit: Commitish,
         path: str,
         raw: Optional[bool] = False,
         with_id: Optional[bool] = False,
-    ) -> Tuple[str, str] | str:
+    ) -> Union[str, bytes, Tuple[str, str], Tuple[str, bytes]]:
+        """Content, optionally raw and along with the git id, of the file"""
+
+    def get_file(
+        self,
+        commit: Commitish,
+        path: str,
+        raw: Optional[bool] = False,
+        with_id: Optional[bool] = False,
+    ) -> Union[str, bytes, Tuple[str, str], Tuple[str, bytes]]:
         path = Path(path).as_posix()
         try:
             git_id, content = self.pygit.get_file(commit, path, raw)
@@ -1274,7 +1476,133 @@ class GitRepository:
         except TAFError as e:
             raise e
         except Exception:
-            return self._git("show {}:{}", commit, path, raw=raw)
+            return self._get_file_with_cat_file(commit, path, raw, with_id)
+
+    def get_file_size(self, commit: Commitish, path: str) -> int:
+        """Return the size in bytes of the file at the given revision.
+        Without pygit2, only the object's header is read.
+        Raises GitError if the file does not exist.
+        """
+        path = Path(path).as_posix()
+        try:
+            return self.pygit.get_file_size(commit, path)
+        except TAFError as e:
+            raise e
+        except Exception:
+            obj = self.cat_file.info(f"{commit.hash}:{path}")
+            if obj is None or obj[1] != "blob":
+                raise GitError(
+                    self, message=f"fatal: Path '{path}' does not exist in '{commit}'"
+                )
+            return obj[2]
+
+    def get_files(
+        self,
+        commit: Commitish,
+        paths: Optional[Iterable[str]] = None,
+        prefix: Optional[str] = None,
+        raw: Optional[bool] = False,
+        parse_json: Optional[bool] = False,
+    ) -> Dict[str, Tuple[str, Any]]:
+        """Read several files at the given revision at once.
+
+        The commit is resolved once and the tree is walked once for all
+        of the specified paths and all files inside the `prefix` directory.
+        Returns a dictionary mapping paths of the files (relative to the
+        repository's root) to tuples containing their blob ids and contents.
+        The contents are bytes if `raw` is True, parsed objects if `parse_json`
+        is True and strings otherwise. Paths which do not exist are omitted.
+        Raises GitError if `prefix` does not exist at the given revision.
+        """
+        posix_paths = [Path(path).as_posix() for path in paths or []]
+        if prefix is not None:
+            posix_prefix = Path(prefix).as_posix()
+            for path in self.list_files_at_revision(commit, posix_prefix):
+                path = Path(path).as_posix()
+                posix_paths.append(
+                    path if posix_prefix == "." else f"{posix_prefix}/{path}"
+                )
+        try:
+            files = self.pygit.get_files(commit, posix_paths)
+        except TAFError as e:
+            raise e
+        except Exception:
+            files = self._get_files_with_cat_file(commit, posix_paths)
+        return {
+            path: (git_id, _format_file_content(content, raw, parse_json))
+            for path, (git_id, content) in files.items()
+        }
+
+    def _get_files_with_cat_file(
+        self, commit: Commitish, paths: List[str]
+    ) -> Dict[str, Tuple[str, bytes]]:
+        objects = self.cat_file.read_many(f"{commit.hash}:{path}" for path in paths)
+        return {
+            path: (obj[0], obj[2])
+            for path, obj in zip(paths, objects)
+            if obj is not None and obj[1] == "blob"
+        }
+
+    def iter_files(
+        self,
+        commit: Commitish,
+        path: str = "",
+        raw: Optional[bool] = False,
+        parse_json: Optional[bool] = False,
+    ) -> Iterator[Tuple[str, str, Any]]:
+        """Streaming variant of `get_files` for very large directories.
+
+        Walks the tree at `path` once and yields the path (relative to the
+        repository's root), blob id and content of each file inside it,
+        reading one file at a time. Contents are formatted as in `get_files`.
+        """
+        posix_path = Path(path).as_posix()
+        prefix = "" if posix_path == "." else f"{posix_path.rstrip('/')}/"
+        yielded = set()
+        try:
+            for file_path, git_id, content in self.pygit.iter_files(commit, posix_path):
+                yielded.add(file_path)
+                yield f"{prefix}{file_path}", git_id, _format_file_content(
+                    content, raw, parse_json
+                )
+        except TAFError as e:
+            raise e
+        except Exception:
+            # continue with the files which were not read before the failure
+            file_paths = [
+                Path(file_path).as_posix()
+                for file_path in self._list_files_at_revision(commit, posix_path)
+            ]
+            file_paths = [
+                file_path for file_path in file_paths if file_path not in yielded
+            ]
+            for start in range(0, len(file_paths), _ITER_FILES_BATCH_SIZE):
+                batch = file_paths[start : start + _ITER_FILES_BATCH_SIZE]
+                files = self._get_files_with_cat_file(
+                    commit, [f"{prefix}{file_path}" for file_path in batch]
+                )
+                for file_path, (git_id, content) in files.items():
+                    yield file_path, git_id, _format_file_content(
+                        content, raw, parse_json
+                    )
+
+    def _get_file_with_cat_file(
+        self,
+        commit: Commitish,
+        path: str,
+        raw: Optional[bool] = False,
+        with_id: Optional[bool] = False,
+    ) -> Tuple[str, str] | str:
+        obj = self.cat_file.read(f"{commit.hash}:{path}")
+        if obj is None or obj[1] != "blob":
+            raise GitError(
+                self, message=f"fatal: Path '{path}' does not exist in '{commit}'"
+            )
+        git_id, _, content = obj
+        data: Any = content if raw else content.decode()
+        if with_id:
+            return git_id, data
+        return data
 
     def get_first_commit_on_branch(
         self, branch: Optional[str] = None
@@ -1373,6 +1701,7 @@ class GitRepository:
             self.create_local_branch_from_remote_tracking(branch, temp_remote_name)
 
         repo.remotes.delete(temp_remote_name)
+        self._invalidate_refs()
 
     def fetch_heads_to_remote_tracking(self, source: str = ".") -> None:
         """Populate this repo's ``refs/remotes/origin/*`` from the
@@ -1538,23 +1867,23 @@ class GitRepository:
         """Returns tracking branch name in format origin/branch-name or None if branch does not
         track remote branch.
         """
-        try:
-            tracking_branch = self._git(f"rev-parse --abbrev-ref {branch}@{{u}}")
-            if strip_remote:
-                tracking_branch = self.branch_local_name(tracking_branch)
-            return tracking_branch
-        except GitError:
-            return None
+        refs = self.ref_snapshot
+        if not branch:
+            branch = refs.head_branch
+        tracking_branch = refs.upstreams.get(branch) if branch else None
+        if tracking_branch is not None and strip_remote:
+            tracking_branch = self.branch_local_name(tracking_branch)
+        return tracking_branch
 
     def find_remote_tracking_branch(self, branch_name: str) -> Optional[str]:
         """Returns the first remote tracking ref matching branch_name across all remotes
         (e.g. 'origin/main' for 'main'), or None if no remote has a tracking branch for it.
         Useful when a branch no longer exists locally but its remote tracking ref is still present.
         """
-        repo = self.pygit_repo
+        remote_branches = self.ref_snapshot.remote_branches
         for remote in self.remotes:
             remote_tracking = f"{remote}/{branch_name}"
-            if repo.branches.remote.get(remote_tracking) is not None:
+            if remote_tracking in remote_branches:
                 return remote_tracking
         return None
 
@@ -1619,18 +1948,53 @@ class GitRepository:
             return self._list_files_at_revision(commit, posix_path)
 
     def _list_files_at_revision(self, commit: Commitish, path: str) -> List[str]:
-        if path is None:
-            path = ""
-        file_names = self._git("ls-tree -r --name-only {}", commit)
-        list_of_files: List = []
-        if not file_names:
-            return list_of_files
-        for file_in_repo in file_names.split("\n"):
-            if not file_in_repo.startswith(path):
+        if path in (None, "", "."):
+            tree = f"{commit.hash}^{{tree}}"
+        else:
+            tree = f"{commit.hash}:{path.rstrip('/')}"
+        return self.cat_file.list_tree(tree) or []
+
+    def list_changed_files_between(
+        self, old_commit: Commitish, new_commit: Commitish, path: str = ""
+    ) -> Dict[str, Optional[str]]:
+        """Compare the files inside `path` at two revisions.
+
+        Returns a dictionary mapping paths of the added, modified and removed
+        files (relative to `path`) to their blob ids at `new_commit`, or None
+        if they were removed. Only object ids are compared, so the work is
+        proportional to the number of changes and not to the size of the tree.
+        """
+        posix_path = Path(path).as_posix()
+        try:
+            return self.pygit.list_changed_files_between(
+                old_commit, new_commit, posix_path
+            )
+        except TAFError as e:
+            raise e
+        except Exception:
+            self._log_warning(
+                "Perfomance regression: Could not compare trees with pygit2. Reverting to git subprocess"
+            )
+            return self._list_changed_files_between(old_commit, new_commit, posix_path)
+
+    def _list_changed_files_between(
+        self, old_commit: Commitish, new_commit: Commitish, path: str
+    ) -> Dict[str, Optional[str]]:
+        prefix = "" if path in ("", ".") else f"{path.rstrip('/')}/"
+        output = self._git(
+            "diff-tree -r --no-renames {} {} -- {}",
+            old_commit.hash,
+            new_commit.hash,
+            prefix or ".",
+        )
+        changes: Dict[str, Optional[str]] = {}
+        for line in output.splitlines():
+            if not line.startswith(":"):
                 continue
-            file_in_repo = os.path.relpath(file_in_repo, path)
-            list_of_files.append(file_in_repo)
-        return list_of_files
+            info, file_path = line.split("\t", 1)
+            _, _, _, new_id, status = info.split()
+            changes[file_path[len(prefix) :]] = None if status == "D" else new_id
+        return changes
 
     def list_changed_files_at_revision(self, commit: Commitish) -> List[str]:
         repo = self.pygit_repo
@@ -1650,22 +2014,14 @@ class GitRepository:
         return list(file_names)
 
     def list_commits(self, branch: Optional[str] = "") -> List[Commitish]:
-
-        return [
-            Commitish.from_hash(commit.hex)
-            for commit in self.list_pygit_commits(branch)
-        ]
+        return list(self.iter_commits(branch))
 
     def list_pygit_commits(self, branch: Optional[str] = "") -> List[pygit2.Commit]:
-        repo = self.pygit_repo
-
-        if branch:
-            branch_obj = repo.branches.get(branch)
-            latest_commit_id = branch_obj.target
-        else:
-            latest_commit_id = repo[repo.head.target].id
-
-        return [commit for commit in repo.walk(latest_commit_id, pygit2.GIT_SORT_NONE)]
+        return list(
+            self.pygit_repo.walk(
+                self._get_commits_walk_start(branch), pygit2.GIT_SORT_NONE
+            )
+        )
 
     def list_n_commits(
         self,
@@ -2054,14 +2410,14 @@ class GitRepository:
         return local_commit == remote_commit
 
     def top_commit_of_branch(self, branch_name: str) -> Optional[Commitish]:
-        repo = self.pygit_repo
-
-        branch = repo.branches.get(branch_name)
-        if branch is not None:
-            return Commitish.from_hash(branch.target.hex)
+        target = self.ref_snapshot.branch_target(branch_name)
+        if target is not None:
+            return Commitish.from_hash(target)
         # a reference like HEAD
         try:
-            return Commitish.from_hash(repo.revparse_single(branch_name).id.hex)
+            return Commitish.from_hash(
+                self.pygit_repo.revparse_single(branch_name).id.hex
+            )
         except Exception:
             return None
 
@@ -2077,6 +2433,7 @@ class GitRepository:
         # Update the local branch to point to the latest commit from the remote branch
         local_branch_ref = f"refs/heads/{branch}"
         repo.references.create(local_branch_ref, remote_branch_commit, force=True)
+        self._invalidate_refs()
 
     def _determine_default_branch(self) -> Optional[str]:
         """Determine the default branch of the repository"""
@@ -2300,6 +2657,16 @@ _ssh_url = re.compile(
 )
 
 
+def _format_file_content(
+    content: bytes, raw: Optional[bool], parse_json: Optional[bool]
+):
+    if parse_json:
+        return json.loads(content)
+    if raw:
+        return content
+    return content.decode()
+
+
 def extract_hostname(url):
     """Extract the hostname from a Git URL, which can be either SSH or HTTP(S)."""
     if url.startswith("git@"):
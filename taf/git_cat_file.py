@@ -0,0 +1,230 @@
+"""Long-lived ``git cat-file`` coprocesses used to read git objects.
+
+Spawning ``git show`` or ``git ls-tree`` for every read costs a fork/exec,
+which dominates the execution time on hosts where reading objects through
+pygit2 fails and the subprocess fallback is used (e.g. network file systems
+or repositories not owned by the current user). ``GitCatFile`` keeps one
+``git cat-file --batch`` and one ``git cat-file --batch-check`` process per
+repository open, so each read costs a pipe round-trip instead. Requests for
+several objects are pipelined: all object names are written before the
+responses are read back.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from taf.exceptions import GitError
+from taf.log import taf_logger
+
+# requests larger than this are written from a separate thread, so that
+# git cannot block on a full stdout pipe while we block on a full stdin pipe
+_PIPE_SAFE_REQUEST_SIZE = 4096
+
+_TREE_MODE = b"40000"
+
+_OID_LENGTH = 20
+
+# replies to names of objects which cannot be read; the name itself
+# can contain spaces, so these are matched as suffixes
+_MISSING_SUFFIXES = (b" missing\n", b" ambiguous\n")
+
+ObjectHeader = Tuple[str, str, int]
+ObjectContent = Tuple[str, str, bytes]
+
+T = TypeVar("T")
+
+
+class GitCatFile:
+    """
+    Reads objects of a single repository through persistent ``git cat-file``
+    processes. The processes are started on first use and stopped by calling
+    ``close``. Instances are safe to share between threads.
+    """
+
+    def __init__(self, repo):
+        """
+        Args:
+          repo (GitRepository): the repository whose objects are read. Used to
+          determine the path and for error messages and logging.
+        """
+        self.repo = repo
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+
+    def _command(self, mode: str) -> List[str]:
+        command = ["git", "-C", str(self.repo.path)]
+        if self.repo.allow_unsafe:
+            command += ["-c", f"safe.directory={self.repo.path}"]
+        return command + ["cat-file", mode]
+
+    def _process(self, mode: str) -> subprocess.Popen:
+        process = self._processes.get(mode)
+        if process is None or process.poll() is not None:
+            process = subprocess.Popen(
+                self._command(mode),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._processes[mode] = process
+        return process
+
+    def _stop(self, mode: str) -> None:
+        process = self._processes.pop(mode, None)
+        if process is None:
+            return
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
+        finally:
+            if process.stdout is not None:
+                process.stdout.close()
+
+    def close(self) -> None:
+        """Stop all running cat-file processes"""
+        with self._lock:
+            for mode in list(self._processes):
+                self._stop(mode)
+
+    def _request(
+        self,
+        mode: str,
+        names: List[str],
+        read_response: Callable[[subprocess.Popen], T],
+    ) -> List[T]:
+        for name in names:
+            if "\n" in name:
+                raise GitError(
+                    self.repo, message=f"Invalid object name {name!r}: contains newline"
+                )
+        request = "".join(f"{name}\n" for name in names).encode()
+        with self._lock:
+            process = self._process(mode)
+            writer = None
+            try:
+                if len(request) > _PIPE_SAFE_REQUEST_SIZE:
+                    writer = threading.Thread(
+                        target=self._write, args=(process, request), daemon=True
+                    )
+                    writer.start()
+                else:
+                    self._write(process, request)
+                return [read_response(process) for _ in names]
+            except (OSError, ValueError) as e:
+                self._stop(mode)
+                raise GitError(
+                    self.repo, message=f"git cat-file {mode} failed: {e}"
+                ) from e
+            finally:
+                if writer is not None:
+                    writer.join()
+
+    @staticmethod
+    def _write(process: subprocess.Popen, request: bytes) -> None:
+        try:
+            process.stdin.write(request)  # type: ignore
+            process.stdin.flush()  # type: ignore
+        except OSError:
+            # the reader will notice that the process is gone
+            pass
+
+    @staticmethod
+    def _read_header(process: subprocess.Popen) -> Optional[ObjectHeader]:
+        """
+        Read the ``<oid> <type> <size>`` header of the next response, None if
+        the requested object does not exist
+        """
+        header = process.stdout.readline()  # type: ignore
+        if not header:
+            raise OSError("git cat-file exited unexpectedly")
+        if header.endswith(_MISSING_SUFFIXES):
+            return None
+        parts = header.split()
+        if len(parts) != 3 or not parts[2].isdigit():
+            raise OSError(f"unexpected git cat-file response {header!r}")
+        return parts[0].decode(), parts[1].decode(), int(parts[2])
+
+    @classmethod
+    def _read_object(cls, process: subprocess.Popen) -> Optional[ObjectContent]:
+        """Read the header and the content of the next ``--batch`` response"""
+        header = cls._read_header(process)
+        if header is None:
+            return None
+        oid, object_type, size = header
+        stdout = process.stdout
+        content = stdout.read(size)  # type: ignore
+        stdout.read(1)  # type: ignore
+        if len(content) != size:
+            raise OSError("git cat-file exited unexpectedly")
+        return oid, object_type, content
+
+    def read(self, name: str) -> Optional[ObjectContent]:
+        """
+        Return the id, type and content of the object with the given name
+        (e.g. ``<commit>:<path>``), or None if it does not exist
+        """
+        return self._request("--batch", [name], self._read_object)[0]
+
+    def read_many(self, names: Iterable[str]) -> List[Optional[ObjectContent]]:
+        """Pipelined version of ``read``. Results are returned in request order"""
+        names = list(names)
+        if not names:
+            return []
+        return self._request("--batch", names, self._read_object)
+
+    def info(self, name: str) -> Optional[ObjectHeader]:
+        """
+        Return the id, type and size of the object with the given name,
+        or None if it does not exist. The content is not read
+        """
+        return self._request("--batch-check", [name], self._read_header)[0]
+
+    def list_tree(self, name: str) -> Optional[List[str]]:
+        """
+        Return paths of all files in the tree with the given name, relative to
+        that tree, or None if no such tree exists. Each level of the tree is
+        read using a single pipelined request
+        """
+        root = self.read(name)
+        if root is None or root[1] != "tree":
+            return None
+        results: List[str] = []
+        pending = [("", root[2])]
+        while pending:
+            subtrees = []
+            for prefix, content in pending:
+                for mode, entry_name, oid in _parse_tree(content):
+                    path = os.path.join(prefix, entry_name) if prefix else entry_name
+                    if mode == _TREE_MODE:
+                        subtrees.append((path, oid))
+                    else:
+                        results.append(path)
+            objects = self.read_many(oid for _, oid in subtrees)
+            pending = []
+            for (path, oid), obj in zip(subtrees, objects):
+                if obj is None:
+                    taf_logger.debug(f"{self.repo.log_prefix}Tree {oid} not found")
+                    continue
+                pending.append((path, obj[2]))
+        return results
+
+
+def _parse_tree(content: bytes):
+    """Yield mode, name and object id of each entry of a raw tree object"""
+    position = 0
+    while position < len(content):
+        space = content.index(b" ", position)
+        null = content.index(b"\0", space)
+        end = null + 1 + _OID_LENGTH
+        yield (
+            content[position:space],
+            content[space + 1 : null].decode(),
+            content[null + 1 : end].hex(),
+        )
+        position = end
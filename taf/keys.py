@@ -304,7 +304,9 @@ def load_signers(
 
     keystore_files = []
     if keystore is not None:
-        keystore_files = get_keystore_keys_of_role(keystore, role)
+        # bins of a hash-bin delegation are signed using keys of the delegation
+        keystore_role = taf_repo.get_hash_bins_name(role) or role
+        keystore_files = get_keystore_keys_of_role(keystore, keystore_role)
     prompt_for_yubikey = True
 
     taf_repo.add_default_names_of_role(role)
@@ -164,21 +164,41 @@ def formatter(record):
 
 def disable_console_logging():
     try:
-        taf_logger.remove(console_loggers["log"])
+        taf_logger.remove(console_loggers.pop("log"))
     except (KeyError, ValueError):
         # will be raised if this is called twice
         pass
 
 
 def disable_file_logging():
-    for handler_id in file_loggers:
+    for handler_id in list(file_loggers):
         try:
-            taf_logger.remove(file_loggers[handler_id])
+            taf_logger.remove(file_loggers.pop(handler_id))
         except (KeyError, ValueError):
             # will be raised if this is called twice
             pass
 
 
+def get_logging_config() -> Dict[str, bool]:
+    """
+    Return which of the logger handlers are enabled, so that logging can be
+    configured the same way in another process (see configure_logging)
+    """
+    return {"console": bool(console_loggers), "file": bool(file_loggers)}
+
+
+def configure_logging(logging_config: Dict[str, bool]) -> None:
+    """
+    Initialize logger handlers based on the current settings and disable the
+    ones which are disabled in the given configuration (see get_logging_config)
+    """
+    initialize_logger_handlers()
+    if not logging_config.get("console", True):
+        disable_console_logging()
+    if not logging_config.get("file", True):
+        disable_file_logging()
+
+
 def _get_log_location():
     location = settings.LOGS_LOCATION or os.environ.get("TAF_LOG")
     if location is None:
@@ -209,6 +229,8 @@ def _add_file_logger(key: str, path: str, level) -> None:
 
 def initialize_logger_handlers():
     taf_logger.remove()
+    console_loggers.clear()
+    file_loggers.clear()
     if settings.ENABLE_CONSOLE_LOGGING:
         console_loggers["log"] = taf_logger.add(
             sys.stdout, format=formatter, level=VERBOSITY_LEVELS[settings.VERBOSITY]
@@ -1,12 +1,13 @@
 from __future__ import annotations
 import json
-from typing import Iterator, List, Optional, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 import attrs
 
 from taf.constants import DEFAULT_ROLE_SETUP_PARAMS
 from taf.exceptions import RolesKeyDataConversionError
 from taf.models.validators import (
     filepath_validator,
+    hash_bins_validator,
     integer_validator,
     optional_type_validator,
     public_key_validator,
@@ -16,15 +17,68 @@ from taf.models.validators import (
 from attrs import validators
 
 
-@attrs.frozen
 class Commitish:
-    hash: str
-    tag: Optional[str] = None
+    """
+    A commit hash or a tag.
+    Full SHA-1 hashes are stored as their 20-byte binary object ids and the
+    hex string is only built when it is read, so a commit takes about as
+    much memory as its hash string alone. Comparison with str and pygit2.Oid
+    objects does not create temporary Commitish instances.
+    """
+
+    # a single slot, since walking histories creates large numbers of commits:
+    # the binary object id of a full SHA-1 hash, the hash string otherwise,
+    # or a (hash, tag) tuple if a tag is set
+    __slots__ = ("_id",)
+    _id: Union[bytes, str, Tuple[str, str]]
+
+    def __init__(self, hash: str, tag: Optional[str] = None):
+        commit_id: Union[bytes, str, Tuple[str, str]] = hash
+        if tag is not None:
+            commit_id = (hash, tag)
+        elif len(hash) == 40:
+            try:
+                oid = bytes.fromhex(hash)
+            except ValueError:
+                pass
+            else:
+                # keep hashes which would not be converted back unchanged
+                if oid.hex() == hash:
+                    commit_id = oid
+        object.__setattr__(self, "_id", commit_id)
+
+    def __setattr__(self, name, value):
+        raise attrs.exceptions.FrozenInstanceError()
+
+    def __delattr__(self, name):
+        raise attrs.exceptions.FrozenInstanceError()
+
+    @property
+    def hash(self) -> str:
+        commit_id = self._id
+        if isinstance(commit_id, bytes):
+            return commit_id.hex()
+        if isinstance(commit_id, tuple):
+            return commit_id[0]
+        return commit_id
+
+    @property
+    def tag(self) -> Optional[str]:
+        commit_id = self._id
+        return commit_id[1] if isinstance(commit_id, tuple) else None
 
     @property
     def value(self) -> str:
         return self.tag if self.tag else self.hash
 
+    @property
+    def raw(self) -> Optional[bytes]:
+        """
+        The 20-byte binary object id, or None if hash is not a full SHA-1 hash
+        """
+        commit_id = self._id
+        return commit_id if isinstance(commit_id, bytes) else None
+
     @classmethod
     def from_hash(cls, hash: Optional[Commitish | str]):
         """
@@ -37,15 +91,35 @@ class Commitish:
             return cls(hash)  # type: ignore
         return hash  # type: ignore
 
+    @classmethod
+    def from_oid(cls, oid: Any):
+        """
+        Initialize cls from a pygit2.Oid, without converting it to a string
+        """
+        commit = object.__new__(cls)
+        object.__setattr__(commit, "_id", oid.raw)
+        return commit
+
     def __eq__(self, other):
-        if other is None:
-            return False
+        if other is self:
+            return True
+        if isinstance(other, Commitish):
+            if isinstance(self._id, bytes) and isinstance(other._id, bytes):
+                return self._id == other._id
+            return self.value == other.value
         if isinstance(other, str):
-            other = Commitish(other)
-        return self.value == other.value
+            return self.value == other
+        other_raw = getattr(other, "raw", None)
+        if isinstance(other_raw, bytes):
+            # pygit2.Oid
+            return self._id == other_raw
+        return False
 
     def __hash__(self):
-        return self.value.__hash__()
+        return hash(self.value)
+
+    def __reduce__(self):
+        return (Commitish, (self.hash, self.tag))
 
     def __str__(self):
         return self.value
@@ -57,6 +131,10 @@ class Commitish:
         """Serialize as a plain string instead of an object."""
         return json.dumps(str(self))
 
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """Return the hash and the tag, e.g. to include them in update output"""
+        return {"hash": self.hash, "tag": self.tag}
+
 
 @attrs.define
 class UserKeyData:
@@ -126,6 +204,12 @@ class TargetsRole(Role):
         kw_only=True,
         default={},
     )  # type: ignore
+    # number of bins of a hash-bin (succinct) delegation. If set, the parent role
+    # delegates to bins named <name>-<hex bin index> instead of delegating to this
+    # role, and each target file is assigned to a bin based on the hash of its path
+    hash_bins: Optional[int] = attrs.field(
+        kw_only=True, default=None, validator=hash_bins_validator
+    )
 
     def __attrs_post_init__(self):
         def _update_delegations(role):
@@ -133,10 +217,27 @@ class TargetsRole(Role):
                 delegated_role.name = role_name
                 delegated_role.parent = role
                 _update_delegations(delegated_role)
+                if delegated_role.hash_bins is not None and len(role.delegations) > 1:
+                    raise ValueError(
+                        f"{role.name} definition error: a role which delegates to hash "
+                        "bins cannot delegate to other roles"
+                    )
 
+        if self.hash_bins is not None and (self.paths or self.delegations):
+            raise ValueError(
+                f"{self.name} definition error: hash bins cannot have delegated paths "
+                "or delegations"
+            )
         if self.delegations:
             _update_delegations(self)
 
+    @property
+    def hash_bins_bit_length(self) -> Optional[int]:
+        """Number of leftmost bits of a target path's hash which select its bin"""
+        if self.hash_bins is None:
+            return None
+        return self.hash_bins.bit_length() - 1
+
 
 @attrs.define
 class SnapshotRole(Role):
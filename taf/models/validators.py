@@ -3,6 +3,9 @@ from pathlib import Path
 import attrs
 from typing import Any, List, Optional
 
+MIN_HASH_BINS = 2
+MAX_HASH_BINS = 2**16
+
 
 def integer_validator(
     instance: Any,
@@ -75,6 +78,26 @@ def role_paths_validator(
     return True
 
 
+def hash_bins_validator(
+    instance: Any,
+    attribute: "attrs.Attribute[int]",
+    value: Optional[int],
+) -> bool:
+    """Validates that the number of hash bins is a power of two"""
+    if value is None:
+        return True
+    if (
+        not isinstance(value, int)
+        or not (MIN_HASH_BINS <= value <= MAX_HASH_BINS)
+        or value & (value - 1)
+    ):
+        raise ValueError(
+            f"{instance.name} definition error: number of hash bins must be a power of "
+            f"two between {MIN_HASH_BINS} and {MAX_HASH_BINS}, but was {value}"
+        )
+    return True
+
+
 def filepath_validator(
     instance: Any,
     attribute: "attrs.Attribute[List[str]]",
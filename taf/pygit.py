@@ -1,11 +1,55 @@
-from typing import Dict
+from collections import OrderedDict
+import threading
 import pygit2
-from collections import defaultdict
+import taf.settings as settings
+from taf.blob_cache import get_blob_cache
+from taf.commit_graph import CommitGraph
+from taf.ref_snapshot import get_ref_cache
 from taf.exceptions import GitError
 import os.path
+from typing import Dict, Optional
 
 from taf.models.types import Commitish
 
+_MISSING = object()
+
+
+class _TreeCache:
+    """
+    Small thread-safe LRU mapping used to memoize tree lookups.
+    Trees are content-addressed, so entries keyed by a tree id never
+    become stale and only need to be evicted to bound memory usage.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
 
 class PyGitRepository:
     def __init__(
@@ -17,92 +61,187 @@ class PyGitRepository:
         self.encapsulating_repo = encapsulating_repo
         self.path = encapsulating_repo.path
         self.repo = pygit2.Repository(str(self.path))
+        # (tree id, entry name) -> (object id, object type) or None
+        self._path_entries = _TreeCache(settings.TREE_CACHE_MAX_ENTRIES)
+        # tree id -> paths of all blobs in that tree, relative to it
+        self._tree_listings = _TreeCache(settings.TREE_CACHE_MAX_ENTRIES)
+        # references snapshot, shared by all instances of this repository
+        self.refs = get_ref_cache(self.repo.path)
+        # ancestry index used by branch containment and ancestor checks
+        self.commit_graph = CommitGraph(
+            self.repo, lambda: self.refs.snapshot(lambda: self.repo)
+        )
 
-    _files_cache: Dict = defaultdict(dict)
-
-    def _get_child(self, parent, path_part):
-        """
-        Return the child object of a parent object.
-        Used for walking a git tree.
-        """
-        try:
-            out = parent[path_part]
-        except KeyError:
-            return None
-        else:
-            return self.repo[out.id]
-
-    def _get_object_at_path(self, obj, path):
+    def _get_tree_entry(self, tree_id, path):
         """
-        for the given commit object,
-        get the object at the given path
+        return the id and the type of the object at the given path of the
+        tree with the given id, or None if nothing exists at that path.
+        The path is resolved one directory at a time and each step is
+        memoized per (sub)tree, so directories which did not change between
+        commits (e.g. metadata/ in commits that only modified target files)
+        are resolved without reading them again.
         """
-        working = obj.tree
         if path.endswith("/"):
             path = path[:-1]
-        path = path.split("/")
-        for part in path:
-            working = self._get_child(working, part)
-            if working is None:
+        if path in ("", "."):
+            return tree_id, "tree"
+        entry = (tree_id, "tree")
+        for name in path.split("/"):
+            if entry is None or entry[1] != "tree":
                 return None
-        return working
+            key = (entry[0], name)
+            child = self._path_entries.get(key, _MISSING)
+            if child is _MISSING:
+                try:
+                    tree_entry = self.repo[entry[0]][name]
+                    child = (tree_entry.id, tree_entry.type_str)
+                except KeyError:
+                    child = None
+                self._path_entries.put(key, child)
+            entry = child
+        return entry
 
-    def _get_blob_at_path(self, obj, path):
+    def _get_entry_at_path(self, commit: Commitish, path):
         """
-        for the given commit object,
-        get the blob at the given path
+        for the given commit, return the id and the type of the object at the
+        given path, or None if nothing exists at that path.
         """
-        working = self._get_object_at_path(obj, path)
-        if working and isinstance(working, pygit2.Blob):
-            return working
-        return None
+        obj = self.repo.get(commit.hash)
+        if obj is None:
+            return None
+        return self._get_tree_entry(obj.tree_id, path)
 
     def cleanup(self):
         """
         Must call this function in order to release pygit2 file handles.
         """
+        self._path_entries.clear()
+        self._tree_listings.clear()
         self.repo.free()
 
+    def _read_blob(self, blob_id, cache=True):
+        """
+        return the id and the raw content of the blob with the given id,
+        reading it from the blob cache if possible. If cache is False,
+        a blob which is not already cached is not added to the cache
+        """
+        git_id = str(blob_id)
+        blob_cache = get_blob_cache()
+        content = blob_cache.get(git_id)
+        if content is None:
+            content = self.repo[blob_id].read_raw()
+            if cache:
+                blob_cache.put(git_id, content)
+        return git_id, content
+
     def get_file(self, commit: Commitish, path, raw=False):
         """
         for the given commit string,
         return the string contents of the blob at the
         given path, if it exists, otherwise raise GitError
         """
+        entry = self._get_entry_at_path(commit, path)
+        if entry is None or entry[1] != "blob":
+            raise GitError(
+                self.encapsulating_repo,
+                message=f"fatal: Path '{path}' does not exist in '{commit}'",
+            )
+        git_id, content = self._read_blob(entry[0])
+        return git_id, content if raw else content.decode()
+
+    def get_file_size(self, commit: Commitish, path):
+        """
+        for the given commit string,
+        return the size in bytes of the blob at the given path,
+        if it exists, otherwise raise GitError. The size of a blob which is
+        already in the blob cache is returned without reading it again.
+        """
+        entry = self._get_entry_at_path(commit, path)
+        if entry is None or entry[1] != "blob":
+            raise GitError(
+                self.encapsulating_repo,
+                message=f"fatal: Path '{path}' does not exist in '{commit}'",
+            )
+        content = get_blob_cache().get(str(entry[0]))
+        if content is not None:
+            return len(content)
+        return self.repo[entry[0]].size
+
+    def get_files(self, commit: Commitish, paths):
+        """
+        for the given commit string,
+        return a dictionary mapping each of the given paths to the blob id
+        and the raw content of the blob at that path.
+        The commit is resolved only once. Paths which do not exist
+        are omitted from the result.
+        """
         obj = self.repo.get(commit.hash)
-        blob = self._get_blob_at_path(obj, path)
-        if blob is None:
+        if obj is None:
+            raise GitError(
+                self.encapsulating_repo,
+                message=f"fatal: Commit '{commit}' does not exist",
+            )
+        files = {}
+        for path in paths:
+            entry = self._get_tree_entry(obj.tree_id, path)
+            if entry is not None and entry[1] == "blob":
+                files[path] = self._read_blob(entry[0])
+        return files
+
+    def iter_files(self, commit: Commitish, path: str):
+        """
+        for the given commit string,
+        walk the tree at the given path once and yield the posix path
+        (relative to that tree), blob id and raw content of each file.
+        Contents are read one at a time and are not added to the blob cache,
+        so arbitrarily large directories can be processed without
+        loading all of them.
+        """
+        entry = self._get_entry_at_path(commit, path)
+        if entry is None or entry[1] != "tree":
             raise GitError(
                 self.encapsulating_repo,
                 message=f"fatal: Path '{path}' does not exist in '{commit}'",
             )
-        else:
-            git_id = blob.hex
-            type = "raw" if raw else "decoded"
-            if git_id not in self._files_cache or type not in self._files_cache[git_id]:
-                content = blob.read_raw() if raw else blob.read_raw().decode()
-                self._files_cache[git_id] |= {type: content}
-            return git_id, self._files_cache[git_id][type]
+        pending = [("", entry[0])]
+        while pending:
+            prefix, tree_id = pending.pop()
+            for tree_entry in self.repo[tree_id]:
+                entry_path = f"{prefix}{tree_entry.name}"
+                if tree_entry.type_str == "blob":
+                    yield (entry_path, *self._read_blob(tree_entry.id, cache=False))
+                elif tree_entry.type_str == "tree":
+                    pending.append((f"{entry_path}/", tree_entry.id))
+                else:
+                    raise NotImplementedError(
+                        f"object at '{entry_path}' of type '{tree_entry.type_str}' not supported"
+                    )
 
-    def _list_files_at_revision(self, tree, path="", results=None):
+    def _list_files_at_revision(self, tree_id):
         """
-        recurse through tree and return paths relative to that tree for
-        all blobs in that tree.
+        recurse through the tree with the given id and return paths relative
+        to that tree for all blobs in that tree. Listings are memoized per
+        tree id, so unchanged subtrees are only walked once.
         """
-        if results is None:
-            results = []
+        results = self._tree_listings.get(tree_id)
+        if results is not None:
+            return results
 
-        for entry in tree:
-            new_path = os.path.join(path, entry.name)
+        results = []
+        for entry in self.repo[tree_id]:
             if entry.type_str == "blob":
-                results.append(new_path)
+                results.append(entry.name)
             elif entry.type_str == "tree":
-                obj = self._get_child(tree, entry.name)
-                self._list_files_at_revision(obj, new_path, results)
+                results.extend(
+                    os.path.join(entry.name, path)
+                    for path in self._list_files_at_revision(entry.id)
+                )
             else:
                 raise NotImplementedError(
-                    f"object at '{new_path}' of type '{entry.name}' not supported"
+                    f"object at '{entry.name}' of type '{entry.type_str}' not supported"
                 )
+        results = tuple(results)
+        self._tree_listings.put(tree_id, results)
         return results
 
     def list_files_at_revision(self, commit: Commitish, path: str):
@@ -111,11 +250,51 @@ class PyGitRepository:
         return a list of all file paths that are
         descendents of the path string.
         """
-        obj = self.repo.get(commit.hash)
-        root = self._get_object_at_path(obj, path)
-        if root is None:
+        entry = self._get_entry_at_path(commit, path)
+        if entry is None:
             raise GitError(
                 self.encapsulating_repo,
                 message=f"fatal: Path '{path}' does not exist in '{commit}'",
             )
-        return self._list_files_at_revision(root)
+        return list(self._list_files_at_revision(entry[0]))
+
+    def list_changed_files_between(
+        self, old_commit: Commitish, new_commit: Commitish, path: str
+    ):
+        """
+        compare the trees at the given path of two commits and return a
+        dictionary mapping paths (relative to that tree) of all files which
+        were added, modified or removed to the id of their blob at the new
+        commit, or None if they were removed. Only tree and blob ids are
+        compared, subtrees with the same id are not walked and no file
+        contents are read.
+        """
+        trees = []
+        for commit in (old_commit, new_commit):
+            if self.repo.get(commit.hash) is None:
+                raise GitError(
+                    self.encapsulating_repo,
+                    message=f"fatal: Commit '{commit}' does not exist",
+                )
+            entry = self._get_entry_at_path(commit, path)
+            trees.append(
+                self.repo[entry[0]]
+                if entry is not None and entry[1] == "tree"
+                else None
+            )
+        old_tree, new_tree = trees
+        if old_tree is None and new_tree is None:
+            return {}
+        if old_tree is None:
+            diff = new_tree.diff_to_tree(swap=True)
+        elif new_tree is None:
+            diff = old_tree.diff_to_tree()
+        else:
+            diff = old_tree.diff_to_tree(new_tree)
+        changes: Dict[str, Optional[str]] = {}
+        for delta in diff.deltas:
+            if delta.status_char() == "D":
+                changes[delta.old_file.path] = None
+            else:
+                changes[delta.new_file.path] = str(delta.new_file.id)
+        return changes
@@ -0,0 +1,182 @@
+"""In-memory snapshot of a repository's references.
+
+Checking if a branch exists, listing branches, finding tracking branches and
+reading branch tips each query the references (and the repository's config)
+again, and the updater does this for every repository and every branch. A
+``RefSnapshot`` holds all local and remote branches, their targets, symbolic
+references and upstreams of local branches, loaded at once. ``RefCache``
+keeps the snapshot of one git directory and reloads it only after it is
+invalidated. ``GitRepository`` invalidates it after every git command which
+is not read-only and after every reference it moves using pygit2, so reading
+references does not touch the file system at all. References moved by other
+processes are not detected; code which expects that has to call
+``invalidate_ref_cache`` (or ``clear_ref_caches``) first.
+
+One ``RefCache`` is shared by all ``GitRepository`` instances of a git
+directory, including those only used to detect the default branch.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import pygit2
+
+_LOCAL_PREFIX = "refs/heads/"
+_REMOTE_PREFIX = "refs/remotes/"
+
+
+class RefSnapshot:
+    """
+    References of a repository at one point in time. Branch targets are
+    commit hashes, or None if a (symbolic) reference cannot be resolved.
+    """
+
+    def __init__(
+        self,
+        local_branches: Dict[str, Optional[str]],
+        remote_branches: Dict[str, Optional[str]],
+        symbolic_refs: Dict[str, str],
+        upstreams: Dict[str, str],
+    ):
+        self.local_branches = local_branches
+        self.remote_branches = remote_branches
+        # full reference name -> full name of the reference it points to
+        self.symbolic_refs = symbolic_refs
+        # local branch -> upstream branch, e.g. main -> origin/main
+        self.upstreams = upstreams
+
+    @classmethod
+    def load(cls, repo: pygit2.Repository) -> "RefSnapshot":
+        local_branches: Dict[str, Optional[str]] = {}
+        remote_branches: Dict[str, Optional[str]] = {}
+        symbolic_refs: Dict[str, str] = {}
+        for ref_name in list(repo.references) + ["HEAD"]:
+            try:
+                ref = repo.references[ref_name]
+            except (KeyError, pygit2.GitError):
+                # deleted while loading
+                continue
+            if ref.type == pygit2.GIT_REF_SYMBOLIC:
+                symbolic_refs[ref_name] = ref.target
+            try:
+                target: Optional[str] = str(ref.resolve().target)
+            except (KeyError, pygit2.GitError):
+                target = None
+            if ref_name.startswith(_LOCAL_PREFIX):
+                local_branches[ref_name[len(_LOCAL_PREFIX) :]] = target
+            elif ref_name.startswith(_REMOTE_PREFIX):
+                remote_branches[ref_name[len(_REMOTE_PREFIX) :]] = target
+
+        upstreams: Dict[str, str] = {}
+        for branch_name in local_branches:
+            try:
+                upstream = repo.branches.local[branch_name].upstream
+            except (KeyError, ValueError, pygit2.GitError):
+                continue
+            if upstream is not None:
+                upstreams[branch_name] = upstream.branch_name
+        return cls(local_branches, remote_branches, symbolic_refs, upstreams)
+
+    @property
+    def head_branch(self) -> Optional[str]:
+        """Name of the checked out branch, or None if HEAD is detached"""
+        target = self.symbolic_refs.get("HEAD")
+        if target is None or not target.startswith(_LOCAL_PREFIX):
+            return None
+        return target[len(_LOCAL_PREFIX) :]
+
+    def branch_target(self, branch_name: str) -> Optional[str]:
+        """Commit of a local or (if there is no such local branch) remote branch"""
+        target = self.local_branches.get(branch_name)
+        if target is None:
+            target = self.remote_branches.get(branch_name)
+        return target
+
+    def branch_tips(self) -> Dict[Tuple[str, bool], str]:
+        """(branch name, is remote) -> commit of all resolvable branches"""
+        tips = {
+            (name, False): target
+            for name, target in self.local_branches.items()
+            if target is not None
+        }
+        tips.update(
+            {
+                (name, True): target
+                for name, target in self.remote_branches.items()
+                if target is not None
+            }
+        )
+        return tips
+
+
+class RefCache:
+    """
+    Snapshot of the references of one git directory, reloaded after it is
+    invalidated
+    """
+
+    def __init__(self, git_dir: str):
+        self.git_dir = Path(git_dir)
+        self._lock = threading.Lock()
+        self._snapshot: Optional[RefSnapshot] = None
+        self._generation = 0
+        self.loads = 0
+
+    def invalidate(self) -> None:
+        """Force the next snapshot to be reloaded"""
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def snapshot(self, get_repo: Callable[[], pygit2.Repository]) -> RefSnapshot:
+        """
+        Return the current snapshot. If it was invalidated, it is reloaded
+        from the repository returned by get_repo, which is only called then.
+        """
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            generation = self._generation
+        snapshot = RefSnapshot.load(get_repo())
+        with self._lock:
+            # do not store a snapshot which was invalidated while loading
+            if generation == self._generation:
+                self._snapshot = snapshot
+            self.loads += 1
+        return snapshot
+
+
+_ref_caches: Dict[str, RefCache] = {}
+_ref_caches_lock = threading.Lock()
+
+
+def get_ref_cache(git_dir: str) -> RefCache:
+    """Return the shared reference cache of the given git directory"""
+    key = os.path.normcase(os.path.realpath(git_dir))
+    with _ref_caches_lock:
+        ref_cache = _ref_caches.get(key)
+        if ref_cache is None:
+            ref_cache = _ref_caches[key] = RefCache(key)
+        return ref_cache
+
+
+def invalidate_ref_cache(path: str) -> None:
+    """
+    Invalidate the reference cache of the repository at path (its work tree
+    or git directory), if there is one
+    """
+    for git_dir in (os.path.join(path, ".git"), path):
+        key = os.path.normcase(os.path.realpath(git_dir))
+        with _ref_caches_lock:
+            ref_cache = _ref_caches.get(key)
+        if ref_cache is not None:
+            ref_cache.invalidate()
+            return
+
+
+def clear_ref_caches() -> None:
+    """Forget snapshots of all repositories"""
+    with _ref_caches_lock:
+        _ref_caches.clear()
@@ -302,6 +302,7 @@ def _load_repositories(
         if repositories_json is None:
             continue
         targets = _targets_of_roles(auth_repo, commit, roles)
+        target_files = _load_target_files(auth_repo, commit, repositories_json)
 
         for name, repo_data in repositories_json.items():
             if name in skipped_targets:
@@ -310,7 +311,9 @@ def _load_repositories(
                 continue
             custom = _get_custom_data(repo_data, targets.get(name))
             urls = _get_urls(mirrors, name, repo_data, raise_error_if_no_urls)
-            default_branch = _get_target_default_branch(auth_repo, name, commit)
+            default_branch = _get_target_default_branch(
+                auth_repo, target_files.get(name)
+            )
             git_repo = _initialize_repository(
                 factory,
                 repo_classes,
@@ -396,15 +399,14 @@ def _get_urls(
 
 
 def _get_target_default_branch(
-    auth_repo: AuthenticationRepository, name: str, commit: Commitish
+    auth_repo: AuthenticationRepository, target: Optional[Dict]
 ) -> Optional[str]:
     """
-    Gets signed name of branch for a target repository by loading json at specified <commit>.
+    Gets signed name of branch for a target repository from its target file's content.
     If successful, signed branch name is considered a default branch when instantiating a target git repository.
     Otherwise, when no branch key is found under signed targets, the default branch is inherited from authentication repository.
     """
     try:
-        target = auth_repo.get_target(name, commit)
         if target is None:
             default_branch = None
         else:
@@ -417,6 +419,30 @@ def _get_target_default_branch(
     return default_branch
 
 
+def _load_target_files(
+    auth_repo: AuthenticationRepository, commit: Commitish, names
+) -> Dict[str, Optional[Dict]]:
+    """
+    Reads target files of all repositories with the given names at the specified
+    <commit> at once. Targets which do not exist or are not valid json are set to None.
+    """
+    paths = {name: f"{TARGETS_DIRECTORY_NAME}/{name}" for name in names}
+    try:
+        files = auth_repo.get_files(commit, paths.values(), raw=True)
+    except GitError:
+        files = {}
+    targets: Dict[str, Optional[Dict]] = {}
+    for name, path in paths.items():
+        targets[name] = None
+        if path not in files:
+            continue
+        try:
+            targets[name] = json.loads(files[path][1])
+        except json.decoder.JSONDecodeError:
+            taf_logger.debug(f"{path} not a valid json at revision {commit}")
+    return targets
+
+
 def get_repositories_by_expression(
     auth_repo: AuthenticationRepository,
     filter_expr: str,
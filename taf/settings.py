@@ -17,6 +17,90 @@ validation_repo_path: dict = {}
 
 default_branch = None
 
+# Maximum number of bytes of git blob contents kept in memory by the blob
+# cache shared by all repositories. Least recently used blobs are evicted first.
+# Can also be set using the TAF_BLOB_CACHE_MAX_BYTES environment variable.
+BLOB_CACHE_MAX_BYTES = int(os.environ.get("TAF_BLOB_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Maximum number of memoized path lookups and tree listings kept per repository.
+# Trees are identified by their ids, so commits which do not modify a directory
+# (e.g. metadata/ or targets/) reuse its cached listing instead of walking it again.
+TREE_CACHE_MAX_ENTRIES = int(os.environ.get("TAF_TREE_CACHE_MAX_ENTRIES", 10000))
+
+# Maximum number of repositories and of resolved file paths kept by the git
+# storage backend, which finds the repository containing a metadata file.
+GIT_REPOS_CACHE_MAX_ENTRIES = int(
+    os.environ.get("TAF_GIT_REPOS_CACHE_MAX_ENTRIES", 1000)
+)
+RESOLVED_PATHS_CACHE_MAX_ENTRIES = int(
+    os.environ.get("TAF_RESOLVED_PATHS_CACHE_MAX_ENTRIES", 10000)
+)
+
+# Maximum number of files read at a commit which the git storage backend keeps,
+# so that reading the size of a metadata file and then loading it, or loading it
+# repeatedly, reads its blob once.
+STORAGE_FILES_CACHE_MAX_ENTRIES = int(
+    os.environ.get("TAF_STORAGE_FILES_CACHE_MAX_ENTRIES", 64)
+)
+
+# Maximum number of parsed metadata files kept by a metadata repository. Entries
+# are keyed by role and the commit or file modification time and size they were
+# read at, so older revisions read while validating stay cached as well.
+METADATA_CACHE_MAX_ENTRIES = int(os.environ.get("TAF_METADATA_CACHE_MAX_ENTRIES", 128))
+
+# If True, lengths and hashes of target files are saved to .git/taf/target-hashes.json
+# and files whose size, modification time and inode did not change are not hashed again
+# when looking for modified target files.
+TARGET_HASHES_CACHE = os.environ.get("TAF_TARGET_HASHES_CACHE", "1").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Number of threads used to hash target files. 0 uses the default size of
+# Python's thread pool, 1 hashes files in the calling thread.
+HASHING_MAX_WORKERS = int(os.environ.get("TAF_HASHING_MAX_WORKERS", 0))
+
+# Number of threads used to sign metadata of several roles with keys loaded from
+# disk. 0 uses the default size of Python's thread pool, 1 signs in the calling
+# thread. YubiKey signatures are always created one by one.
+SIGNING_MAX_WORKERS = int(os.environ.get("TAF_SIGNING_MAX_WORKERS", 0))
+
+# Maximum number of successful signature verifications of metadata files kept
+# while validating the history of an authentication repository, so that metadata
+# which did not change since a previous commit is not verified again. 0 disables
+# the cache.
+VERIFIED_METADATA_CACHE_MAX_ENTRIES = int(
+    os.environ.get("TAF_VERIFIED_METADATA_CACHE_MAX_ENTRIES", 1024)
+)
+
+# Maximum number of deserialized metadata files kept while validating the history
+# of an authentication repository, so that metadata which did not change since a
+# previous commit is not parsed again. 0 disables the cache.
+LOADED_METADATA_CACHE_MAX_ENTRIES = int(
+    os.environ.get("TAF_LOADED_METADATA_CACHE_MAX_ENTRIES", 64)
+)
+
+# Number of validated commits of an authentication repository after which the
+# validation checkpoint journal is written, so that an interrupted update can
+# resume the validation from the last checkpoint. The checkpoint is also written
+# when validation stops. 0 disables checkpoints.
+VALIDATION_CHECKPOINT_INTERVAL = int(
+    os.environ.get("TAF_VALIDATION_CHECKPOINT_INTERVAL", 100)
+)
+
+# Number of processes used to validate commits of an authentication repository.
+# Commits are split into segments at root metadata changes, which are validated
+# in parallel, each one trusting metadata at the commit preceding it. 1 validates
+# all commits in the calling process, 0 uses one process per CPU.
+TUF_VALIDATION_MAX_WORKERS = int(os.environ.get("TAF_TUF_VALIDATION_MAX_WORKERS", 1))
+
+# Minimum number of commits in a segment validated by a separate process, so
+# that small updates are not split
+TUF_VALIDATION_MIN_SEGMENT_COMMITS = int(
+    os.environ.get("TAF_TUF_VALIDATION_MIN_SEGMENT_COMMITS", 50)
+)
+
 # Strict mode enabled/disabled. If strict is enabled, any warnings
 # should raise TAF errors
 strict = False
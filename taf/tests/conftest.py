@@ -36,6 +36,30 @@ REPOSITORIES_JSON_PATH = TEST_INIT_DATA_PATH / "repositories.json"
 MIRRORS_JSON_PATH = TEST_INIT_DATA_PATH / "mirrors.json"
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="run benchmarks marked with opt_in_benchmark",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "opt_in_benchmark: benchmark which only runs with --run-benchmarks"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="run with --run-benchmarks")
+    for item in items:
+        if "opt_in_benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture(scope="session", autouse=True)
 def repo_dir():
     path = CLIENT_DIR_PATH
@@ -0,0 +1,60 @@
+import threading
+
+from taf.blob_cache import BlobCache
+
+
+def test_get_counts_hits_and_misses():
+    cache = BlobCache(max_bytes=100)
+    assert cache.get("a") is None
+    cache.put("a", b"content")
+    assert cache.get("a") == b"content"
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == len(b"content")
+
+
+def test_put_evicts_least_recently_used_entries():
+    cache = BlobCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    # "a" becomes the most recently used entry
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")
+    assert "b" not in cache
+    assert "a" in cache
+    assert "c" in cache
+    assert cache.evictions == 1
+    assert cache.size == 8
+
+
+def test_put_skips_blobs_larger_than_budget():
+    cache = BlobCache(max_bytes=4)
+    cache.put("a", b"aaa")
+    cache.put("b", b"bbbbb")
+    assert "b" not in cache
+    assert "a" in cache
+    assert cache.evictions == 0
+
+
+def test_zero_budget_disables_cache():
+    cache = BlobCache(max_bytes=0)
+    cache.put("a", b"a")
+    assert len(cache) == 0
+
+
+def test_concurrent_puts_stay_within_budget():
+    cache = BlobCache(max_bytes=1000)
+
+    def _fill(prefix):
+        for i in range(500):
+            cache.put(f"{prefix}{i}", b"x" * 10)
+            cache.get(f"{prefix}{i // 2}")
+
+    threads = [threading.Thread(target=_fill, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.size <= 1000
+    assert cache.size == sum(len(content) for content in cache._entries.values())
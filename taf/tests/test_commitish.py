@@ -0,0 +1,98 @@
+import copy
+import pickle
+import tracemalloc
+
+import pytest
+from taf.models.types import Commitish
+
+COMMITS_NUM = 100_000
+
+
+class _Oid:
+    # stands in for pygit2.Oid, which exposes the binary id as `raw`
+    def __init__(self, hex_id):
+        self.raw = bytes.fromhex(hex_id)
+
+
+def _commit_hashes(num):
+    return [f"{i:040x}" for i in range(num)]
+
+
+def _walk(hashes, create):
+    # hash strings are created while walking, like str(pygit2.Oid)
+    return [create("".join(commit_hash)) for commit_hash in hashes]
+
+
+def _memory_per_commit(hashes, create):
+    tracemalloc.start()
+    commits = _walk(hashes, create)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(commits) == len(hashes)
+    return peak / len(hashes)
+
+
+def test_from_hash():
+    commit_hash = "a" * 40
+    commit = Commitish.from_hash(commit_hash)
+    assert commit.hash == commit_hash
+    assert commit.tag is None
+    assert Commitish.from_hash(commit) is commit
+    assert Commitish.from_hash(None) is None
+    assert Commitish.from_oid(_Oid(commit_hash)) == commit
+    assert pickle.loads(pickle.dumps(commit)) == commit
+    assert copy.deepcopy(commit) == commit
+    # hashes which cannot be stored as binary object ids are kept as they are
+    for other_hash in ("A" * 40, "123456", "z" * 40):
+        assert Commitish(other_hash).hash == other_hash
+    with pytest.raises(AttributeError):
+        commit.hash = "b" * 40  # type: ignore
+
+
+def test_commitish_comparison():
+    commit_hash = "b" * 40
+    commit = Commitish.from_hash(commit_hash)
+    assert commit == commit_hash
+    assert commit == Commitish(commit_hash)
+    assert commit != "c" * 40
+    assert commit != None  # noqa: E711
+    assert commit == _Oid(commit_hash)
+    assert commit != _Oid("c" * 40)
+    assert commit.raw == bytes.fromhex(commit_hash)
+    assert Commitish("123456").raw is None
+    assert {commit: True}[commit_hash]
+    assert hash(commit) == hash(commit_hash)
+
+    tag = Commitish(commit_hash, tag="v1.0")
+    assert tag.hash == commit_hash
+    assert tag.tag == "v1.0"
+    assert tag == "v1.0"
+    assert tag != commit
+    assert tag != _Oid(commit_hash)
+    assert pickle.loads(pickle.dumps(tag)) == tag
+
+
+def test_commitish_to_dict():
+    commit = Commitish.from_hash("d" * 40)
+    assert commit.to_dict() == {"hash": "d" * 40, "tag": None}
+
+
+def test_commit_memory_close_to_hash_string():
+    hashes = _commit_hashes(10_000)
+    str_memory = _memory_per_commit(hashes, str)
+    commit_memory = _memory_per_commit(hashes, Commitish.from_hash)
+    # previously, a commit kept both an object and the hash string
+    assert commit_memory < 1.1 * str_memory
+
+
+@pytest.mark.opt_in_benchmark
+@pytest.mark.parametrize("create", [str, Commitish.from_hash])
+def test_benchmark_commits_walk(create, benchmark):
+    hashes = _commit_hashes(COMMITS_NUM)
+    last_hash = hashes[-1]
+
+    def _walk_and_find():
+        commits = _walk(hashes, create)
+        return sum(1 for commit in commits if commit == last_hash)
+
+    assert benchmark.pedantic(_walk_and_find, rounds=3) == 1
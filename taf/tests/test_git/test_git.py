@@ -8,7 +8,10 @@ import pytest
 import tempfile
 from taf.exceptions import GitError, NothingToCommitError, PygitError
 import taf.git as git_module
+from taf.blob_cache import BlobCache, get_blob_cache, set_blob_cache
 from taf.git import GitRepository
+from taf.ref_snapshot import invalidate_ref_cache
+from taf.utils import run
 
 
 def test_initial_commit(repository):
@@ -123,6 +126,33 @@ def test_branch_exists(repository: GitRepository):
     assert repository.branch_exists(branch1)
 
 
+def test_ref_snapshot_reloaded_only_when_refs_change(repository: GitRepository):
+    ref_cache = repository.pygit.refs
+    default_branch = repository.default_branch
+    assert default_branch
+    repository.branches()
+    loads = ref_cache.loads
+    assert repository.branch_exists(default_branch)
+    assert default_branch in repository.branches()
+    assert repository.top_commit_of_branch(default_branch) == repository.head_commit()
+    assert ref_cache.loads == loads
+
+    commit = repository.commit_empty("test commit")
+    assert repository.top_commit_of_branch(default_branch) == commit
+    repository.create_branch("new-branch")
+    assert repository.branch_exists("new-branch")
+    # an instance of the same repository shares the snapshot
+    other_repository = GitRepository(path=repository.path)
+    assert other_repository.pygit.refs is ref_cache
+    assert set(other_repository.branches()) == {default_branch, "new-branch"}
+
+    # references moved by other processes are read once the cache is invalidated
+    run("git", "-C", str(repository.path), "branch", "-D", "new-branch")
+    assert ref_cache.loads == loads + 2
+    invalidate_ref_cache(str(repository.path))
+    assert not repository.branch_exists("new-branch", include_remotes=False)
+
+
 def test_branch_off_commit(repository: GitRepository):
     commit1 = repository.commit_empty("commit 1")
     commit2 = repository.commit_empty("commit 2")
@@ -315,6 +345,30 @@ def test_all_commits_since_commit(repository: GitRepository):
     assert all_commits_since_commit_reverse == [commit3, commit2]
 
 
+def test_iter_commits(repository: GitRepository):
+    initial_commit = repository.initial_commit
+    commit1 = repository.commit_empty("test commit1")
+    commit2 = repository.commit_empty("test commit2")
+    commit3 = repository.commit_empty("test commit3")
+
+    commits = repository.iter_commits()
+    assert next(commits) == commit3
+    assert next(commits) == commit2
+    all_commits = list(repository.iter_commits(reverse=True))
+    assert all_commits[0] == initial_commit
+    assert all_commits[-3:] == [commit1, commit2, commit3]
+    assert all_commits == list(repository.iter_commits())[::-1]
+    assert list(repository.iter_commits(since_commit=commit1)) == [commit3, commit2]
+    assert list(repository.iter_commits(since_commit=commit1, reverse=True)) == [
+        commit2,
+        commit3,
+    ]
+    assert not list(repository.iter_commits(since_commit=commit3))
+    assert list(repository.iter_commit_hashes(since_commit=commit2)) == [commit3.hash]
+    with pytest.raises(GitError):
+        repository.iter_commits("missing-branch")
+
+
 def test_branches_containing_commit(repository: GitRepository):
     commit1 = repository.commit_empty("test commit1")
     branches = repository.branches_containing_commit(commit1)
@@ -325,6 +379,67 @@ def test_branches_containing_commit(repository: GitRepository):
     branches == [repository.default_branch, branch]
 
 
+def test_branches_containing_commit_updates_when_branches_move(
+    repository: GitRepository,
+):
+    default_branch = repository.default_branch
+    assert default_branch
+    commit1 = repository.commit_empty("test commit1")
+    assert list(repository.branches_containing_commit(commit1)) == [default_branch]
+
+    repository.checkout_branch("new-branch", create=True)
+    commit2 = repository.commit_empty("test commit2")
+    assert list(repository.branches_containing_commit(commit2)) == ["new-branch"]
+    assert set(repository.branches_containing_commit(commit1)) == {
+        default_branch,
+        "new-branch",
+    }
+    indexed_commits = len(repository.pygit.commit_graph)
+
+    repository.checkout_branch(default_branch)
+    repository.reset_to_commit(commit2, hard=True)
+    assert set(repository.branches_containing_commit(commit2)) == {
+        default_branch,
+        "new-branch",
+    }
+    # moving the default branch to an already indexed commit walks no history
+    assert len(repository.pygit.commit_graph) == indexed_commits
+
+    repository.delete_local_branch("new-branch")
+    assert list(repository.branches_containing_commit(commit2)) == [default_branch]
+    assert not repository.branches_containing_commit(Commitish.from_hash("123456"))
+
+
+def test_is_commit_an_ancestor_of_a_commit_or_branch(repository: GitRepository):
+    default_branch = repository.default_branch
+    assert default_branch
+    commit1 = repository.commit_empty("test commit1")
+    commit2 = repository.commit_empty("test commit2")
+    repository.checkout_branch("new-branch", create=True)
+    commit3 = repository.commit_empty("test commit3")
+    repository.checkout_branch(default_branch)
+    commit4 = repository.commit_empty("test commit4")
+
+    assert repository.is_commit_an_ancestor_of_a_commit_or_branch(commit1, commit2.hash)
+    assert repository.is_commit_an_ancestor_of_a_commit_or_branch(commit2, commit2.hash)
+    assert repository.is_commit_an_ancestor_of_a_commit_or_branch(commit2, "new-branch")
+    assert repository.is_commit_an_ancestor_of_a_commit_or_branch(
+        commit1, default_branch
+    )
+    assert not repository.is_commit_an_ancestor_of_a_commit_or_branch(
+        commit2, commit1.hash
+    )
+    assert not repository.is_commit_an_ancestor_of_a_commit_or_branch(
+        commit3, default_branch
+    )
+    assert not repository.is_commit_an_ancestor_of_a_commit_or_branch(
+        commit4, commit3.hash
+    )
+    assert not repository.is_commit_an_ancestor_of_a_commit_or_branch(
+        commit1, "missing-branch"
+    )
+
+
 def test_checkout_commit(repository: GitRepository):
     commit1 = repository.commit_empty("test commit1")
     repository.commit_empty("test commit2")
@@ -374,6 +489,206 @@ def test_list_files_at_revision(repository: GitRepository):
     assert set(files_at_revision) == {test1, test2}
 
 
+def test_list_files_at_revision_reuses_unchanged_subtrees(
+    repository: GitRepository,
+):
+    dir_path = repository.path / "test"
+    dir_path.mkdir()
+    (dir_path / "test_file1").write_text("test1")
+    commit1 = repository.commit("test commit 1")
+    (repository.path / "other.txt").write_text("other")
+    commit2 = repository.commit("test commit 2")
+    files1 = repository.list_files_at_revision(commit1, "test")
+    listings = repository.pygit._tree_listings
+    cached_listings = len(listings)
+    files2 = repository.list_files_at_revision(commit2, "test")
+    assert files1 == files2 == ["test_file1"]
+    # the subtree was not modified, so its listing is not computed again
+    assert len(listings) == cached_listings
+    with pytest.raises(GitError):
+        repository.pygit.list_files_at_revision(commit2, "missing")
+
+
+def test_get_file_reuses_lookups_in_unchanged_subtrees(repository: GitRepository):
+    dir_path = repository.path / "test" / "nested"
+    dir_path.mkdir(parents=True)
+    (dir_path / "test_file1").write_text("test1")
+    commit1 = repository.commit("test commit 1")
+    (repository.path / "other.txt").write_text("other")
+    commit2 = repository.commit("test commit 2")
+    path_entries = repository.pygit._path_entries
+    assert repository.get_file(commit1, "test/nested/test_file1") == "test1"
+    cached_entries = len(path_entries)
+    assert repository.get_file(commit2, "test/nested/test_file1") == "test1"
+    # only the entry of the unchanged directory in the new root tree is added
+    assert len(path_entries) == cached_entries + 1
+    with pytest.raises(GitError):
+        repository.get_file(commit2, "test/nested/test_file1/missing")
+    with pytest.raises(GitError):
+        repository.get_file(commit2, "test/missing/test_file1")
+
+
+def test_list_changed_files_between(repository: GitRepository):
+    dir_path = repository.path / "test" / "nested"
+    dir_path.mkdir(parents=True)
+    (dir_path / "test_file1").write_text("test1")
+    (dir_path / "test_file2").write_text("test2")
+    commit1 = repository.commit("test commit 1")
+    (dir_path / "test_file1").write_text("modified")
+    (dir_path / "test_file2").unlink()
+    (repository.path / "test" / "test_file3").write_text("test3")
+    (repository.path / "other.txt").write_text("other")
+    commit2 = repository.commit("test commit 2")
+
+    changes = repository.list_changed_files_between(commit1, commit2, "test")
+    blob_id, _ = repository.get_file(commit2, "test/nested/test_file1", with_id=True)
+    assert changes["nested/test_file1"] == blob_id
+    assert changes["nested/test_file2"] is None
+    assert set(changes) == {"nested/test_file1", "nested/test_file2", "test_file3"}
+    assert repository._list_changed_files_between(commit1, commit2, "test") == changes
+    assert repository.list_changed_files_between(commit2, commit2, "test") == {}
+    assert repository.list_changed_files_between(commit1, commit2, "missing") == {}
+    # files of a directory which did not exist are all added
+    added = repository.list_changed_files_between(repository.initial_commit, commit1)
+    assert {"test/nested/test_file1", "test/nested/test_file2"} <= set(added)
+
+
+def test_cat_file_reads_objects(repository: GitRepository):
+    commit = repository.head_commit()
+    assert commit
+    cat_file = repository.cat_file
+    obj = cat_file.read(f"{commit.hash}:test1.txt")
+    assert obj
+    oid, object_type, content = obj
+    assert object_type == "blob"
+    assert content == b"Some example text 1"
+    assert cat_file.info(f"{commit.hash}:test1.txt") == (oid, "blob", len(content))
+    assert cat_file.read(f"{commit.hash}:missing.txt") is None
+    # names of missing objects can contain spaces
+    assert cat_file.read(f"{commit.hash}:my file") is None
+    assert cat_file.info(f"{commit.hash}:my file") is None
+    assert cat_file.read_many(
+        [f"{commit.hash}:my file", f"{commit.hash}:test1.txt"]
+    ) == [None, obj]
+    # a large pipelined request is written from a separate thread
+    names = [f"{commit.hash}:test{i % 3 + 1}.txt" for i in range(500)]
+    objects = cat_file.read_many(names)
+    assert [obj[2] for obj in objects[:3] if obj] == [
+        b"Some example text 1",
+        b"Some example text 2",
+        b"Some example text 3",
+    ]
+    assert len(objects) == len(names)
+    repository.cleanup()
+    assert repository._cat_file is None
+
+
+def test_get_file_and_list_files_fall_back_to_cat_file(
+    repository: GitRepository, monkeypatch
+):
+    dir_path = repository.path / "test" / "nested"
+    dir_path.mkdir(parents=True)
+    (dir_path / "test_file1").write_text("test1")
+    commit = repository.commit("test commit")
+
+    def _fail(*args, **kwargs):
+        raise Exception("pygit2 failure")
+
+    monkeypatch.setattr(repository.pygit, "get_file", _fail)
+    monkeypatch.setattr(repository.pygit, "list_files_at_revision", _fail)
+    monkeypatch.setattr(repository, "_git", _fail)
+
+    assert repository.get_file(commit, "test/nested/test_file1") == "test1"
+    git_id, content = repository.get_file(
+        commit, "test/nested/test_file1", raw=True, with_id=True
+    )
+    assert content == b"test1"
+    info = repository.cat_file.info(f"{commit}:test/nested/test_file1")
+    assert info and info[0] == git_id
+    with pytest.raises(GitError):
+        repository.get_file(commit, "test/missing")
+    assert repository.list_files_at_revision(commit, "test") == [
+        os.path.join("nested", "test_file1")
+    ]
+    assert set(repository.list_files_at_revision(commit)) == {
+        "test1.txt",
+        "test2.txt",
+        "test3.txt",
+        os.path.join("test", "nested", "test_file1"),
+    }
+
+
+def test_get_file_size(repository: GitRepository, monkeypatch):
+    commit = repository.head_commit()
+    assert commit
+    size = len(b"Some example text 1")
+    assert repository.get_file_size(commit, "test1.txt") == size
+    with pytest.raises(GitError):
+        repository.get_file_size(commit, "missing.txt")
+
+    def _fail(*args, **kwargs):
+        raise Exception("pygit2 failure")
+
+    monkeypatch.setattr(repository.pygit, "get_file_size", _fail)
+    assert repository.get_file_size(commit, "test1.txt") == size
+    with pytest.raises(GitError):
+        repository.get_file_size(commit, "missing.txt")
+
+
+def test_get_files(repository: GitRepository):
+    dir_path = repository.path / "test" / "nested"
+    dir_path.mkdir(parents=True)
+    (dir_path / "test.json").write_text(json.dumps({"test": "test"}))
+    (repository.path / "test" / "test_file").write_text("test")
+    commit = repository.commit("test commit")
+
+    files = repository.get_files(commit, ["test1.txt", "missing.txt"], raw=True)
+    assert list(files) == ["test1.txt"]
+    git_id, content = files["test1.txt"]
+    assert content == b"Some example text 1"
+    assert repository.get_file(commit, "test1.txt", with_id=True) == (
+        git_id,
+        content.decode(),
+    )
+
+    files = repository.get_files(commit, prefix="test")
+    assert {path: content for path, (_, content) in files.items()} == {
+        "test/test_file": "test",
+        "test/nested/test.json": json.dumps({"test": "test"}),
+    }
+    files = repository.get_files(
+        commit, ["test/nested/test.json"], prefix="test/nested", parse_json=True
+    )
+    assert files["test/nested/test.json"][1] == {"test": "test"}
+
+
+def test_iter_files(repository: GitRepository, monkeypatch):
+    dir_path = repository.path / "test" / "nested"
+    dir_path.mkdir(parents=True)
+    (dir_path / "test_file1").write_text("test1")
+    (repository.path / "test" / "test_file2").write_text("test2")
+    commit = repository.commit("test commit")
+    expected = {
+        "test/nested/test_file1": b"test1",
+        "test/test_file2": b"test2",
+    }
+    files = {
+        path: content
+        for path, _, content in repository.iter_files(commit, "test", raw=True)
+    }
+    assert files == expected
+
+    def _fail(*args, **kwargs):
+        raise Exception("pygit2 failure")
+
+    monkeypatch.setattr(repository.pygit, "iter_files", _fail)
+    files = {
+        path: content
+        for path, _, content in repository.iter_files(commit, "test", raw=True)
+    }
+    assert files == expected
+
+
 def test_list_changed_files_at_revision(repository: GitRepository):
     test1 = "test_file1"
     test2 = "test_file2"
@@ -436,6 +751,23 @@ def test_safely_get_json(repository: GitRepository):
     assert "test2" in file2
 
 
+def test_get_file_caches_raw_content_once(repository: GitRepository):
+    previous = set_blob_cache(BlobCache(max_bytes=1024))
+    try:
+        commit = repository.head_commit()
+        assert commit
+        git_id, text = repository.get_file(commit, "test1.txt", with_id=True)
+        raw = repository.get_file(commit, "test1.txt", raw=True)
+        assert text == "Some example text 1"
+        assert raw == text.encode()
+        cache = get_blob_cache()
+        assert len(cache) == 1
+        assert cache.get(git_id) == raw
+        assert cache.stats()["misses"] == 1
+    finally:
+        set_blob_cache(previous)
+
+
 def test_top_commit_of_branch(repository: GitRepository):
     branch = "new-branch"
     repository.create_and_checkout_branch(branch)
@@ -0,0 +1,91 @@
+from pathlib import Path
+
+import pytest
+from securesystemslib.exceptions import StorageError
+from taf.git import GitRepository
+from taf.tuf.storage import GitRepositoriesCache, GitStorageBackend
+
+
+def _repo(path: Path) -> GitRepository:
+    return GitRepository(path=path, default_branch="main")
+
+
+def test_find_returns_repository_containing_path(tmp_path):
+    cache = GitRepositoriesCache()
+    repo = _repo(tmp_path / "namespace" / "repo")
+    cache.add(repo)
+    assert cache.find(repo.path / "metadata" / "root.json") is repo
+    assert cache.find(repo.path) is repo
+    assert cache.find(tmp_path / "namespace" / "repo2" / "metadata") is None
+    assert cache.find(tmp_path / "namespace") is None
+
+
+def test_find_returns_longest_matching_repository(tmp_path):
+    cache = GitRepositoriesCache()
+    outer_repo = _repo(tmp_path / "namespace" / "outer")
+    inner_repo = _repo(outer_repo.path / "nested" / "inner")
+    cache.add(outer_repo)
+    cache.add(inner_repo)
+    assert cache.find(inner_repo.path / "metadata" / "root.json") is inner_repo
+    assert cache.find(outer_repo.path / "nested" / "file") is outer_repo
+
+
+def test_find_resolves_relative_and_symlinked_paths(tmp_path, monkeypatch):
+    cache = GitRepositoriesCache()
+    repo = _repo(tmp_path / "namespace" / "repo")
+    repo.path.mkdir(parents=True)
+    link = tmp_path / "link"
+    link.symlink_to(repo.path)
+    cache.add(repo)
+    assert cache.find(link / "metadata" / "root.json") is repo
+    monkeypatch.chdir(repo.path)
+    assert cache.find(Path("metadata") / "root.json") is repo
+
+
+def test_least_recently_used_repositories_are_evicted(tmp_path):
+    cache = GitRepositoriesCache(max_entries=2, max_resolved_paths=2)
+    repo1 = _repo(tmp_path / "namespace" / "repo1")
+    repo2 = _repo(tmp_path / "namespace" / "repo2")
+    repo3 = _repo(tmp_path / "namespace" / "repo3")
+    cache.add(repo1)
+    cache.add(repo2)
+    # repo1 becomes the most recently used repository
+    assert cache.find(repo1.path / "file") is repo1
+    cache.add(repo3)
+    assert len(cache) == 2
+    assert repo2.path not in cache
+    assert repo1.path in cache
+    assert cache.find(repo2.path / "file") is None
+
+
+def test_git_storage_backend_reads_each_file_once(tmp_path, monkeypatch):
+    repository = GitRepository(path=tmp_path / "namespace" / "repo")
+    repository.path.mkdir(parents=True)
+    repository.init_repo()
+    (repository.path / "test1.txt").write_text("Some example text 1")
+    repository.commit("Add test1.txt")
+    storage = GitStorageBackend()
+    storage.commit = repository.head_commit()
+    filepath = str(repository.path / "test1.txt")
+    content = b"Some example text 1"
+    reads = []
+    get_file = GitRepository.get_file
+
+    def _get_file(repo, *args, **kwargs):
+        reads.append(args)
+        return get_file(repo, *args, **kwargs)
+
+    monkeypatch.setattr(GitRepository, "get_file", _get_file)
+    assert storage.getsize(filepath) == len(content)
+    with storage.get(filepath) as fileobj:
+        assert fileobj.read() == content
+    with storage.get(filepath) as fileobj:
+        assert fileobj.read() == content
+    assert storage.getsize(filepath) == len(content)
+    assert len(reads) == 1
+
+    with pytest.raises(StorageError):
+        storage.getsize(str(repository.path / "missing.txt"))
+    with pytest.raises(StorageError):
+        with storage.get(str(repository.path / "missing.txt")):
+            pass
@@ -4,11 +4,31 @@ import pytest
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import hashes
 from securesystemslib.exceptions import UnverifiedSignatureError
-from securesystemslib.signer import SSlibKey, Signature
-from tuf.api.exceptions import DownloadLengthMismatchError
+from securesystemslib.signer import CryptoSigner, SSlibKey, Signature
+from tuf.api.exceptions import (
+    DownloadHTTPError,
+    DownloadLengthMismatchError,
+    RepositoryError,
+)
+from tuf.api.metadata import (
+    Metadata,
+    MetaFile,
+    Root,
+    Snapshot,
+    TargetFile,
+    Targets,
+    Timestamp,
+)
+from tuf.ngclient._internal import trusted_metadata_set
+from tuf.ngclient.fetcher import FetcherInterface
 from tuf.ngclient.updater import Updater
 
 from taf.tuf.key_cache import _load_pem_public_key_cached
+from taf.updater.git_trusted_metadata_set import (
+    GitTrustedMetadataSet,
+    loaded_metadata_cache,
+    verified_metadata_cache,
+)
 from taf.updater.handlers import GitUpdater
 from taf.updater.in_memory_updater import InMemoryUpdater
 
@@ -20,6 +40,8 @@ def test_tuf_private_api_is_unchanged():
     assert load_params == ["self", "rolename"]
     persist_params = list(inspect.signature(Updater._persist_metadata).parameters)
     assert persist_params == ["self", "rolename", "data"]
+    # replaced by InMemoryUpdater.start_revision
+    assert "self._trusted_set = " in inspect.getsource(Updater.__init__)
 
 
 def test_in_memory_updater_load_and_persist():
@@ -102,3 +124,75 @@ def test_cached_key_verifies_and_rejects_signatures(rsa_key_pair):
     assert _load_pem_public_key_cached(public_pem) is _load_pem_public_key_cached(
         public_pem
     )
+
+
+class _RevisionFetcher(FetcherInterface):
+    """Serves metadata files of the revision which is being validated"""
+
+    def __init__(self):
+        self.files = {}
+
+    def _fetch(self, url):
+        if url not in self.files:
+            raise DownloadHTTPError(f"{url} not found", 404)
+        return iter([self.files[url]])
+
+
+def _sign(signer, signed):
+    metadata = Metadata(signed)
+    metadata.sign(signer)
+    return metadata.to_bytes()
+
+
+def _revision_files(signer, version, content):
+    targets = Targets(version=version)
+    targets.targets["file"] = TargetFile.from_data("file", content)
+    snapshot = Snapshot(version=version, meta={"targets.json": MetaFile(version)})
+    timestamp = Timestamp(version=version, snapshot_meta=MetaFile(version))
+    return {
+        "metadata/targets.json": _sign(signer, targets),
+        "metadata/snapshot.json": _sign(signer, snapshot),
+        "metadata/timestamp.json": _sign(signer, timestamp),
+    }
+
+
+def test_updater_reused_across_revisions(monkeypatch):
+    monkeypatch.setattr(
+        trusted_metadata_set, "TrustedMetadataSet", GitTrustedMetadataSet
+    )
+    verified_metadata_cache.clear()
+    loaded_metadata_cache.clear()
+    signer = CryptoSigner.generate_ed25519()
+    root = Root(consistent_snapshot=False)
+    for role in root.roles:
+        root.add_key(signer.public_key, role)
+    fetcher = _RevisionFetcher()
+    updater = InMemoryUpdater(
+        {"root": _sign(signer, root)},
+        "",
+        "metadata/",
+        None,
+        "targets/",
+        fetcher=fetcher,
+    )
+
+    trusted_root = None
+    for version, content in ((1, b"first"), (2, b"second"), (3, b"third")):
+        fetcher.files = _revision_files(signer, version, content)
+        if version > 1:
+            updater.start_revision()
+        updater.refresh()
+        assert updater.get_targetinfo("file").length == len(content)
+        # unchanged root metadata is neither parsed nor verified again
+        assert trusted_root in (None, updater._trusted_set.root)
+        trusted_root = updater._trusted_set.root
+    assert verified_metadata_cache.hits > 0
+    assert updater.skipped_verifications == verified_metadata_cache.hits
+
+    # metadata of the previous revision is still trusted, so rollbacks fail
+    fetcher.files = _revision_files(signer, 2, b"second")
+    updater.start_revision()
+    with pytest.raises(RepositoryError):
+        updater.refresh()
+    verified_metadata_cache.clear()
+    loaded_metadata_cache.clear()
@@ -0,0 +1,98 @@
+import inspect
+
+import pytest
+from securesystemslib.signer import CryptoSigner, SSlibKey
+from tuf.api.exceptions import RepositoryError
+from tuf.api.metadata import Metadata, Root, Timestamp
+from tuf.ngclient._internal.trusted_metadata_set import TrustedMetadataSet
+
+import taf.updater.git_trusted_metadata_set as git_trusted_metadata_set
+from taf.updater.git_trusted_metadata_set import (
+    GitTrustedMetadataSet,
+    verified_metadata_cache,
+)
+
+
+@pytest.fixture
+def signed_metadata():
+    signer = CryptoSigner.generate_ed25519()
+    root = Metadata(Root())
+    for role in root.signed.roles:
+        root.signed.add_key(signer.public_key, role)
+    root.sign(signer)
+    timestamp = Metadata(Timestamp())
+    timestamp.sign(signer)
+    verified_metadata_cache.clear()
+    yield signer, root, timestamp
+    verified_metadata_cache.clear()
+
+
+@pytest.fixture
+def verifications(monkeypatch):
+    verified = []
+    verify_signature = SSlibKey.verify_signature
+
+    def _verify_signature(self, signature, data):
+        verified.append(self.keyid)
+        return verify_signature(self, signature, data)
+
+    monkeypatch.setattr(SSlibKey, "verify_signature", _verify_signature)
+    return verified
+
+
+def test_tuf_private_api_is_unchanged():
+    """GitTrustedMetadataSet overrides and wraps these private python-tuf
+    methods, so fail loudly if a tuf upgrade changes them."""
+    load_root_params = inspect.signature(TrustedMetadataSet._load_trusted_root)
+    assert list(load_root_params.parameters) == ["self", "data"]
+    assert "self._load_data = " in inspect.getsource(TrustedMetadataSet.__init__)
+    assert git_trusted_metadata_set.VERIFICATION_CACHE_SUPPORTED
+
+
+def test_unchanged_metadata_verified_once(signed_metadata, verifications):
+    _, root, timestamp = signed_metadata
+    root_bytes = root.to_bytes()
+    timestamp_bytes = timestamp.to_bytes()
+    skipped_verifications = []
+    for _ in range(3):
+        trusted_set = GitTrustedMetadataSet(root_bytes)
+        trusted_set.update_timestamp(timestamp_bytes)
+        assert trusted_set.timestamp.version == 1
+        skipped_verifications.append(trusted_set.skipped_verifications)
+    assert len(verifications) == 2
+    assert verified_metadata_cache.hits == 4
+    assert skipped_verifications == [0, 2, 2]
+
+
+def test_metadata_verified_by_tuf_if_private_api_changed(
+    signed_metadata, verifications, monkeypatch
+):
+    monkeypatch.setattr(git_trusted_metadata_set, "VERIFICATION_CACHE_SUPPORTED", False)
+    _, root, timestamp = signed_metadata
+    for _ in range(2):
+        trusted_set = GitTrustedMetadataSet(root.to_bytes())
+        trusted_set.update_timestamp(timestamp.to_bytes())
+        assert trusted_set.skipped_verifications == 0
+    assert len(verifications) == 4
+    assert verified_metadata_cache.hits == verified_metadata_cache.misses == 0
+
+
+def test_modified_metadata_verified_again(signed_metadata, verifications):
+    signer, root, timestamp = signed_metadata
+    root_bytes = root.to_bytes()
+    GitTrustedMetadataSet(root_bytes).update_timestamp(timestamp.to_bytes())
+
+    # signatures no longer match the modified payload
+    timestamp.signed.version = 2
+    with pytest.raises(RepositoryError):
+        GitTrustedMetadataSet(root_bytes).update_timestamp(timestamp.to_bytes())
+
+    # the same metadata is verified again if the trusted keys change
+    other_signer = CryptoSigner.generate_ed25519()
+    root.signed.add_key(other_signer.public_key, Timestamp.type)
+    root.sign(signer)
+    timestamp.signed.version = 1
+    timestamp.sign(signer)
+    GitTrustedMetadataSet(root.to_bytes()).update_timestamp(timestamp.to_bytes())
+    assert len(verifications) == 5
+    assert verified_metadata_cache.hits == 1
@@ -0,0 +1,117 @@
+import pytest
+from tuf.api.metadata import TargetFile
+
+import taf.settings as settings
+from taf.exceptions import GitError
+from taf.tests.test_updater.conftest import (
+    SetupManager,
+    add_valid_target_commits,
+    add_valid_unauthenticated_commits,
+)
+from taf.updater.handlers import GitUpdater
+from taf.updater.updater_pipeline import _run_tuf_updater
+
+
+def _commit_auth_repo_file(auth_repo, file_path, content, message):
+    path = auth_repo.path / file_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    auth_repo.commit(message)
+
+
+def _run_validation(auth_repo, monkeypatch, incremental):
+    """
+    Validate all commits of the authentication repository and return the
+    last validated commit, the error and the (commit, target path) pairs
+    which were read and verified
+    """
+    verified = []
+    verify_length_and_hashes = TargetFile.verify_length_and_hashes
+
+    with monkeypatch.context() as patch:
+        patch.setitem(settings.validation_repo_path, auth_repo.name, auth_repo.path)
+        patch.setitem(settings.last_validated_commit, auth_repo.name, None)
+        git_fetcher = GitUpdater(None, auth_repo.path.parent, auth_repo.name)
+
+        def _verify_length_and_hashes(self, data):
+            verified.append((git_fetcher.current_commit, self.path))
+            return verify_length_and_hashes(self, data)
+
+        patch.setattr(TargetFile, "verify_length_and_hashes", _verify_length_and_hashes)
+        if not incremental:
+
+            def _compare_fails(*args):
+                raise GitError(git_fetcher.validation_auth_repo, "comparison failed")
+
+            patch.setattr(git_fetcher, "get_targets_changed_since", _compare_fails)
+        try:
+            last_validated_commit, error = _run_tuf_updater(git_fetcher, auth_repo.name)
+        finally:
+            git_fetcher.validation_auth_repo.cleanup()
+    return last_validated_commit, error, verified
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}, {"name": "target2"}],
+        },
+    ],
+    indirect=True,
+)
+def test_incremental_validation_matches_full_validation(origin_auth_repo, monkeypatch):
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits)
+    setup_manager.add_task(add_valid_unauthenticated_commits)
+    setup_manager.add_task(add_valid_target_commits)
+    setup_manager.execute_tasks()
+    # a commit which does not modify metadata nor target files
+    _commit_auth_repo_file(origin_auth_repo, "README.md", "readme", "Add readme")
+
+    full_commit, full_error, full_verified = _run_validation(
+        origin_auth_repo, monkeypatch, incremental=False
+    )
+    commit, error, verified = _run_validation(
+        origin_auth_repo, monkeypatch, incremental=True
+    )
+    assert full_error is None and error is None
+    assert commit == full_commit == origin_auth_repo.head_commit()
+    assert set(verified) < set(full_verified)
+    # no target file is verified again at the last commit
+    assert not [path for commit, path in verified if commit == full_commit]
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}, {"name": "target2"}],
+        },
+    ],
+    indirect=True,
+)
+def test_incremental_validation_detects_modified_target_file(
+    origin_auth_repo, monkeypatch
+):
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits)
+    setup_manager.execute_tasks()
+    last_valid_commit = origin_auth_repo.head_commit()
+    target_path = f"{origin_auth_repo.name.split('/')[0]}/target1"
+    # the target file no longer matches its hashes listed in targets metadata
+    _commit_auth_repo_file(
+        origin_auth_repo, f"targets/{target_path}", "{}", "Modify target file"
+    )
+    _commit_auth_repo_file(origin_auth_repo, "README.md", "readme", "Add readme")
+
+    full_commit, full_error, _ = _run_validation(
+        origin_auth_repo, monkeypatch, incremental=False
+    )
+    commit, error, verified = _run_validation(
+        origin_auth_repo, monkeypatch, incremental=True
+    )
+    assert commit == full_commit == last_valid_commit
+    assert error is not None and full_error is not None
+    assert str(error) == str(full_error)
+    assert verified[-1][1] == target_path
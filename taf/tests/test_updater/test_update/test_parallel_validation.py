@@ -0,0 +1,148 @@
+import pickle
+
+import pytest
+
+import taf.log as taf_log
+import taf.settings as settings
+from taf.tests.test_updater.conftest import (
+    SetupManager,
+    add_valid_target_commits,
+    update_expiration_dates,
+    update_timestamp_metadata_invalid_signature,
+)
+from taf.updater.handlers import GitUpdater
+from taf.updater.updater_pipeline import (
+    _get_settings_snapshot,
+    _get_validation_segments,
+    _initialize_validation_worker,
+    _run_tuf_updater,
+)
+
+
+def _run_validation(auth_repo, monkeypatch, max_workers):
+    with monkeypatch.context() as patch:
+        patch.setattr(settings, "TUF_VALIDATION_MAX_WORKERS", max_workers)
+        patch.setattr(settings, "TUF_VALIDATION_MIN_SEGMENT_COMMITS", 1)
+        patch.setitem(settings.validation_repo_path, auth_repo.name, auth_repo.path)
+        patch.setitem(settings.last_validated_commit, auth_repo.name, None)
+        git_fetcher = GitUpdater(None, auth_repo.path.parent, auth_repo.name)
+        try:
+            segments = _get_validation_segments(git_fetcher)
+            last_validated_commit, error = _run_tuf_updater(git_fetcher, auth_repo.name)
+        finally:
+            git_fetcher.validation_auth_repo.cleanup()
+    return segments, last_validated_commit, error, git_fetcher.current_commit_index
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}, {"name": "target2"}],
+        },
+    ],
+    indirect=True,
+)
+def test_validation_segments_split_at_root_changes(origin_auth_repo, monkeypatch):
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits, kwargs={"repetitions": 2})
+    setup_manager.add_task(update_expiration_dates, kwargs={"roles": ["root"]})
+    setup_manager.add_task(add_valid_target_commits, kwargs={"repetitions": 2})
+    setup_manager.execute_tasks()
+    commits = origin_auth_repo.all_commits_on_branch()
+
+    monkeypatch.setattr(settings, "TUF_VALIDATION_MAX_WORKERS", 100)
+    monkeypatch.setattr(settings, "TUF_VALIDATION_MIN_SEGMENT_COMMITS", 1)
+    monkeypatch.setitem(
+        settings.validation_repo_path, origin_auth_repo.name, origin_auth_repo.path
+    )
+    monkeypatch.setitem(settings.last_validated_commit, origin_auth_repo.name, None)
+    git_fetcher = GitUpdater(None, origin_auth_repo.path.parent, origin_auth_repo.name)
+    git_fetcher.validation_auth_repo.cleanup()
+    segments = _get_validation_segments(git_fetcher)
+    git_fetcher.restore_tuf_metadata_set()
+
+    # consecutive segments which cover all commits following the first one
+    assert len(segments) > 1
+    assert [commit for _, segment in segments for commit in segment] == commits[1:]
+    assert segments[0][0] == commits[0]
+    for (_, previous_segment), (start_commit, _) in zip(segments, segments[1:]):
+        assert start_commit == previous_segment[-1]
+    root_ids = {
+        commit: git_fetcher.get_root_metadata_id(commit) for commit in commits[1:]
+    }
+    assert root_ids[commits[1]] != root_ids[commits[-1]]
+    for _, segment in segments:
+        assert len({root_ids[commit] for commit in segment}) == 1
+
+    monkeypatch.setattr(settings, "TUF_VALIDATION_MIN_SEGMENT_COMMITS", 100)
+    assert _get_validation_segments(git_fetcher) == []
+    monkeypatch.setattr(settings, "TUF_VALIDATION_MAX_WORKERS", 1)
+    monkeypatch.setattr(settings, "TUF_VALIDATION_MIN_SEGMENT_COMMITS", 1)
+    assert _get_validation_segments(git_fetcher) == []
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}, {"name": "target2"}],
+        },
+    ],
+    indirect=True,
+)
+def test_parallel_validation_matches_sequential_validation(
+    origin_auth_repo, monkeypatch
+):
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits, kwargs={"repetitions": 2})
+    setup_manager.add_task(update_expiration_dates, kwargs={"roles": ["root"]})
+    setup_manager.add_task(add_valid_target_commits)
+    setup_manager.execute_tasks()
+
+    segments, commit, error, index = _run_validation(origin_auth_repo, monkeypatch, 2)
+    _, sequential_commit, sequential_error, sequential_index = _run_validation(
+        origin_auth_repo, monkeypatch, 1
+    )
+    assert len(segments) > 1
+    assert error is None and sequential_error is None
+    assert commit == sequential_commit == origin_auth_repo.head_commit()
+    assert index == sequential_index
+
+    # the first invalid commit determines the result
+    last_valid_commit = origin_auth_repo.head_commit()
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(update_timestamp_metadata_invalid_signature)
+    setup_manager.add_task(add_valid_target_commits)
+    setup_manager.execute_tasks()
+
+    segments, commit, error, index = _run_validation(origin_auth_repo, monkeypatch, 2)
+    _, sequential_commit, sequential_error, sequential_index = _run_validation(
+        origin_auth_repo, monkeypatch, 1
+    )
+    assert len(segments) > 1
+    assert commit == sequential_commit == last_valid_commit
+    assert error is not None
+    assert str(error) == str(sequential_error)
+    assert index == sequential_index
+
+
+def test_validation_worker_initialized_with_parent_settings(monkeypatch):
+    monkeypatch.setattr(settings, "strict", True)
+    monkeypatch.setattr(settings, "VALIDATION_CHECKPOINT_INTERVAL", 7)
+    monkeypatch.setattr(settings, "ENABLE_FILE_LOGGING", False)
+    snapshot = pickle.loads(pickle.dumps(_get_settings_snapshot()))
+    assert snapshot["strict"] is True
+    assert snapshot["VALIDATION_CHECKPOINT_INTERVAL"] == 7
+
+    monkeypatch.setattr(settings, "strict", False)
+    monkeypatch.setattr(settings, "VALIDATION_CHECKPOINT_INTERVAL", 100)
+    logging_config = taf_log.get_logging_config()
+    try:
+        _initialize_validation_worker(snapshot, {"console": False, "file": False})
+        assert settings.strict is True
+        assert settings.VALIDATION_CHECKPOINT_INTERVAL == 7
+        assert not taf_log.console_loggers
+        assert not taf_log.file_loggers
+    finally:
+        taf_log.configure_logging(logging_config)
@@ -0,0 +1,169 @@
+from pathlib import Path
+
+import pytest
+
+import taf.settings as settings
+import taf.updater.updater_pipeline as updater_pipeline
+from taf.auth_repo import AuthenticationRepository
+from taf.models.types import Commitish
+from taf.tests.test_updater.conftest import SetupManager, add_valid_target_commits
+from taf.tests.test_updater.update_utils import (
+    clone_repositories,
+    update_and_check_commit_shas,
+)
+from taf.updater.handlers import GitUpdater
+from taf.updater.types.update import OperationType
+from taf.updater.updater_pipeline import _run_tuf_updater
+from taf.updater.validation_checkpoint import ValidationCheckpoint
+
+update_tuf_current_revision = updater_pipeline._update_tuf_current_revision
+
+
+def _create_git_fetcher(auth_repo, monkeypatch, checkpoint_path, base_commit=None):
+    monkeypatch.setitem(settings.validation_repo_path, auth_repo.name, auth_repo.path)
+    monkeypatch.setitem(settings.last_validated_commit, auth_repo.name, base_commit)
+    return GitUpdater(
+        None, auth_repo.path.parent, auth_repo.name, checkpoint_path=checkpoint_path
+    )
+
+
+def _count_validated_commits(monkeypatch, interrupt_at=None):
+    validated = []
+
+    def _update_tuf_current_revision(git_fetcher, *args):
+        if len(validated) == interrupt_at:
+            raise KeyboardInterrupt()
+        validated.append(git_fetcher.current_commit)
+        return update_tuf_current_revision(git_fetcher, *args)
+
+    monkeypatch.setattr(
+        updater_pipeline, "_update_tuf_current_revision", _update_tuf_current_revision
+    )
+    return validated
+
+
+@pytest.fixture
+def checkpoint_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "VALIDATION_CHECKPOINT_INTERVAL", 2)
+    return tmp_path / ValidationCheckpoint.FILENAME
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}, {"name": "target2"}],
+        },
+    ],
+    indirect=True,
+)
+def test_interrupted_validation_resumed_from_checkpoint(
+    origin_auth_repo, checkpoint_path, monkeypatch
+):
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits, kwargs={"repetitions": 3})
+    setup_manager.execute_tasks()
+
+    git_fetcher = _create_git_fetcher(origin_auth_repo, monkeypatch, checkpoint_path)
+    commits = list(git_fetcher.commits)
+    validated = _count_validated_commits(monkeypatch, interrupt_at=3)
+    with pytest.raises(KeyboardInterrupt):
+        _run_tuf_updater(git_fetcher, origin_auth_repo.name)
+    git_fetcher.validation_auth_repo.cleanup()
+    checkpoint = ValidationCheckpoint.load(checkpoint_path)
+    # written after the second commit and once more when interrupted
+    assert checkpoint.commit == validated[-1].hash == commits[3].hash
+    assert checkpoint.base_commit is None
+
+    git_fetcher = _create_git_fetcher(origin_auth_repo, monkeypatch, checkpoint_path)
+    assert git_fetcher.commits == commits
+    assert git_fetcher.checkpoint_commit == commits[3]
+    validated = _count_validated_commits(monkeypatch)
+    last_validated_commit, error = _run_tuf_updater(git_fetcher, origin_auth_repo.name)
+    git_fetcher.validation_auth_repo.cleanup()
+    assert error is None
+    assert last_validated_commit == origin_auth_repo.head_commit()
+    assert validated == commits[4:]
+    assert ValidationCheckpoint.load(checkpoint_path).commit == commits[-1].hash
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}],
+        },
+    ],
+    indirect=True,
+)
+def test_invalid_checkpoint_discarded(origin_auth_repo, checkpoint_path, monkeypatch):
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits, kwargs={"repetitions": 2})
+    setup_manager.execute_tasks()
+    commits = origin_auth_repo.all_commits_on_branch()
+    valid_checkpoint = ValidationCheckpoint(None, commits[2].hash)
+
+    invalid_checkpoints = [
+        # started from a different last validated commit
+        ValidationCheckpoint(commits[1].hash, commits[2].hash),
+        # history was rewritten
+        ValidationCheckpoint(None, "1" * 40),
+        # the last commit is always validated
+        ValidationCheckpoint(None, commits[-1].hash),
+    ]
+    for checkpoint in invalid_checkpoints:
+        checkpoint.save(checkpoint_path)
+        git_fetcher = _create_git_fetcher(
+            origin_auth_repo, monkeypatch, checkpoint_path
+        )
+        git_fetcher.validation_auth_repo.cleanup()
+        assert git_fetcher.checkpoint_commit is None
+        assert git_fetcher.current_commit_index == 0
+        assert not checkpoint_path.exists()
+
+    valid_checkpoint.save(checkpoint_path)
+    git_fetcher = _create_git_fetcher(origin_auth_repo, monkeypatch, checkpoint_path)
+    git_fetcher.validation_auth_repo.cleanup()
+    assert git_fetcher.checkpoint_commit == commits[2]
+
+    monkeypatch.setattr(settings, "VALIDATION_CHECKPOINT_INTERVAL", 0)
+    git_fetcher = _create_git_fetcher(origin_auth_repo, monkeypatch, checkpoint_path)
+    git_fetcher.validation_auth_repo.cleanup()
+    assert git_fetcher.checkpoint_commit is None
+
+
+@pytest.mark.parametrize(
+    "origin_auth_repo",
+    [
+        {
+            "targets_config": [{"name": "target1"}, {"name": "target2"}],
+        },
+    ],
+    indirect=True,
+)
+def test_update_resumes_from_checkpoint(origin_auth_repo, client_dir, monkeypatch):
+    clone_repositories(origin_auth_repo, client_dir)
+    client_auth_repo = AuthenticationRepository(client_dir, origin_auth_repo.name)
+    last_validated_commit = client_auth_repo.last_validated_commit
+
+    setup_manager = SetupManager(origin_auth_repo)
+    setup_manager.add_task(add_valid_target_commits, kwargs={"repetitions": 2})
+    setup_manager.execute_tasks()
+    new_commits = origin_auth_repo.all_commits_since_commit(
+        Commitish.from_hash(last_validated_commit)
+    )
+    checkpoint_commit = new_commits[0]
+    checkpoint_path = Path(client_auth_repo.conf_dir, ValidationCheckpoint.FILENAME)
+    assert checkpoint_path == Path(
+        AuthenticationRepository.get_conf_dir_path(client_auth_repo.path),
+        ValidationCheckpoint.FILENAME,
+    )
+    ValidationCheckpoint(last_validated_commit, checkpoint_commit.hash).save(
+        checkpoint_path
+    )
+
+    validated = _count_validated_commits(monkeypatch)
+    update_and_check_commit_shas(OperationType.UPDATE, origin_auth_repo, client_dir)
+    assert validated == new_commits[1:]
+    # removed once the update succeeds
+    assert not checkpoint_path.exists()
@@ -3,10 +3,15 @@ import os
 import pytest
 from pathlib import Path
 
+from securesystemslib.hash import digest
+
 from taf.utils import (
+    HASH_CHUNK_SIZE,
     TempPartition,
     _background_cleanup_threads,
     format_command_args,
+    get_file_details,
+    get_files_details,
     normalize_line_endings,
     safely_save_json_to_disk,
     safely_move_file,
@@ -45,6 +50,45 @@ def test_normalize_line_ending_no_new_line():
     assert replaced_content == expected_content
 
 
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"text\r\nwith windows line endings\r\n\r\n",
+        b"text\n\n\n",
+        b"x" * HASH_CHUNK_SIZE * 2 + b"\n\n",
+        b"x" * HASH_CHUNK_SIZE * 2 + b"\r\n\n",
+        b"\n" * HASH_CHUNK_SIZE * 2,
+    ],
+    ids=["empty", "crlf", "lf", "large_lf", "large_crlf", "only_new_lines"],
+)
+def test_get_file_details_hashes_normalized_content(tmp_path, content):
+    filepath = tmp_path / "target"
+    filepath.write_bytes(content)
+    expected_hashes = {}
+    for algorithm in ["sha256", "sha512"]:
+        digest_object = digest(algorithm)
+        digest_object.update(normalize_line_endings(content))
+        expected_hashes[algorithm] = digest_object.hexdigest()
+
+    details = get_file_details(str(filepath), ["sha256", "sha512"])
+    assert details == (len(content), expected_hashes)
+    assert get_files_details([str(filepath)] * 3, ["sha256", "sha512"]) == {
+        str(filepath): details
+    }
+
+
+def test_get_files_details_in_thread_pool(tmp_path):
+    filepaths = []
+    for index in range(10):
+        filepath = tmp_path / f"target{index}"
+        filepath.write_text(f"content {index}")
+        filepaths.append(str(filepath))
+    expected = {filepath: get_file_details(filepath) for filepath in filepaths}
+    assert get_files_details(filepaths, max_workers=4) == expected
+    assert get_files_details(filepaths, max_workers=1) == expected
+
+
 def test_safely_save_json_to_disk_new_file(output_path):
     data = {"a": 1, "b": 2}
     dst_path = output_path / "new_test.json"
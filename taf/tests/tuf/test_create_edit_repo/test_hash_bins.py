@@ -0,0 +1,143 @@
+import copy
+import shutil
+
+import pytest
+from tuf.api.exceptions import DownloadHTTPError
+from tuf.ngclient.fetcher import FetcherInterface
+
+from taf.exceptions import RolesKeyDataConversionError, TAFError
+from taf.models.converter import from_dict
+from taf.models.types import RolesKeysData, TargetsRole
+from taf.tuf.repository import MetadataRepository
+from taf.updater.in_memory_updater import InMemoryUpdater
+from taf.utils import on_rm_error
+
+
+class _MetadataDirFetcher(FetcherInterface):
+    """Serves metadata files of a local repository to the TUF updater"""
+
+    def __init__(self, metadata_path):
+        self.metadata_path = metadata_path
+
+    def _fetch(self, url):
+        path = self.metadata_path / url.rsplit("/", 1)[-1]
+        if not path.is_file():
+            raise DownloadHTTPError(f"{url} not found", 404)
+        return iter([path.read_bytes()])
+
+
+def _hash_bins_input(no_yubikeys_input, number_of_bins):
+    roles_input = copy.deepcopy(no_yubikeys_input)
+    roles_input["roles"]["targets"]["delegations"] = {
+        "bins": {"hash_bins": number_of_bins, "number": 2, "threshold": 1}
+    }
+    return roles_input
+
+
+@pytest.fixture
+def hash_bins_repo(tuf_repo_path, signers_with_delegations, no_yubikeys_input):
+    repo = MetadataRepository(tuf_repo_path)
+    roles_keys_data = from_dict(_hash_bins_input(no_yubikeys_input, 16), RolesKeysData)
+    signers = dict(signers_with_delegations, bins=signers_with_delegations["new_role"])
+    repo.create(roles_keys_data, signers)
+    yield repo
+    shutil.rmtree(tuf_repo_path, onerror=on_rm_error)
+
+
+def test_create_hash_bins(hash_bins_repo):
+    bins = [f"bins-{index:x}" for index in range(16)]
+    assert sorted(hash_bins_repo.get_hash_bins("bins")) == bins
+    assert hash_bins_repo.get_hash_bins("bins-3") == hash_bins_repo.get_hash_bins(
+        "bins"
+    )
+    assert sorted(hash_bins_repo.get_all_targets_roles()) == sorted(["targets"] + bins)
+    for bin_name in bins:
+        assert (hash_bins_repo.metadata_path / f"{bin_name}.json").is_file()
+        assert hash_bins_repo.snapshot().meta[f"{bin_name}.json"].version == 1
+        assert hash_bins_repo.find_delegated_roles_parent(bin_name) == "targets"
+        assert hash_bins_repo.get_hash_bins_name(bin_name) == "bins"
+        assert hash_bins_repo.get_role_threshold(bin_name) == 1
+        assert len(hash_bins_repo.get_keyids_of_role(bin_name)) == 2
+        assert hash_bins_repo.check_if_keys_loaded(bin_name)
+
+    succinct_roles = hash_bins_repo.targets().delegations.succinct_roles
+    target_paths = [f"namespace/repo{index}" for index in range(50)]
+    assert hash_bins_repo.map_signing_roles(target_paths) == {
+        path: succinct_roles.get_role_for_target(path) for path in target_paths
+    }
+    description = hash_bins_repo.generate_roles_description()["roles"]["targets"]
+    assert description["delegations"]["bins"]["hash_bins"] == 16
+    assert description["delegations"]["bins"]["number"] == 2
+
+    with pytest.raises(TAFError):
+        hash_bins_repo.add_path_to_delegated_role("bins-3", ["namespace/*"])
+
+
+def test_only_touched_bins_signed_and_validated(hash_bins_repo):
+    target_paths = ["namespace/repo1", "namespace/repo2", "namespace/repo3"]
+    for target_path in target_paths:
+        target_file = hash_bins_repo.targets_path / target_path
+        target_file.parent.mkdir(parents=True, exist_ok=True)
+        target_file.write_text(target_path)
+
+    roles_targets = hash_bins_repo.roles_targets_for_filenames(target_paths)
+    for role, role_target_paths in roles_targets.items():
+        hash_bins_repo.update_target_role(role, role_target_paths)
+    hash_bins_repo.update_snapshot_and_timestamp()
+
+    snapshot_meta = hash_bins_repo.snapshot().meta
+    for bin_name in hash_bins_repo.get_hash_bins("bins"):
+        expected_version = 2 if bin_name in roles_targets else 1
+        assert snapshot_meta[f"{bin_name}.json"].version == expected_version
+    assert snapshot_meta["targets.json"].version == 1
+
+    metadata_path = hash_bins_repo.metadata_path
+    updater = InMemoryUpdater(
+        {"root": (metadata_path / "1.root.json").read_bytes()},
+        str(metadata_path),
+        "metadata/",
+        str(hash_bins_repo.targets_path),
+        "targets/",
+        fetcher=_MetadataDirFetcher(metadata_path),
+    )
+    updater.refresh()
+    for target_path in target_paths:
+        target_info = updater.get_targetinfo(target_path)
+        target_info.verify_length_and_hashes(target_path.encode())
+
+
+def test_add_hash_bins_to_existing_repository(
+    tuf_repo_path, signers_with_delegations, no_yubikeys_input
+):
+    repo = MetadataRepository(tuf_repo_path)
+    repo.create(from_dict(no_yubikeys_input, RolesKeysData), signers_with_delegations)
+    bins_role = TargetsRole(name="bins", parent=TargetsRole(), hash_bins=4, number=2)
+    signers = {"bins": signers_with_delegations["new_role"]}
+    added_roles, _ = repo.create_delegated_roles([bins_role], signers)
+    repo.add_new_roles_to_snapshot(added_roles)
+
+    assert added_roles == ["bins"]
+    assert sorted(repo.get_hash_bins("bins")) == [f"bins-{index}" for index in range(4)]
+    for bin_name in repo.get_hash_bins("bins"):
+        assert repo.snapshot().meta[f"{bin_name}.json"].version == 1
+    assert repo.snapshot().meta["targets.json"].version == 2
+
+    other_role = TargetsRole(name="other", parent=TargetsRole(), paths=["*"], number=2)
+    with pytest.raises(TAFError):
+        repo.create_delegated_roles([other_role], {"other": signers["bins"]})
+    shutil.rmtree(tuf_repo_path, onerror=on_rm_error)
+
+
+@pytest.mark.parametrize(
+    "delegations",
+    [
+        {"bins": {"hash_bins": 12}},
+        {"bins": {"hash_bins": 16, "paths": ["dir/*"]}},
+        {"bins": {"hash_bins": 16}, "other": {"paths": ["dir/*"]}},
+    ],
+)
+def test_invalid_hash_bins_definition(no_yubikeys_input, delegations):
+    roles_input = copy.deepcopy(no_yubikeys_input)
+    roles_input["roles"]["targets"]["delegations"] = delegations
+    with pytest.raises(RolesKeyDataConversionError):
+        from_dict(roles_input, RolesKeysData)
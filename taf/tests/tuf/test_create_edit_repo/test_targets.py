@@ -1,5 +1,9 @@
 from collections import defaultdict
 
+import pytest
+
+from taf.exceptions import SignersNotLoaded, TAFError
+
 
 def test_add_target_files(tuf_repo):
 
@@ -183,3 +187,60 @@ def test_update_target_toles(tuf_repo):
         "sha256" in targets_obj.targets[target_name].hashes
         and "sha512" in targets_obj.targets[target_name].hashes
     )
+
+
+def test_targets_edit_session(tuf_repo):
+    custom = {"custom_attr": "custom_val"}
+    tuf_repo.add_target_files_to_role(
+        {
+            "test1": {"target": "test1", "custom": custom},
+            "test2": {"target": "test2"},
+        }
+    )
+    versions = {
+        role: tuf_repo._signed_obj(role).version
+        for role in ("targets", "delegated_role", "inner_role", "snapshot", "timestamp")
+    }
+
+    with tuf_repo.targets_edit_session(update_snapshot_and_timestamp=True) as session:
+        session.add_target("test1", "updated")
+        session.remove_target("test2")
+        session.add_target("dir1/path1", "test3")
+        session.add_target("dir2/path2", "test4", custom=custom)
+
+    for role, version in versions.items():
+        assert tuf_repo._signed_obj(role).version == version + 1
+    targets = tuf_repo.targets().targets
+    assert targets["test1"].custom == custom
+    assert targets["test1"].length == len("updated")
+    assert "test2" not in targets
+    assert not (tuf_repo.targets_path / "test2").is_file()
+    assert "dir1/path1" in tuf_repo._signed_obj("delegated_role").targets
+    inner_targets = tuf_repo._signed_obj("inner_role").targets
+    assert inner_targets["dir2/path2"].custom == custom
+
+
+def test_targets_edit_session_update_role(tuf_repo):
+    targets_version = tuf_repo.targets().version
+    with tuf_repo.targets_edit_session() as session:
+        session.update_role("targets")
+    assert tuf_repo.targets().version == targets_version + 1
+    assert tuf_repo.snapshot().version == 1
+
+
+def test_targets_edit_session_invalid_changes(tuf_repo):
+    targets_version = tuf_repo.targets().version
+    with pytest.raises(TAFError):
+        with tuf_repo.targets_edit_session() as session:
+            session.add_target("test1", "test1")
+            session.update_role("non_existent_role")
+    assert not (tuf_repo.targets_path / "test1").exists()
+
+    tuf_repo.signer_cache.pop("delegated_role")
+    with pytest.raises(SignersNotLoaded):
+        with tuf_repo.targets_edit_session() as session:
+            session.add_target("test1", "test1")
+            session.add_target("dir1/path1", "test2")
+    assert not (tuf_repo.targets_path / "test1").exists()
+    assert not (tuf_repo.targets_path / "dir1" / "path1").exists()
+    assert tuf_repo.targets().version == targets_version
@@ -1,4 +1,9 @@
 import datetime
+import hashlib
+
+from tuf.api.metadata import Metadata
+
+import taf.settings as settings
 
 from taf.models.types import TargetsRole
 from taf.tuf.keys import _get_legacy_keyid
@@ -257,6 +262,9 @@ def test_revoke_metadata_key(
     assert targets_key1_id not in tuf_repo.root().roles["targets"].keyids
     assert targets_key1_id not in tuf_repo.root().keys
     assert len(tuf_repo._role_obj("targets").keyids) == 1
+    assert tuf_repo.get_public_key_of_keyid(targets_key1_id) is None
+    assert targets_key1_id not in tuf_repo.get_roles_of_keys()
+    assert tuf_repo.find_keysid_roles([targets_key2_id]) == ["targets"]
     assert tuf_repo.root().version == 2
     assert tuf_repo.targets().version == 1
 
@@ -334,3 +342,51 @@ def test_revoke_metadata_key(
     assert tuf_repo.timestamp().version == 4
     assert tuf_repo.snapshot().version == 4
     assert tuf_repo.targets().version == 3
+
+
+def test_close_many_serializes_each_role_once(tuf_repo, monkeypatch):
+    serialized_roles = []
+    to_bytes = Metadata.to_bytes
+
+    def _to_bytes(md, *args, **kwargs):
+        serialized_roles.append(md.signed.type)
+        return to_bytes(md, *args, **kwargs)
+
+    monkeypatch.setattr(Metadata, "to_bytes", _to_bytes)
+    roles = ["root", "targets", "delegated_role"]
+    with tuf_repo.edit_many(roles, update_snapshot_and_timestamp=True) as signed_objs:
+        assert list(signed_objs) == roles
+
+    # root, targets and delegated role, then snapshot and timestamp
+    assert len(serialized_roles) == 5
+    for role in roles + ["snapshot", "timestamp"]:
+        assert tuf_repo.open(role).signed.version == 2
+
+    metadata_path = tuf_repo.metadata_path
+    assert (metadata_path / "2.root.json").read_bytes() == (
+        metadata_path / "root.json"
+    ).read_bytes()
+    snapshot_bytes = (metadata_path / "snapshot.json").read_bytes()
+    assert tuf_repo.snapshot_info.length == len(snapshot_bytes)
+    assert (
+        tuf_repo.snapshot_info.hashes["sha256"]
+        == hashlib.sha256(snapshot_bytes).hexdigest()
+    )
+
+
+def test_sign_metadata_in_parallel(tuf_repo, monkeypatch):
+    roles = ["root", "targets", "delegated_role"]
+    signed_keyids = {}
+    for max_workers in (1, 4):
+        monkeypatch.setattr(settings, "SIGNING_MAX_WORKERS", max_workers)
+        roles_metadata = {role: tuf_repo.open(role) for role in roles}
+        tuf_repo._sign_metadata(roles_metadata)
+        signed_keyids[max_workers] = {
+            role: list(md.signatures) for role, md in roles_metadata.items()
+        }
+        root = roles_metadata["root"]
+        root.verify_delegate("root", root)
+        root.verify_delegate("targets", roles_metadata["targets"])
+    # signatures are added in the same order regardless of the number of threads
+    assert signed_keyids[1] == signed_keyids[4]
+    assert signed_keyids[1]["root"] == list(tuf_repo.signer_cache["root"])
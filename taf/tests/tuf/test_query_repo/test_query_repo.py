@@ -1,6 +1,9 @@
 import pytest
 import datetime
+from pathlib import Path
 from taf.exceptions import TAFError
+from taf.tuf.keys import _get_legacy_keyid
+from taf.tuf.repository import DelegatedPathsMatcher, RoleGraph
 
 
 def test_open(tuf_repo_with_delegations):
@@ -315,3 +318,168 @@ def test_roles_targets_for_filenames(tuf_repo_with_delegations):
         "inner_role": ["dir2/path2"],
         "targets": ["test"],
     }
+
+
+def test_metadata_read_once_and_copied(tuf_repo_with_delegations, monkeypatch):
+    storage_backend = tuf_repo_with_delegations.storage_backend
+    get = storage_backend.get
+    read_files = []
+
+    def _get(filepath):
+        if Path(filepath).parent == tuf_repo_with_delegations.metadata_path:
+            read_files.append(filepath)
+        return get(filepath)
+
+    monkeypatch.setattr(storage_backend, "get", _get)
+    tuf_repo_with_delegations._metadata_cache.clear()
+    for _ in range(3):
+        tuf_repo_with_delegations.get_all_target_files_state()
+        tuf_repo_with_delegations.find_delegated_roles_parent("inner_role")
+    assert read_files and len(read_files) == len(set(read_files))
+
+    # callers get their own copies, which do not affect the cached metadata
+    targets = tuf_repo_with_delegations.signed_obj("targets")
+    targets.delegations.roles["delegated_role"].paths.append("modified")
+    tuf_repo_with_delegations.get_delegations_of_role("targets")[
+        "delegated_role"
+    ].paths.append("modified")
+    assert "modified" not in tuf_repo_with_delegations.get_paths_of_role(
+        "delegated_role"
+    )
+    assert tuf_repo_with_delegations.open("targets").signed is not targets
+
+
+def test_delegated_paths_matcher_compiled_once(tuf_repo_with_delegations):
+    matcher = tuf_repo_with_delegations._get_delegated_paths_matcher()
+    target_paths = ["dir1/file1.txt", "/dir1/sub/file2.txt", "dir2/path2", "dir2"]
+    assert tuf_repo_with_delegations.map_signing_roles(target_paths) == {
+        "dir1/file1.txt": "delegated_role",
+        "/dir1/sub/file2.txt": "delegated_role",
+        "dir2/path2": "inner_role",
+        "dir2": "targets",
+    }
+    assert tuf_repo_with_delegations._get_delegated_paths_matcher() is matcher
+
+
+def test_delegated_paths_matcher_precedence():
+    matcher = DelegatedPathsMatcher(
+        [
+            ("targets", ["*"]),
+            ("second", ["dir/*"]),
+            ("second_inner", ["dir/inner/*"]),
+            ("first", ["dir/inner/*", "other"]),
+            ("no_paths", []),
+        ]
+    )
+    # the last matching role in traversal order is responsible
+    assert matcher.match("dir/inner/file") == "first"
+    assert matcher.match("dir/file") == "second"
+    assert matcher.match("other") == "first"
+    assert matcher.match("another") == "targets"
+
+
+def test_role_graph_built_once(tuf_repo_with_delegations, monkeypatch):
+    role_graph = tuf_repo_with_delegations._get_role_graph()
+    assert role_graph.parents == {
+        "delegated_role": "targets",
+        "inner_role": "delegated_role",
+    }
+    assert role_graph.children["targets"] == ["delegated_role"]
+
+    def _read_only_signed_obj(role):
+        raise AssertionError(f"{role} metadata read")
+
+    monkeypatch.setattr(
+        tuf_repo_with_delegations, "_read_only_signed_obj", _read_only_signed_obj
+    )
+    assert tuf_repo_with_delegations.find_parents_of_roles(
+        ["inner_role", "delegated_role"]
+    ) == {"targets", "delegated_role"}
+    assert tuf_repo_with_delegations.get_all_targets_roles() == role_graph.targets_roles
+    assert tuf_repo_with_delegations.get_role_threshold("inner_role") == 1
+    assert list(tuf_repo_with_delegations.get_delegations_of_role("targets")) == [
+        "delegated_role"
+    ]
+    assert tuf_repo_with_delegations._get_role_graph() is role_graph
+
+
+def test_role_graph_invalidated_when_targets_role_written(tuf_repo_with_delegations):
+    role_graph = tuf_repo_with_delegations._get_role_graph()
+    tuf_repo_with_delegations._invalidate_metadata("timestamp")
+    assert tuf_repo_with_delegations._get_role_graph() is role_graph
+    tuf_repo_with_delegations._invalidate_metadata("delegated_role")
+    rebuilt = tuf_repo_with_delegations._get_role_graph()
+    assert rebuilt is not role_graph
+    assert rebuilt.targets_roles == role_graph.targets_roles
+
+
+def test_role_graph_of_roles_delegated_twice():
+    delegations = {
+        "targets": ["first", "second"],
+        "first": ["shared"],
+        "second": ["shared"],
+        "shared": [],
+    }
+
+    class _Signed:
+        def __init__(self, role):
+            self.delegations = None
+            if delegations[role]:
+                self.delegations = type("_Delegations", (), {})()
+                self.delegations.roles = {
+                    name: type("_Role", (), {"paths": [name]})()
+                    for name in delegations[role]
+                }
+
+    role_graph = RoleGraph(_Signed)
+    # the parent of a role is the first role found delegating to it
+    assert role_graph.targets_roles == ["targets", "second", "shared", "first"]
+    assert role_graph.parents["shared"] == "second"
+    assert role_graph.roles_paths()[0] == ("targets", ["*"])
+
+
+def test_key_index_built_once(
+    tuf_repo_with_delegations, public_keys_with_delegations, monkeypatch
+):
+    key_index = tuf_repo_with_delegations._get_key_index()
+    roles_of_keys = tuf_repo_with_delegations.get_roles_of_keys()
+    for role in tuf_repo_with_delegations.get_all_roles():
+        for key_id in tuf_repo_with_delegations.get_role_keys(role):
+            assert role in roles_of_keys[key_id]
+    for public_key in public_keys_with_delegations["delegated_role"]:
+        key_id = _get_legacy_keyid(public_key)
+        assert key_index.keys[key_id].keyval == public_key.keyval
+        assert key_index.parents[key_id] == "targets"
+
+    def _read_only_signed_obj(role):
+        raise AssertionError(f"{role} metadata read")
+
+    monkeypatch.setattr(
+        tuf_repo_with_delegations, "_read_only_signed_obj", _read_only_signed_obj
+    )
+    inner_key = public_keys_with_delegations["inner_role"][0]
+    inner_key_id = _get_legacy_keyid(inner_key)
+    assert tuf_repo_with_delegations.get_public_key_of_keyid(inner_key_id) == (
+        inner_key.keyval["public"],
+        inner_key.scheme,
+    )
+    assert tuf_repo_with_delegations.get_public_key_of_keyid("unknown") is None
+    assert tuf_repo_with_delegations.find_keysid_roles(
+        [inner_key_id], check_threshold=False
+    ) == ["inner_role"]
+    assert tuf_repo_with_delegations._get_key_index() is key_index
+
+
+def test_key_names_added_to_key_index(tuf_repo_with_delegations):
+    key_id = tuf_repo_with_delegations.get_keyids_of_role("inner_role")[0]
+    tuf_repo_with_delegations.add_key_name("inner", key_id)
+    assert tuf_repo_with_delegations.keys_name_mappings[key_id] == "inner"
+    assert tuf_repo_with_delegations.keys_name_mappings_reverse["inner"] == key_id
+
+    tuf_repo_with_delegations.add_key_name("inner_key", key_id, overwrite=True)
+    assert "inner" not in tuf_repo_with_delegations.keys_name_mappings_reverse
+    # added names are kept when the index is built again
+    tuf_repo_with_delegations._invalidate_metadata("root")
+    assert tuf_repo_with_delegations.get_key_ids_of_key_names(["inner_key"]) == {
+        "inner_key": key_id
+    }
@@ -0,0 +1,82 @@
+import os
+import time
+
+from taf.tuf.target_hashes import CACHE_FILENAME, TargetHashesCache
+from taf.utils import get_file_details
+
+
+def _write_target(targets_path, target_path, content, age=60):
+    filepath = targets_path / target_path
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    filepath.write_text(content)
+    # files modified just before they are hashed are not cached
+    modified = time.time() - age
+    os.utime(filepath, (modified, modified))
+    return filepath
+
+
+def _create_cache(repo_path):
+    return TargetHashesCache.for_repository(repo_path)
+
+
+def test_unchanged_files_hashed_once(tmp_path):
+    (tmp_path / ".git").mkdir()
+    targets_path = tmp_path / "targets"
+    filepath = _write_target(targets_path, "dir/file1.txt", "content 1")
+    _write_target(targets_path, "file2.txt", "content 2")
+
+    cache = _create_cache(tmp_path)
+    expected = get_file_details(str(filepath))
+    assert cache.get_file_details("dir/file1.txt") == expected
+    assert cache.get_file_details("file2.txt")
+    assert (cache.hits, cache.misses) == (0, 2)
+    cache.save()
+    assert (tmp_path / ".git" / "taf" / CACHE_FILENAME).is_file()
+
+    cache = _create_cache(tmp_path)
+    assert cache.get_file_details("dir/file1.txt") == expected
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # same size, different content and modification time
+    _write_target(targets_path, "dir/file1.txt", "content 3", age=30)
+    assert cache.get_file_details("dir/file1.txt") == get_file_details(str(filepath))
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.retain(["file2.txt"])
+    assert list(cache.entries) == ["file2.txt"]
+
+
+def test_recently_modified_files_not_cached(tmp_path):
+    (tmp_path / ".git").mkdir()
+    _write_target(tmp_path / "targets", "file.txt", "content", age=0)
+    cache = _create_cache(tmp_path)
+    cache.get_file_details("file.txt")
+    assert "file.txt" not in cache.entries
+
+
+def test_invalid_cache_ignored_and_verified(tmp_path):
+    (tmp_path / ".git").mkdir()
+    _write_target(tmp_path / "targets", "file.txt", "content")
+    cache = _create_cache(tmp_path)
+    cache.get_file_details("file.txt")
+    assert cache.verify() == []
+
+    cache.entries["file.txt"]["hashes"]["sha256"] = "0" * 64
+    assert cache.verify() == ["file.txt"]
+
+    cache.cache_path.parent.mkdir(parents=True)
+    cache.cache_path.write_text("{not json")
+    cache = _create_cache(tmp_path)
+    assert cache.entries == {}
+    cache.get_file_details("file.txt")
+    assert cache.misses == 1
+
+
+def test_cache_not_persisted_without_git_directory(tmp_path):
+    _write_target(tmp_path / "targets", "file.txt", "content")
+    cache = _create_cache(tmp_path)
+    assert cache.cache_path is None
+    cache.get_file_details("file.txt")
+    cache.save()
+    assert cache.get_file_details("file.txt")
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -10,6 +10,7 @@ from taf.api.targets import (
     export_targets_history,
     update_and_sign_targets,
     update_target_repos_from_repositories_json,
+    verify_target_hashes_cache,
 )
 from taf.constants import DEFAULT_RSA_SIGNATURE_SCHEME
 from taf.exceptions import TAFError
@@ -423,6 +424,34 @@ def update_and_sign_command():
     return update_and_sign
 
 
+def verify_hashes_cache_command():
+    @click.command(
+        help="""Check that lengths and hashes of target files stored in the target hashes cache
+        (.git/taf/target-hashes.json) are correct. The cache is used to avoid hashing target files
+        which did not change when looking for modified target files. Invalid entries are removed.
+        If rebuild is set, the cache is deleted and all target files are hashed again."""
+    )
+    @find_repository
+    @catch_cli_exception(handle=TAFError)
+    @click.option(
+        "--path",
+        default=".",
+        help="Authentication repository's location. If not specified, set to the current directory",
+    )
+    @click.option(
+        "--rebuild",
+        is_flag=True,
+        default=False,
+        help="Delete the cache and hash all target files again",
+    )
+    def verify_hashes_cache(path, rebuild):
+        invalid_target_files = verify_target_hashes_cache(path, rebuild=rebuild)
+        if invalid_target_files:
+            sys.exit(1)
+
+    return verify_hashes_cache
+
+
 def attach_to_group(group):
 
     group.add_command(add_repo_command(), name="add-repo")
@@ -431,3 +460,4 @@ def attach_to_group(group):
     group.add_command(remove_repo_command(), name="remove-repo")
     group.add_command(sign_targets_command(), name="sign")
     group.add_command(update_and_sign_command(), name="update-and-sign")
+    group.add_command(verify_hashes_cache_command(), name="verify-hashes-cache")
@@ -1,22 +1,39 @@
 """TUF metadata repository"""
 
-from fnmatch import fnmatch
+import copy
+import io
+from fnmatch import translate
 from functools import reduce
 import json
 import operator
 import os
+import re
 from pathlib import Path
 import logging
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 import shutil
-from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from contextlib import contextmanager, suppress
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 from securesystemslib.exceptions import StorageError
 from cryptography.hazmat.primitives import serialization
 
-from securesystemslib.signer import Signer
+from securesystemslib.signer import Key, Signature, Signer
 from securesystemslib import hash as sslib_hash
 
+import taf.settings as settings
 from taf import YubikeyMissingLibrary
 
 from securesystemslib.storage import FilesystemBackend
@@ -31,14 +48,13 @@ except ImportError:
 
 from taf.utils import (
     default_backend,
-    get_file_details,
+    map_in_thread_pool,
     on_rm_error,
     normalize_file_line_endings,
 )
 from tuf.api.metadata import (
     Metadata,
     MetaFile,
-    Role,
     Root,
     Snapshot,
     Targets,
@@ -46,12 +62,20 @@ from tuf.api.metadata import (
     Timestamp,
     DelegatedRole,
     Delegations,
+    SuccinctRoles,
 )
+from tuf.api.exceptions import UnsignedMetadataError
 from tuf.api.serialization.json import JSONSerializer
 from taf.exceptions import InvalidKeyError, SignersNotLoaded, TAFError, TargetsError
 from taf.models.types import RolesIterator, RolesKeysData, TargetsRole
-from taf.tuf.keys import SSlibKey, _get_legacy_keyid, get_sslib_key_from_value
-from tuf.repository import Repository
+from taf.tuf.keys import (
+    SSlibKey,
+    YkSigner,
+    _get_legacy_keyid,
+    get_sslib_key_from_value,
+)
+from taf.tuf.target_hashes import TargetHashesCache
+from tuf.repository import AbortEdit, Repository
 
 from securesystemslib.signer import CryptoSigner
 
@@ -63,6 +87,10 @@ TARGETS_DIRECTORY_NAME = "targets"
 
 MAIN_ROLES = ["root", "targets", "snapshot", "timestamp"]
 
+# default custom data of targets added using `TargetsEditSession.add_target`,
+# keeps custom data of already registered targets
+_KEEP_CUSTOM = object()
+
 DISABLE_KEYS_CACHING = False
 HASH_FUNCTION = "sha256"
 HASH_ALGS = ["sha256", "sha512"]
@@ -102,6 +130,235 @@ class EmptyDelegations(Delegations):
         return res_dict
 
 
+class DelegatedPathsMatcher:
+    """
+    Finds roles responsible for target files. Roles are listed in the order
+    in which the delegation tree is traversed and the last role with a
+    matching delegation path is responsible for a file. All glob patterns
+    of a role are compiled into one regular expression, so each file is
+    matched against at most one expression per role, starting from the role
+    which takes precedence. If the responsible role delegates to hash bins,
+    the file is assigned to the bin selected by the hash of its path.
+    """
+
+    def __init__(
+        self,
+        roles_paths: List[Tuple[str, List[str]]],
+        succinct_roles: Optional[Dict[str, SuccinctRoles]] = None,
+    ):
+        self._roles_matchers = []
+        for role, path_patterns in reversed(roles_paths):
+            if not path_patterns:
+                continue
+            regex = "|".join(
+                translate(os.path.normcase(path_pattern.lstrip(os.sep)))
+                for path_pattern in path_patterns
+            )
+            self._roles_matchers.append((role, re.compile(regex).match))
+        self._succinct_roles = succinct_roles or {}
+
+    def match(self, target_filename: str) -> str:
+        """
+        Return the role responsible for the target file, 'targets' if no
+        delegation path matches it
+        """
+        target_path = target_filename.replace(os.sep, "/").lstrip("/")
+        normalized_filename = os.path.normcase(target_filename.lstrip(os.sep))
+        responsible_role = Targets.type
+        for role, match in self._roles_matchers:
+            if match(normalized_filename):
+                responsible_role = role
+                break
+        succinct_roles = self._succinct_roles.get(responsible_role)
+        if succinct_roles is not None:
+            return succinct_roles.get_role_for_target(target_path)
+        return responsible_role
+
+
+class RoleGraph:
+    """
+    Index of the delegation tree of targets roles, built by reading metadata
+    of each targets role once. Holds the parent and delegated roles of each
+    targets role and the delegated role objects (threshold, key ids, paths
+    and terminating flag) defined by their parents. Delegated role objects
+    are shared with the parsed metadata they were read from and must not be
+    modified.
+
+    Bins of hash-bin (succinct) delegations are indexed like other delegated
+    roles, but their metadata is not read, since TAF does not delegate from
+    bins. This keeps building the graph independent of the number of bins.
+    """
+
+    def __init__(self, get_signed_obj: Callable[[str], Targets]):
+        # targets roles in the order in which the delegation tree is traversed
+        self.targets_roles: List[str] = []
+        self.parents: Dict[str, str] = {}
+        self.children: Dict[str, List[str]] = {}
+        self.delegated_roles: Dict[str, DelegatedRole] = {}
+        # delegating role -> its hash-bin delegation
+        self.succinct_roles: Dict[str, SuccinctRoles] = {}
+        # bin -> hash-bin delegation it belongs to
+        self.hash_bins: Dict[str, SuccinctRoles] = {}
+        roles = [Targets.type]
+        while roles:
+            role = roles.pop()
+            if role in self.children:
+                continue
+            self.targets_roles.append(role)
+            if role in self.hash_bins:
+                self.children[role] = []
+                continue
+            signed_obj = get_signed_obj(role)
+            children = []
+            delegations = signed_obj.delegations
+            if delegations and delegations.roles:
+                for name, delegated_role in delegations.roles.items():
+                    children.append(name)
+                    self.parents.setdefault(name, role)
+                    self.delegated_roles.setdefault(name, delegated_role)
+            elif delegations and delegations.succinct_roles:
+                self.succinct_roles[role] = delegations.succinct_roles
+                for name in delegations.succinct_roles.get_roles():
+                    children.append(name)
+                    self.parents.setdefault(name, role)
+                    self.hash_bins.setdefault(name, delegations.succinct_roles)
+            self.children[role] = children
+            roles.extend(children)
+
+    def get_delegated_role(self, role: str) -> Optional[DelegatedRole]:
+        """
+        Return the delegated role object of the specified role, None if it is
+        not a delegated role. Objects of bins are created when first needed,
+        with the keys and threshold of their hash-bin delegation and no paths.
+        """
+        delegated_role = self.delegated_roles.get(role)
+        if delegated_role is None and role in self.hash_bins:
+            succinct_roles = self.hash_bins[role]
+            delegated_role = DelegatedRole(
+                name=role,
+                keyids=succinct_roles.keyids,
+                threshold=succinct_roles.threshold,
+                terminating=True,
+                paths=[],
+            )
+            self.delegated_roles[role] = delegated_role
+        return delegated_role
+
+    def delegations_of_role(self, role: str) -> Dict[str, DelegatedRole]:
+        """
+        Return delegated roles of the specified targets role, keyed by their
+        names. Empty if the role has no delegations or is not a targets role
+        """
+        delegations = {}
+        for child in self.children.get(role, []):
+            delegated_role = self.get_delegated_role(child)
+            if delegated_role is not None:
+                delegations[child] = delegated_role
+        return delegations
+
+    def get_hash_bins(self, name: str) -> List[str]:
+        """
+        Return all bins of the hash-bin delegation with the specified name
+        (the name prefix of its bins), or of the delegation which the specified
+        bin belongs to. Empty if there is no such delegation.
+        """
+        succinct_roles = self.hash_bins.get(name)
+        if succinct_roles is None:
+            succinct_roles = next(
+                (
+                    delegation
+                    for delegation in self.succinct_roles.values()
+                    if delegation.name_prefix == name
+                ),
+                None,
+            )
+        if succinct_roles is None:
+            return []
+        return self.children[self.parents[next(succinct_roles.get_roles())]]
+
+    def roles_paths(self) -> List[Tuple[str, List[str]]]:
+        """
+        Return delegation paths of all targets roles in traversal order,
+        with the top-level targets role responsible for all paths. Bins have
+        no delegation paths and are not listed.
+        """
+        return [(Targets.type, ["*"])] + [
+            (role, self.delegated_roles[role].paths or [])
+            for role in self.targets_roles[1:]
+            if role not in self.hash_bins
+        ]
+
+
+class KeyIndex:
+    """
+    Index of signing keys defined in root metadata and in delegations of
+    targets roles, built from root metadata and the role graph. Holds each
+    key's object, its name if the metadata specifies one, the roles which it
+    can sign and the role whose metadata defines it. Key objects are shared
+    with the parsed metadata they were read from and must not be modified.
+    """
+
+    def __init__(
+        self,
+        root: Root,
+        role_graph: RoleGraph,
+        get_signed_obj: Callable[[str], Targets],
+    ):
+        self.keys: Dict[str, Key] = {}
+        # key id -> role whose metadata defines the key (root or a delegating role)
+        self.parents: Dict[str, str] = {}
+        self.names: Dict[str, str] = {}
+        self.keyids_of_names: Dict[str, str] = {}
+        # role -> (key ids, threshold), in the order of `find_keysid_roles`
+        self.roles: Dict[str, Tuple[List[str], int]] = {}
+        self.roles_of_keys: Dict[str, List[str]] = defaultdict(list)
+
+        self._add_keys(Root.type, root.keys)
+        for role in role_graph.targets_roles:
+            if role_graph.children[role]:
+                delegations = get_signed_obj(role).delegations
+                if delegations is not None and delegations.keys:
+                    self._add_keys(role, delegations.keys)
+
+        roles = [(role, root.roles[role]) for role in MAIN_ROLES]
+        while roles:
+            role, role_obj = roles.pop()
+            if role in self.roles:
+                continue
+            self.roles[role] = (role_obj.keyids, role_obj.threshold)
+            for keyid in role_obj.keyids:
+                self.roles_of_keys[keyid].append(role)
+            if is_delegated_role(role) or role == Targets.type:
+                roles.extend(role_graph.delegations_of_role(role).items())
+
+    def _add_keys(self, role: str, keys: Dict[str, Key]) -> None:
+        for keyid, key in keys.items():
+            self.keys.setdefault(keyid, key)
+            self.parents.setdefault(keyid, role)
+            # names defined by delegating roles take precedence
+            name = (key.unrecognized_fields or {}).get("name")
+            if name is not None:
+                self.names[keyid] = name
+                self.keyids_of_names[name] = keyid
+
+    def find_keysid_roles(
+        self, key_ids: List[str], check_threshold: Optional[bool] = True
+    ) -> List[str]:
+        """
+        Return roles which can be signed by the specified keys, see
+        `MetadataRepository.find_keysid_roles`
+        """
+        signing_key_ids = set(key_ids)
+        keys_roles = []
+        for role, (role_keyids, threshold) in self.roles.items():
+            num_of_signing_keys = len(signing_key_ids.intersection(role_keyids))
+            if (
+                not check_threshold and num_of_signing_keys >= 1
+            ) or num_of_signing_keys >= threshold:
+                keys_roles.append(role)
+        return keys_roles
+
+
 def get_role_metadata_path(role: str) -> str:
     """
     Arguments:
@@ -138,6 +395,139 @@ def is_auth_repo(repo_path: Union[Path, str]) -> bool:
         return False
 
 
+class TargetsEditSession:
+    """
+    Target file additions and removals accumulated in memory and applied to
+    metadata of all affected targets roles at once. Nothing is written until
+    `commit` is called, which validates all changes, writes target files and
+    signs each affected role once, followed by at most one snapshot and
+    timestamp update. Use `MetadataRepository.targets_edit_session`.
+    """
+
+    def __init__(self, repository: "MetadataRepository"):
+        self._repository = repository
+        # target path -> target data, see `MetadataRepository.modify_targets`
+        self._added: Dict[str, Dict] = {}
+        self._removed: Set[str] = set()
+        self._updated_roles: Set[str] = set()
+
+    def add_target(
+        self, target_path: str, target: Any = None, custom: Any = _KEEP_CUSTOM
+    ) -> None:
+        """
+        Add or modify a target file. If target (the file's content) is None,
+        the file on disk is registered as is, or created empty if it does not
+        exist. Unless custom data is specified, custom data of an already
+        registered target is kept.
+        """
+        target_data: Dict[str, Any] = {"target": target}
+        if custom is not _KEEP_CUSTOM:
+            target_data["custom"] = custom
+        self._removed.discard(target_path)
+        self._added[target_path] = target_data
+
+    def add_targets(self, added_data: Dict[str, Dict]) -> None:
+        """
+        Add or modify target files specified like the added data of
+        `MetadataRepository.modify_targets`
+        """
+        for target_path, target_data in added_data.items():
+            self._removed.discard(target_path)
+            self._added[target_path] = {"target": None, "custom": None, **target_data}
+
+    def remove_target(self, target_path: str) -> None:
+        """Remove a target file and unregister it"""
+        self._added.pop(target_path, None)
+        self._removed.add(target_path)
+
+    def update_role(self, role: str) -> None:
+        """Sign the role again, even if none of its target files changed"""
+        self._updated_roles.add(role)
+
+    @property
+    def modified_paths(self) -> List[str]:
+        return list(self._added) + sorted(self._removed)
+
+    def roles_targets(self) -> Dict[str, List[str]]:
+        """Return modified target paths grouped by roles they belong to"""
+        roles_targets = self._repository.roles_targets_for_filenames(
+            self.modified_paths
+        )
+        for role in self._updated_roles:
+            roles_targets.setdefault(role, [])
+        return roles_targets
+
+    def validate(
+        self, update_snapshot_and_timestamp: bool = False
+    ) -> Dict[str, List[str]]:
+        """
+        Check that all affected roles exist and that their signers are loaded
+        and return modified target paths grouped by roles they belong to
+        """
+        roles_targets = self.roles_targets()
+        roles = list(roles_targets)
+        self._repository.verify_roles_exist(roles)
+        if roles and update_snapshot_and_timestamp:
+            roles = roles + [Snapshot.type, Timestamp.type]
+        self._repository.verify_signers_loaded(roles)
+        return roles_targets
+
+    def commit(self, update_snapshot_and_timestamp: bool = False) -> List[str]:
+        """
+        Validate and apply all changes and return the updated roles. Snapshot
+        and timestamp are updated once if update_snapshot_and_timestamp is True.
+        """
+        roles_targets = self.validate(update_snapshot_and_timestamp)
+        roles = list(roles_targets)
+        if not roles:
+            return []
+        repository = self._repository
+        added_data = {
+            target_path: target_data
+            for target_path, target_data in self._added.items()
+            if "custom" in target_data
+        }
+        for target_path, target_data in self._added.items():
+            if "custom" not in target_data:
+                added_data[target_path] = dict(
+                    target_data,
+                    custom=repository.get_target_file_custom_data(target_path),
+                )
+        removed_data: Dict[str, Dict] = {path: {} for path in self._removed}
+        if added_data or removed_data:
+            repository.create_and_remove_target_files(added_data, removed_data)
+
+        target_files = repository._create_target_objects(
+            [
+                (
+                    (repository.targets_path / target_path).absolute(),
+                    target_path,
+                    target_data["custom"],
+                )
+                for target_path, target_data in added_data.items()
+            ]
+        )
+        target_files_by_path = {
+            target_file.path: target_file for target_file in target_files
+        }
+        with repository.edit_many(roles, update_snapshot_and_timestamp) as signed_objs:
+            for role, target_paths in roles_targets.items():
+                targets = cast(Targets, signed_objs[role]).targets
+                for target_path in target_paths:
+                    if target_path in target_files_by_path:
+                        targets[target_path] = target_files_by_path[target_path]
+                    else:
+                        targets.pop(target_path, None)
+        self.discard()
+        return roles
+
+    def discard(self) -> None:
+        """Forget all changes which were not committed"""
+        self._added.clear()
+        self._removed.clear()
+        self._updated_roles.clear()
+
+
 class MetadataRepository(Repository):
     """TUF metadata repository implementation for on-disk top-level roles.
 
@@ -176,29 +566,91 @@ class MetadataRepository(Repository):
         self._metadata_to_keep_open: Set[str] = set()
         self.pin_manager = pin_manager
         self.yubikey_store = YubiKeyStore()
-        self._keys_name_mappings: Optional[Dict[str, str]] = None
+        # names of keys added using `add_key_name`, which might not be
+        # defined in metadata yet
+        self._added_key_names: Dict[str, str] = {}
+        # (key index, key id to name, key name to key id)
+        self._keys_name_mappings: Optional[
+            Tuple[Optional[KeyIndex], Dict[str, str], Dict[str, str]]
+        ] = None
+        # (role, version of its metadata file) -> raw and parsed metadata.
+        # Parsed metadata is shared by read-only queries and never handed out,
+        # `open` and `signed_obj` return copies parsed from the raw bytes
+        self._metadata_cache: OrderedDict = OrderedDict()
+        self._target_hashes_cache: Optional[TargetHashesCache] = None
+        # (versions of targets and snapshot metadata, graph), reset whenever
+        # metadata of a targets role is written
+        self._role_graph: Optional[Tuple[Tuple, RoleGraph]] = None
+        self._delegated_paths_matcher: Optional[
+            Tuple[RoleGraph, DelegatedPathsMatcher]
+        ] = None
+        # (role graph, version of root metadata, index), reset whenever
+        # metadata of root or of a targets role is written
+        self._key_index: Optional[Tuple[RoleGraph, Tuple, KeyIndex]] = None
 
     @property
-    def keys_name_mappings(self):
+    def keys_name_mappings(self) -> Dict[str, str]:
         """
         Key id to key name
         """
-        try:
-            if self._keys_name_mappings is None:
-                self._keys_name_mappings = self.load_key_names()
-        except TAFError:
-            # repository does not exist yet, so no metadata files
-            self._keys_name_mappings = {}
-        return self._keys_name_mappings
+        return self._get_keys_name_mappings()[0]
 
     @property
-    def keys_name_mappings_reverse(self):
+    def keys_name_mappings_reverse(self) -> Optional[Dict[str, str]]:
         """
         Key name to key id
         """
-        if not self.keys_name_mappings:
+        keys_name_mappings_reverse = self._get_keys_name_mappings()[1]
+        if not keys_name_mappings_reverse:
             return None
-        return {value: key for key, value in self.keys_name_mappings.items()}
+        return keys_name_mappings_reverse
+
+    def _get_keys_name_mappings(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Return key names defined in metadata combined with names added using
+        `add_key_name`, keyed by key ids and the reverse mapping. Both are
+        built again when the key index changes.
+        """
+        key_index: Optional[KeyIndex]
+        try:
+            key_index = self._get_key_index()
+        except TAFError:
+            # repository does not exist yet, so no metadata files
+            key_index = None
+        if (
+            self._keys_name_mappings is None
+            or self._keys_name_mappings[0] is not key_index
+        ):
+            names = dict(key_index.names) if key_index is not None else {}
+            names.update(self._added_key_names)
+            self._keys_name_mappings = (
+                key_index,
+                names,
+                {key_name: key_id for key_id, key_name in names.items()},
+            )
+        _, names, key_ids = self._keys_name_mappings
+        return names, key_ids
+
+    def _get_key_index(self) -> KeyIndex:
+        """
+        Return the index of keys defined in root and targets metadata, which is
+        built again after root or a targets role is written or if their
+        metadata changed
+        """
+        role_graph = self._get_role_graph()
+        root_version = self._metadata_version(self.metadata_path / "root.json")
+        if self._key_index is not None:
+            index_graph, index_root_version, key_index = self._key_index
+            if index_graph is role_graph and index_root_version == root_version:
+                return key_index
+        key_index = KeyIndex(
+            self._read_only_signed_obj(Root.type),
+            role_graph,
+            self._read_only_signed_obj,
+        )
+        if root_version is not None:
+            self._key_index = (role_graph, root_version, key_index)
+        return key_index
 
     @property
     def metadata_path(self) -> Path:
@@ -214,6 +666,16 @@ class MetadataRepository(Repository):
         """
         return self.path / TARGETS_DIRECTORY_NAME
 
+    @property
+    def target_hashes_cache(self) -> TargetHashesCache:
+        """
+        Lengths and hashes of target files, which are only computed again
+        if the files changed
+        """
+        if self._target_hashes_cache is None:
+            self._target_hashes_cache = TargetHashesCache.for_repository(self.path)
+        return self._target_hashes_cache
+
     @property
     def targets_infos(self) -> Dict[str, MetaFile]:
         """
@@ -233,10 +695,14 @@ class MetadataRepository(Repository):
             self.add_key_name(key_name, key_id, overwrite=True)
 
     def add_key_name(self, key_name, key_id, overwrite=False):
-        # make sure _keys_name_mappings is initialized
-        self.keys_name_mappings
-        if overwrite or not key_id in self.keys_name_mappings:
-            self._keys_name_mappings[key_id] = key_name
+        keys_name_mappings, keys_name_mappings_reverse = self._get_keys_name_mappings()
+        if overwrite or key_id not in keys_name_mappings:
+            previous_name = keys_name_mappings.get(key_id)
+            if keys_name_mappings_reverse.get(previous_name) == key_id:
+                del keys_name_mappings_reverse[previous_name]
+            self._added_key_names[key_id] = key_name
+            keys_name_mappings[key_id] = key_name
+            keys_name_mappings_reverse[key_name] = key_id
 
     def add_default_names_of_role(self, role_name):
         key_names = self.get_key_names_of_role(role_name)
@@ -321,7 +787,7 @@ class MetadataRepository(Repository):
 
     def add_signers_to_cache(self, roles_signers: Dict):
         for role, signers in roles_signers.items():
-            if self._role_obj(role):
+            if self._role_obj(role) or self.get_hash_bins(role):
                 self._load_role_signers(role, signers)
 
     def add_target_files_to_role(self, added_data: Dict[str, Dict]) -> None:
@@ -351,13 +817,13 @@ class MetadataRepository(Repository):
         """
         if not self.check_if_role_exists(role):
             raise TAFError(f"Role {role} does not exist")
+        self._check_not_hash_bin(role)
 
         parent_role = self.find_delegated_roles_parent(role)
         if parent_role is None:
             return False
         if all(
-            path in self.get_delegations_of_role(parent_role)[role].paths
-            for path in paths
+            path in self._delegations_of_role(parent_role)[role].paths for path in paths
         ):
             return False
         if parent_role:
@@ -371,11 +837,16 @@ class MetadataRepository(Repository):
         """
         Add versions of newly created target roles to the snapshot.
         Also update the versions of their parent roles, which are modified
-        when a new delegated role is added.
+        when a new delegated role is added. Names of hash-bin delegations
+        stand for all of their bins.
         """
         with self.edit(Snapshot.type) as sn:
             parents_of_roles = set()
-            for role in roles:
+            for role in [
+                bin_or_role
+                for role in roles
+                for bin_or_role in self.get_hash_bins(role) or [role]
+            ]:
                 sn.meta[f"{role}.json"] = MetaFile(1)
                 parent_role = self.find_delegated_roles_parent(role)
                 parents_of_roles.add(parent_role)
@@ -395,11 +866,94 @@ class MetadataRepository(Repository):
 
     def open(self, role: str) -> Metadata:
         """Read role metadata from disk."""
+        data, _ = self._read_metadata(role)
+        return Metadata.from_bytes(data)
+
+    def _metadata_version(self, path: Path) -> Optional[Tuple]:
+        """
+        Identify the content of a metadata file without reading it: the commit
+        it is read from when using the git storage backend, or its modification
+        time, size and inode when it is read from the filesystem.
+        None if the file cannot be identified, in which case it is not cached.
+        """
+        commit = getattr(self.storage_backend, "commit", None)
+        if commit is not None:
+            return (self.storage_backend, getattr(commit, "hash", commit))
+        if isinstance(self.storage_backend, FilesystemBackend):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            return (
+                self.storage_backend,
+                stat.st_mtime_ns,
+                stat.st_size,
+                stat.st_ino,
+            )
+        return None
+
+    def _read_metadata(self, role: str) -> Tuple[bytes, Metadata]:
+        """
+        Return raw and parsed metadata of the specified role, read once per
+        version of the metadata file. The parsed metadata is shared and must
+        not be modified.
+        """
+        path = self.metadata_path / f"{role}.json"
+        version = self._metadata_version(path)
+        key = (role, version)
+        if version is not None:
+            cached = self._metadata_cache.get(key)
+            if cached is not None:
+                self._metadata_cache.move_to_end(key)
+                return cached
         try:
-            path = self.metadata_path / f"{role}.json"
-            return Metadata.from_file(path, storage_backend=self.storage_backend)
+            with self.storage_backend.get(str(path)) as file_obj:
+                data = file_obj.read()
         except StorageError:
             raise TAFError(f"Metadata file {path} does not exist")
+        md = Metadata.from_bytes(data)
+        if version is not None and settings.METADATA_CACHE_MAX_ENTRIES > 0:
+            self._metadata_cache[key] = (data, md)
+            while len(self._metadata_cache) > settings.METADATA_CACHE_MAX_ENTRIES:
+                self._metadata_cache.popitem(last=False)
+        return data, md
+
+    def _invalidate_metadata(self, role: str) -> None:
+        """Forget all cached versions of the specified role's metadata"""
+        for key in [key for key in self._metadata_cache if key[0] == role]:
+            del self._metadata_cache[key]
+        if role not in (Root.type, Snapshot.type, Timestamp.type):
+            self._role_graph = None
+        if role not in (Snapshot.type, Timestamp.type):
+            self._key_index = None
+
+    def _get_role_graph(self) -> RoleGraph:
+        """
+        Return the index of the delegation tree. It is built again after a
+        targets role is written, or if targets or snapshot metadata changed
+        (e.g. when reading metadata at a different commit), since snapshot
+        changes whenever a delegated role is updated.
+        """
+        state = tuple(
+            self._metadata_version(self.metadata_path / f"{role}.json")
+            for role in (Targets.type, Snapshot.type)
+        )
+        if self._role_graph is not None:
+            graph_state, graph = self._role_graph
+            if graph_state == state:
+                return graph
+        graph = RoleGraph(self._read_only_signed_obj)
+        if None not in state:
+            self._role_graph = (state, graph)
+        return graph
+
+    def _read_only_signed_obj(self, role: str):
+        """
+        Return the shared, cached signed object of the specified role.
+        Used by queries which do not modify or return it.
+        """
+        _, md = self._read_metadata(role)
+        return md.signed
 
     def calculate_hashes(self, md: Metadata, algorithms: List[str]) -> Dict:
         """
@@ -413,8 +967,11 @@ class MetadataRepository(Repository):
         Return:
             A dcitionary mapping algorithms and calculated hashes
         """
-        hashes = {}
         data = md.to_bytes(serializer=self.serializer)
+        return self._calculate_data_hashes(data, algorithms)
+
+    def _calculate_data_hashes(self, data: bytes, algorithms: List[str]) -> Dict:
+        hashes = {}
         for algo in algorithms:
             digest_object = sslib_hash.digest(algo)
             digest_object.update(data)
@@ -446,6 +1003,13 @@ class MetadataRepository(Repository):
             and len(self.signer_cache[role_name]) >= threshold
         )
 
+    def _check_not_hash_bin(self, role_name: str) -> None:
+        if self.get_hash_bins_name(role_name) is not None:
+            raise TAFError(
+                f"Role {role_name} is a hash bin. Target files are assigned to bins "
+                "based on hashes of their paths, bins have no delegated paths"
+            )
+
     def check_if_role_exists(self, role_name: str) -> bool:
         """
         Given a name of a main or delegated target role, return True if it exist
@@ -537,42 +1101,149 @@ class MetadataRepository(Repository):
 
     def close(self, role: str, md: Metadata) -> None:
         """Bump version and expiry, re-sign, and write role metadata to disk."""
+        self.close_many({role: md})
+
+    def close_many(
+        self,
+        roles_metadata: Dict[str, Metadata],
+        update_snapshot_and_timestamp: Optional[bool] = False,
+    ) -> None:
+        """
+        Bump versions, re-sign and write metadata of several roles. Snapshot
+        is signed and written after all other roles and timestamp after
+        snapshot, while all other roles are signed concurrently. If
+        update_snapshot_and_timestamp is True and neither of them is passed
+        in, snapshot and timestamp are updated once, after all roles are
+        written.
+        """
+        stages: List[List[str]] = [[], [], []]
+        for role in roles_metadata:
+            stages[{Snapshot.type: 1, Timestamp.type: 2}.get(role, 0)].append(role)
+        for stage in stages:
+            stage_metadata = {role: roles_metadata[role] for role in stage}
+            for role, md in stage_metadata.items():
+                self._prepare_metadata_for_signing(role, md)
+            self._sign_metadata(stage_metadata)
+            for role, md in stage_metadata.items():
+                self._write_metadata(role, md)
+
+        if update_snapshot_and_timestamp and not (
+            Snapshot.type in roles_metadata or Timestamp.type in roles_metadata
+        ):
+            self.update_snapshot_and_timestamp(force=False)
+
+    @contextmanager
+    def targets_edit_session(
+        self, update_snapshot_and_timestamp: Optional[bool] = False
+    ) -> Generator[TargetsEditSession, None, None]:
+        """
+        Context manager which yields a `TargetsEditSession` and commits it
+        when it exits. If an error is raised inside the block, or changes are
+        not valid, neither target files nor metadata are modified.
+        """
+        session = TargetsEditSession(self)
+        yield session
+        session.commit(bool(update_snapshot_and_timestamp))
+
+    @contextmanager
+    def edit_many(
+        self, roles: List[str], update_snapshot_and_timestamp: Optional[bool] = False
+    ) -> Generator[Dict[str, Signed], None, None]:
+        """
+        Context manager for editing metadata of several roles, see `edit`.
+        When it exits, all roles are written using `close_many`.
+        """
+        roles_metadata = {role: self.open(role) for role in roles}
+        with suppress(AbortEdit):
+            yield {role: md.signed for role, md in roles_metadata.items()}
+            self.close_many(roles_metadata, update_snapshot_and_timestamp)
 
+    def _prepare_metadata_for_signing(self, role: str, md: Metadata) -> None:
         # expiration date is updated before close is called
         if role not in self._metadata_to_keep_open:
             md.signed.version += 1
+        if role == Snapshot.type:
+            root_version = self._read_only_signed_obj(Root.type).version
+            md.signed.meta["root.json"].version = root_version
+
+    def _sign_metadata(self, roles_metadata: Dict[str, Metadata]) -> None:
+        """
+        Sign metadata of the specified roles with all of their signers.
+        Signatures created using keys loaded from disk are computed in a
+        thread pool (see `taf.settings.SIGNING_MAX_WORKERS`). YubiKey
+        signatures are created one after another in the calling thread, since
+        a YubiKey signs one payload at a time and can prompt for its PIN.
+        Signatures are added in the order of the role's signers.
+        """
+        signing_jobs = []
+        for role, md in roles_metadata.items():
+            md.signatures.clear()
+            payload = md.signed_bytes
+            for signer in self.signer_cache[role].values():
+                signing_jobs.append((md, signer, payload))
+        if not signing_jobs:
+            return
+
+        def _sign(signer: Signer, payload: bytes) -> Signature:
+            try:
+                return signer.sign(payload)
+            except Exception as e:
+                raise UnsignedMetadataError(f"Failed to sign: {e}") from e
+
+        software_jobs = [
+            index
+            for index, (_, signer, _) in enumerate(signing_jobs)
+            if not isinstance(signer, YkSigner)
+        ]
+        max_workers = settings.SIGNING_MAX_WORKERS or None
+        signatures: Dict[int, Any] = {}
+        if len(software_jobs) > 1 and max_workers != 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for index in software_jobs:
+                    _, signer, payload = signing_jobs[index]
+                    signatures[index] = executor.submit(_sign, signer, payload)
+                # sign using YubiKeys while the pool signs using other keys
+                for index, (_, signer, payload) in enumerate(signing_jobs):
+                    if index not in signatures:
+                        signatures[index] = _sign(signer, payload)
+                for index in software_jobs:
+                    signatures[index] = signatures[index].result()
+        else:
+            for index, (_, signer, payload) in enumerate(signing_jobs):
+                signatures[index] = _sign(signer, payload)
 
-        md.signatures.clear()
-        for signer in self.signer_cache[role].values():
-            md.sign(signer, append=True)
+        for index, (md, _, _) in enumerate(signing_jobs):
+            signature = signatures[index]
+            md.signatures[signature.keyid] = signature
 
+    def _write_metadata(self, role: str, md: Metadata) -> None:
+        """
+        Serialize signed metadata once and use the same bytes to update
+        snapshot information and to write the metadata file(s)
+        """
         fname = f"{role}.json"
+        data = md.to_bytes(serializer=self.serializer)
 
         # Track snapshot, targets and root metadata changes, needed in
         # `do_snapshot` and `do_timestamp`
         if role == "snapshot":
             self._snapshot_info.version = md.signed.version
-            self._snapshot_info.hashes = self.calculate_hashes(md, HASH_ALGS)
-            self._snapshot_info.length = self.calculate_length(md)
-            root_version = self.signed_obj("root").version
-            md.signed.meta["root.json"].version = root_version
+            self._snapshot_info.hashes = self._calculate_data_hashes(data, HASH_ALGS)
+            self._snapshot_info.length = len(data)
 
         elif role != "timestamp":  # role in [root, targets, <delegated targets>]
             self._targets_infos[fname].version = md.signed.version
 
         # Write role metadata to disk (root gets a version-prefixed copy)
-        md.to_file(
-            self.metadata_path / fname,
-            serializer=self.serializer,
-            storage_backend=self.storage_backend,
-        )
-
+        self.storage_backend.put(io.BytesIO(data), str(self.metadata_path / fname))
         if role == "root":
-            md.to_file(
-                self.metadata_path / f"{md.signed.version}.{fname}",
-                serializer=self.serializer,
+            FilesystemBackend().put(
+                io.BytesIO(data),
+                str(self.metadata_path / f"{md.signed.version}.{fname}"),
             )
 
+        self._invalidate_metadata(role)
+
     def create(
         self,
         roles_keys_data: RolesKeysData,
@@ -622,11 +1293,23 @@ class MetadataRepository(Repository):
         targets = Targets(delegations=EmptyDelegations())
         target_roles = {"targets": targets}
         delegations_per_parent: Dict[str, Dict] = defaultdict(dict)
+        hash_bins_per_parent: Dict[str, SuccinctRoles] = {}
         for role in RolesIterator(roles_keys_data.roles.targets):
             if role.parent is None:
                 continue
             parent = role.parent.name
-            parent_obj = target_roles.get(parent)
+            if role.hash_bins is not None:
+                succinct_roles = self._create_succinct_roles(
+                    role, list(public_keys[role.name].keys())
+                )
+                hash_bins_per_parent[parent] = succinct_roles
+                for bin_name in succinct_roles.get_roles():
+                    for signer in signers[role.name]:
+                        key_id = _get_legacy_keyid(signer.public_key)
+                        self.signer_cache[bin_name][key_id] = signer
+                    target_roles[bin_name] = Targets(delegations=EmptyDelegations())
+                    sn.meta[f"{bin_name}.json"] = MetaFile(1)
+                continue
             for signer in signers[role.name]:
                 self.signer_cache[role.name][key_id] = signer
             delegated_role = DelegatedRole(
@@ -650,18 +1333,43 @@ class MetadataRepository(Repository):
             delegations = Delegations(roles=role_data, keys=delegated_keys)
             parent_obj.delegations = delegations
 
+        for parent, succinct_roles in hash_bins_per_parent.items():
+            target_roles[parent].delegations = Delegations(
+                keys=dict(public_keys[succinct_roles.name_prefix]),
+                succinct_roles=succinct_roles,
+            )
+
+        roles_metadata: Dict[str, Metadata] = {}
         for signed in [root, Timestamp(), sn, targets]:
             # Setting the version to 0 here is a trick, so that `close` can
             # always bump by the version 1, even for the first time
             self._set_default_expiration_date(signed)
             signed.version = 0  # `close` will bump to initial valid verison 1
-            self.close(signed.type, Metadata(signed))
+            roles_metadata[signed.type] = Metadata(signed)
 
         for name, signed in target_roles.items():
             if name != "targets":
                 self._set_default_expiration_date(signed)
                 signed.version = 0  # `close` will bump to initial valid verison 1
-                self.close(name, Metadata(signed))
+                roles_metadata[name] = Metadata(signed)
+        self.close_many(roles_metadata)
+
+    def _create_succinct_roles(
+        self, role_data: TargetsRole, keyids: List[str]
+    ) -> SuccinctRoles:
+        """
+        Create the hash-bin delegation described by a targets role whose
+        number of hash bins is set. Bins are named after that role.
+        """
+        bit_length = role_data.hash_bins_bit_length
+        if bit_length is None:
+            raise TAFError(f"Role {role_data.name} does not delegate to hash bins")
+        return SuccinctRoles(
+            keyids=keyids,
+            threshold=role_data.threshold,
+            bit_length=bit_length,
+            name_prefix=role_data.name,
+        )
 
     def _process_keys(self, signers, additional_verification_keys):
         public_keys = {}
@@ -712,7 +1420,15 @@ class MetadataRepository(Repository):
         public_keys = self._process_keys(signers, additional_verification_keys)
 
         for parent, parents_roles_data in roles_parents_dict.items():
-            with self.edit(parent) as parent_obj:
+            with self.edit_targets(parent) as parent_obj:
+                delegated_keys: Dict[str, Key] = {}
+                roles: Dict[str, DelegatedRole] = {}
+                succinct_roles: Optional[SuccinctRoles] = None
+                if parent_obj.delegations is not None:
+                    delegated_keys.update(parent_obj.delegations.keys)
+                    roles.update(parent_obj.delegations.roles or {})
+                    succinct_roles = parent_obj.delegations.succinct_roles
+
                 keys_data = {}
                 for role_data in parents_roles_data:
                     for public_key in public_keys[role_data.name].values():
@@ -723,34 +1439,60 @@ class MetadataRepository(Repository):
                                 self.keys_name_mappings[key_id]
                             )
 
+                    if role_data.hash_bins is not None:
+                        if roles or succinct_roles is not None:
+                            raise TAFError(
+                                f"Role {parent} already delegates to other roles "
+                                "and cannot delegate to hash bins"
+                            )
+                        succinct_roles = self._create_succinct_roles(
+                            role_data, list(keys_data.keys())
+                        )
+                        continue
+                    if succinct_roles is not None:
+                        raise TAFError(
+                            f"Role {parent} delegates to hash bins and cannot "
+                            "delegate to other roles"
+                        )
+
                     for signer in signers[role_data.name]:
                         public_key = signer.public_key
                         key_id = _get_legacy_keyid(public_key)
                         self.signer_cache[role_data.name][key_id] = signer
 
-                    delegated_role = DelegatedRole(
+                    roles[role_data.name] = DelegatedRole(
                         name=role_data.name,
                         threshold=role_data.threshold,
                         paths=role_data.paths,
                         terminating=role_data.terminating,
                         keyids=list(keys_data.keys()),
                     )
-                    if parent_obj.delegations is None:
-                        parent_obj.delegations = Delegations(
-                            roles={role_data.name: delegated_role}, keys=keys_data
-                        )
-                    else:
-                        parent_obj.delegations.roles[role_data.name] = delegated_role
-                parent_obj.delegations.keys.update(keys_data)
+                delegated_keys.update(keys_data)
+                # a parent delegates either to hash bins or to other roles
+                parent_obj.delegations = Delegations(
+                    keys=delegated_keys,
+                    roles=roles if succinct_roles is None else None,
+                    succinct_roles=succinct_roles,
+                )
 
+            new_roles_metadata = {}
             for role_data in parents_roles_data:
-                new_role_signed = Targets(delegations=EmptyDelegations())
-                self._set_default_expiration_date(new_role_signed)
-                new_role_signed.version = (
-                    0  # `close` will bump to initial valid verison 1
-                )
-                self.close(role_data.name, Metadata(new_role_signed))
+                new_roles_names = [role_data.name]
+                if role_data.hash_bins is not None:
+                    new_roles_names = self.get_hash_bins(role_data.name)
+                    for bin_name in new_roles_names:
+                        for signer in signers[role_data.name]:
+                            key_id = _get_legacy_keyid(signer.public_key)
+                            self.signer_cache[bin_name][key_id] = signer
+                for role_name in new_roles_names:
+                    new_role_signed = Targets(delegations=EmptyDelegations())
+                    self._set_default_expiration_date(new_role_signed)
+                    new_role_signed.version = (
+                        0  # `close` will bump to initial valid verison 1
+                    )
+                    new_roles_metadata[role_name] = Metadata(new_role_signed)
                 added_roles.append(role_data.name)
+            self.close_many(new_roles_metadata)
         return added_roles, existing_roles
 
     def create_and_remove_target_files(
@@ -824,6 +1566,18 @@ class MetadataRepository(Repository):
             target_file.unrecognized_fields = unrecognized_fields
         return target_file
 
+    def _create_target_objects(
+        self, targets_data: List[Tuple[Path, str, Optional[Dict]]]
+    ) -> List[TargetFile]:
+        """
+        Create TUF target objects of (filesystem path, target path, custom data)
+        tuples, hashing the files in a thread pool
+        """
+        return map_in_thread_pool(
+            lambda target_data: self._create_target_object(*target_data),
+            targets_data,
+        )
+
     def delete_unregistered_target_files(self, targets_role="targets"):
         """
         Delete all target files not specified in targets.json
@@ -842,26 +1596,19 @@ class MetadataRepository(Repository):
         """
         Find parent role of the specified delegated targets role
         """
-        parents = ["targets"]
-
-        while parents:
-            parent = parents.pop()
-            for delegation in self.get_delegations_of_role(parent):
-                if delegation == delegated_role:
-                    return parent
-                parents.append(delegation)
-        return None
+        return self._get_role_graph().parents.get(delegated_role)
 
     def find_parents_of_roles(self, roles: List[str]):
         """
         Find parents of all roles contained by the specified list of roles.
         """
         parents = set()
+        role_graph = self._get_role_graph()
         for role in roles:
             if role in MAIN_ROLES:
                 parents.add("root")
             else:
-                parent = self.find_delegated_roles_parent(role)
+                parent = role_graph.parents.get(role)
                 if parent is None:
                     raise TAFError(f"Could not determine parent of role {role}")
                 parents.add(parent)
@@ -879,18 +1626,48 @@ class MetadataRepository(Repository):
         """
         Return a dictionary of delegated roles of the specified target role
         """
-        signed_obj = self.signed_obj(role_name)
-        if signed_obj.delegations:
+        return copy.deepcopy(self._delegations_of_role(role_name))
+
+    def _delegations_of_role(self, role_name: str) -> Dict:
+        """
+        Return the dictionary of delegated roles of the specified target
+        role. Delegated role objects are shared and must not be modified
+        """
+        role_graph = self._get_role_graph()
+        if role_name in role_graph.children:
+            return role_graph.delegations_of_role(role_name)
+        signed_obj = self._read_only_signed_obj(role_name)
+        if signed_obj.delegations and signed_obj.delegations.roles:
             return signed_obj.delegations.roles
         return {}
 
+    def get_hash_bins(self, name: str) -> List[str]:
+        """
+        Return names of all bins of the specified hash-bin delegation, or of
+        the delegation which the specified bin belongs to. Empty if the name
+        is neither a hash-bin delegation's name nor a bin.
+        """
+        return list(self._get_role_graph().get_hash_bins(name))
+
+    def get_hash_bins_name(self, role_name: str) -> Optional[str]:
+        """
+        Return the name of the hash-bin delegation which the specified role is
+        a bin of (the name of the role used to create the bins), None if it is
+        not a bin. Bins are signed using keys of that name.
+        """
+        succinct_roles = self._get_role_graph().hash_bins.get(role_name)
+        if succinct_roles is None:
+            return None
+        return succinct_roles.name_prefix
+
     def get_key_names_of_role(self, role_name: str) -> List:
         keys_name_mapping = self.keys_name_mappings
+        default_name = self.get_hash_bins_name(role_name) or role_name
         key_names = []
         num_of_keys_without_name = 0
-        number = len(self.get_keyids_of_role(role_name))
+        key_ids = self.get_keyids_of_role(role_name)
+        number = len(key_ids)
         if keys_name_mapping:
-            key_ids = self.get_keyids_of_role(role_name)
             for key_id in key_ids:
                 if key_id in keys_name_mapping:
                     key_names.append(keys_name_mapping[key_id])
@@ -900,15 +1677,15 @@ class MetadataRepository(Repository):
             num_of_keys_without_name = number
 
         if not len(key_names) and number == 1:
-            return [role_name]
+            return [default_name]
 
         for num in range(number - num_of_keys_without_name, number):
-            key_names.append(f"{role_name}{num + 1}")
+            key_names.append(f"{default_name}{num + 1}")
         return key_names
 
     def get_key_ids_of_key_names(self, key_names: List[str]):
         key_name_keys = {}
-        reverse_mapping = self.keys_name_mappings_reverse
+        reverse_mapping = self.keys_name_mappings_reverse or {}
         for key_name in key_names:
             if key_name in reverse_mapping:
                 keyid = reverse_mapping[key_name]
@@ -926,10 +1703,9 @@ class MetadataRepository(Repository):
         """
         Return all delegated paths of the specified target role
         """
-        parent = self.find_delegated_roles_parent(role_name)
-        if parent:
-            parent_obj = self.signed_obj(parent)
-            return parent_obj.delegations.roles[role_name].paths
+        delegated_role = self._get_role_graph().get_delegated_role(role_name)
+        if delegated_role is not None:
+            return list(delegated_role.paths or [])
         return []
 
     def get_targets_of_role(self, role_name: str):
@@ -957,26 +1733,17 @@ class MetadataRepository(Repository):
         of keys that can sign that file is equal to or greater than the role's
         threshold
         """
-        roles: List[Tuple[str, Optional[str]]] = []
-        for role in MAIN_ROLES:
-            roles.append((role, None))
-        keys_roles = []
-        while roles:
-            role_name, parent = roles.pop()
-            role_obj = self._role_obj(role_name, parent)
-            target_roles_key_ids = role_obj.keyids
-            threshold = role_obj.threshold
-            num_of_signing_keys = len(set(target_roles_key_ids).intersection(key_ids))
-            if (
-                not check_threshold and num_of_signing_keys >= 1
-            ) or num_of_signing_keys >= threshold:
-                keys_roles.append(role_name)
-
-            if role_name not in MAIN_ROLES or role_name == "targets":
-                for delegation in self.get_delegations_of_role(role_name):
-                    roles.append((delegation, role_name))
+        return self._get_key_index().find_keysid_roles(key_ids, check_threshold)
 
-        return keys_roles
+    def get_roles_of_keys(self) -> Dict[str, List[str]]:
+        """
+        Return all roles whose metadata files can be signed by each key,
+        keyed by key ids. Thresholds are not taken into account.
+        """
+        return {
+            key_id: list(roles)
+            for key_id, roles in self._get_key_index().roles_of_keys.items()
+        }
 
     def find_associated_roles_of_key(self, public_key: SSlibKey) -> List:
         """
@@ -997,15 +1764,7 @@ class MetadataRepository(Repository):
         """
         Return a list containing names of all target roles
         """
-        target_roles = ["targets"]
-        all_roles = []
-        while target_roles:
-            role = target_roles.pop()
-            all_roles.append(role)
-            for delegation in self.get_delegations_of_role(role):
-                target_roles.append(delegation)
-
-        return all_roles
+        return list(self._get_role_graph().targets_roles)
 
     def get_all_target_files_state(self) -> Tuple:
         """Create dictionaries of added/modified and removed files by comparing current
@@ -1028,9 +1787,11 @@ class MetadataRepository(Repository):
         signed_target_files = self.get_signed_target_files()
 
         # existing files with custom data and (modified) content
+        target_hashes_cache = self.target_hashes_cache
+        files_details = target_hashes_cache.get_files_details(fs_target_files)
         for file_name in fs_target_files:
             target_file = self.targets_path / file_name
-            _, hashes = get_file_details(str(target_file))
+            _, hashes = files_details[file_name]
             # register only new or changed files
             if hashes.get(HASH_FUNCTION) != self.get_target_file_hashes(file_name):
                 custom = self.get_target_file_custom_data(file_name)
@@ -1044,6 +1805,9 @@ class MetadataRepository(Repository):
         for file_name in signed_target_files - fs_target_files:
             removed_target_files[file_name] = {}
 
+        target_hashes_cache.retain(fs_target_files)
+        target_hashes_cache.save()
+
         return added_target_files, removed_target_files
 
     def get_expiration_date(self, role: str) -> datetime:
@@ -1164,7 +1928,7 @@ class MetadataRepository(Repository):
         return set(
             reduce(
                 operator.iconcat,
-                [self.signed_obj(role).targets.keys() for role in roles],
+                [self._read_only_signed_obj(role).targets.keys() for role in roles],
                 [],
             )
         )
@@ -1204,9 +1968,9 @@ class MetadataRepository(Repository):
             role = self.get_role_from_target_paths([target_path])
             if role is None:
                 return None
-            target_obj = self.get_targets_of_role(role).get(target_path)
+            target_obj = self._read_only_signed_obj(role).targets.get(target_path)
             if target_obj:
-                return target_obj.custom
+                return copy.deepcopy(target_obj.custom)
             return None
         except KeyError:
             raise TAFError(f"Target {target_path} does not exist")
@@ -1224,7 +1988,7 @@ class MetadataRepository(Repository):
             role = self.get_role_from_target_paths([target_path])
             if role is None:
                 return None
-            targets_of_role = self.get_targets_of_role(role)
+            targets_of_role = self._read_only_signed_obj(role).targets
             if target_path not in targets_of_role:
                 return None
             hashes = targets_of_role[target_path].hashes
@@ -1283,28 +2047,15 @@ class MetadataRepository(Repository):
         except Exception:
             return None
 
-    def get_public_key_of_keyid(self, keyid: str):
-        def _find_keyid(role_name, keyid):
-            _, pub_key_pem, scheme = self.get_key_length_and_scheme_from_metadata(
-                role_name, keyid
-            )
-            if pub_key_pem is not None:
-                return pub_key_pem, scheme
-
-            for delegation in self.get_delegations_of_role(role_name):
-                pub_key_pem, scheme = self._find_keyid(delegation, keyid)
-                if pub_key_pem is not None:
-                    return pub_key_pem, scheme
-
-        _, pub_key_pem, scheme = self.get_key_length_and_scheme_from_metadata(
-            "root", keyid
-        )
-        if pub_key_pem is not None:
-            return pub_key_pem, scheme
-
-        targets_obj = self.signed_obj("targets")
-        if targets_obj.delegations:
-            return _find_keyid("targets", keyid)
+    def get_public_key_of_keyid(self, keyid: str) -> Optional[Tuple[str, str]]:
+        """
+        Return the public key (in PEM format) and the signing scheme of the
+        specified key id, None if no role's metadata defines the key
+        """
+        key = self._get_key_index().keys.get(keyid)
+        if key is None:
+            return None
+        return key.keyval["public"], key.scheme
 
     def generate_roles_description(self) -> Dict:
         """
@@ -1313,15 +2064,31 @@ class MetadataRepository(Repository):
         if it is a target role, key scheme, key lengths.
         """
         roles_description = {}
+        role_graph = self._get_role_graph()
 
         def _get_delegations(role_name):
             delegations_info = {}
-            for delegation in self.get_delegations_of_role(role_name):
-                delegated_role = self._role_obj(delegation)
+            succinct_roles = role_graph.succinct_roles.get(role_name)
+            if succinct_roles is not None:
+                # described like the role used to create the bins
+                pub_key, _, scheme = self.get_key_length_and_scheme_from_metadata(
+                    role_name, succinct_roles.keyids[0]
+                )
+                delegations_info[succinct_roles.name_prefix] = {
+                    "threshold": succinct_roles.threshold,
+                    "number": len(succinct_roles.keyids),
+                    "hash_bins": succinct_roles.number_of_bins,
+                    "scheme": scheme,
+                    "length": pub_key.key_size,
+                }
+                return delegations_info
+            for delegation, delegated_role in role_graph.delegations_of_role(
+                role_name
+            ).items():
                 delegations_info[delegation] = {
                     "threshold": delegated_role.threshold,
                     "number": len(delegated_role.keyids),
-                    "paths": delegated_role.paths,
+                    "paths": copy.copy(delegated_role.paths),
                     "terminating": delegated_role.terminating,
                 }
                 pub_key, _, scheme = self.get_key_length_and_scheme_from_metadata(
@@ -1330,8 +2097,7 @@ class MetadataRepository(Repository):
 
                 delegations_info[delegation]["scheme"] = scheme
                 delegations_info[delegation]["length"] = pub_key.key_size
-                delegated_signed = self.signed_obj(delegation)
-                if delegated_signed.delegations:
+                if role_graph.children[delegation]:
                     inner_roles_data = _get_delegations(delegation)
                     if len(inner_roles_data):
                         delegations_info[delegation]["delegations"] = inner_roles_data
@@ -1349,8 +2115,7 @@ class MetadataRepository(Repository):
             roles_description[role_name]["scheme"] = scheme
             roles_description[role_name]["length"] = pub_key.key_size
             if role_name == "targets":
-                targets_signed = self.signed_obj(role_name)
-                if targets_signed.delegations:
+                if role_graph.children[role_name]:
                     delegations_info = _get_delegations(role_name)
                     if len(delegations_info):
                         roles_description[role_name]["delegations"] = delegations_info
@@ -1437,11 +2202,14 @@ class MetadataRepository(Repository):
         - InvalidKeyError: If metadata cannot be signed with given key.
         """
 
+        # all bins of a hash-bin delegation are signed using the same keys
+        roles = self.get_hash_bins(role) or [role]
         for signer in signers:
             key = signer.public_key
-            if not self.is_valid_metadata_key(role, key):
+            if not self.is_valid_metadata_key(roles[0], key):
                 raise InvalidKeyError(role)
-            self.signer_cache[role][key.keyid] = signer
+            for role_name in roles:
+                self.signer_cache[role_name][key.keyid] = signer
 
     def map_signing_roles(self, target_filenames: List) -> Dict:
         """
@@ -1454,25 +2222,27 @@ class MetadataRepository(Repository):
         pattern.
         """
 
-        roles = ["targets"]
-        roles_targets = {
-            target_filename: "targets" for target_filename in target_filenames
+        matcher = self._get_delegated_paths_matcher()
+        return {
+            target_filename: matcher.match(target_filename)
+            for target_filename in target_filenames
         }
-        while roles:
-            role = roles.pop()
-            path_patterns = self.get_role_paths(role)
-            for path_pattern in path_patterns:
-                for target_filename in target_filenames:
-                    if fnmatch(
-                        target_filename.lstrip(os.sep),
-                        path_pattern.lstrip(os.sep),
-                    ):
-                        roles_targets[target_filename] = role
-
-            for delegation in self.get_delegations_of_role(role):
-                roles.append(delegation)
 
-        return roles_targets
+    def _get_delegated_paths_matcher(self) -> DelegatedPathsMatcher:
+        """
+        Return a matcher of the current delegation paths. It is compiled again
+        only if the delegation tree was rebuilt since it was last compiled.
+        """
+        role_graph = self._get_role_graph()
+        if self._delegated_paths_matcher is not None:
+            compiled_from, matcher = self._delegated_paths_matcher
+            if compiled_from is role_graph:
+                return matcher
+        matcher = DelegatedPathsMatcher(
+            role_graph.roles_paths(), role_graph.succinct_roles
+        )
+        self._delegated_paths_matcher = (role_graph, matcher)
+        return matcher
 
     def modify_targets(
         self, added_data: Optional[Dict] = None, removed_data: Optional[Dict] = None
@@ -1521,42 +2291,24 @@ class MetadataRepository(Repository):
             )
         _, removed_paths = self.create_and_remove_target_files(added_data, removed_data)
 
-        target_files = []
-        for path, target_data in added_data.items():
-            target_path = (self.targets_path / path).absolute()
-            custom = target_data.get("custom", None)
-            target_file = self._create_target_object(target_path, path, custom)
-            target_files.append(target_file)
+        target_files = self._create_target_objects(
+            [
+                ((self.targets_path / path).absolute(), path, target_data.get("custom"))
+                for path, target_data in added_data.items()
+            ]
+        )
 
         targets_role = self._modify_targets_role(
             target_files, removed_paths, targets_role
         )
         return targets_role
 
-    def load_key_names(self):
-        def _get_keys_of_delegations(role_name):
-            keys = {}
-            role_keys = self.get_key_names_from_metadata(role_name)
-            if role_keys is not None:
-                keys.update(role_keys)
-
-            for delegation in self.get_delegations_of_role(role_name):
-                delegated_signed = self.signed_obj(delegation)
-                if delegated_signed.delegations:
-                    inner_roles_keys = _get_keys_of_delegations(delegation)
-                    if inner_roles_keys:
-                        keys.update(inner_roles_keys)
-            return keys
-
-        root_metadata = self.signed_obj("root")
-        name_mapping = {}
-        keys = root_metadata.keys
-        for key_id, key_obj in keys.items():
-            name_data = key_obj.unrecognized_fields
-            if name_data is not None and "name" in name_data:
-                name_mapping[key_id] = name_data["name"]
-        name_mapping.update(_get_keys_of_delegations("targets"))
-        return name_mapping
+    def load_key_names(self) -> Dict[str, str]:
+        """
+        Return names of keys defined in root and targets metadata, keyed by
+        key ids
+        """
+        return dict(self._get_key_index().names)
 
     def _modify_targets_role(
         self,
@@ -1648,6 +2400,7 @@ class MetadataRepository(Repository):
 
             if not self.check_if_role_exists(role):
                 raise TAFError(f"Role {role} does not exist")
+            self._check_not_hash_bin(role)
 
             parent_role = self.find_delegated_roles_parent(role)
             if parent_role is None:
@@ -1688,45 +2441,38 @@ class MetadataRepository(Repository):
         Return TUF's role object for the specified role
         """
         if role in MAIN_ROLES:
-            md = self.open("root")
+            root = self._read_only_signed_obj("root")
             try:
-                data = md.to_dict()["signed"]["roles"][role]
-                return Role.from_dict(data)
-            except (KeyError, ValueError):
+                return copy.deepcopy(root.roles[role])
+            except (AttributeError, KeyError):
                 raise TAFError("root.json is invalid")
         else:
-            parent_name = self.find_delegated_roles_parent(role)
-            if parent_name is None:
+            delegated_role = self._get_role_graph().get_delegated_role(role)
+            if delegated_role is None:
                 return None
-            md = self.open(parent_name)
-            delegations_data = md.to_dict()["signed"]["delegations"]["roles"]
-            for delegation in delegations_data:
-                if delegation["name"] == role:
-                    try:
-                        return DelegatedRole.from_dict(delegation)
-                    except (KeyError, ValueError):
-                        raise TAFError(f"{delegation}.json is invalid")
-            return None
+            return copy.deepcopy(delegated_role)
 
     def signed_obj(self, role: str):
         """
         Return TUF's signed object for the specified role
         """
-        md = self.open(role)
-        return self._signed_obj(role, md)
+        return self._signed_obj(role)
 
     def _signed_obj(self, role: str, md=None):
+        role_to_role_class = {
+            "root": Root,
+            "targets": Targets,
+            "snapshot": Snapshot,
+            "timestamp": Timestamp,
+        }
+        role_class = role_to_role_class.get(role, Targets)
         if md is None:
             md = self.open(role)
+            if isinstance(md.signed, role_class):
+                # parsed by open and not shared, no need to copy it
+                return md.signed
         try:
             signed_data = md.to_dict()["signed"]
-            role_to_role_class = {
-                "root": Root,
-                "targets": Targets,
-                "snapshot": Snapshot,
-                "timestamp": Timestamp,
-            }
-            role_class = role_to_role_class.get(role, Targets)
             return role_class.from_dict(signed_data)
         except (KeyError, ValueError):
             raise TAFError(f"Invalid metadata file {role}.json")
@@ -1771,16 +2517,29 @@ class MetadataRepository(Repository):
         - securesystemslib.exceptions.UnknownRoleError: If 'rolename' has not been delegated by
                                                         this targets object.
         """
-        self.verify_signers_loaded([role_name])
-        with self.edit(role_name) as role:
+        self.set_metadata_expiration_dates([role_name], start_date, interval)
+
+    def set_metadata_expiration_dates(
+        self,
+        role_names: List[str],
+        start_date: Optional[datetime] = None,
+        interval: Optional[int] = None,
+    ) -> None:
+        """Set expiration dates of the provided roles, see `set_metadata_expiration_date`.
+        All roles are signed and written at once, snapshot and timestamp (if listed)
+        after all other roles.
+        """
+        self.verify_signers_loaded(role_names)
+        with self.edit_many(role_names) as roles:
             start_date = datetime.now(timezone.utc)
-            if interval is None:
-                try:
-                    interval = self.expiration_intervals[role_name]
-                except KeyError:
-                    interval = self.expiration_intervals["targets"]
-            expiration_date = start_date + timedelta(days=interval)
-            role.expires = expiration_date
+            for role_name, role in roles.items():
+                role_interval = interval
+                if role_interval is None:
+                    try:
+                        role_interval = self.expiration_intervals[role_name]
+                    except KeyError:
+                        role_interval = self.expiration_intervals["targets"]
+                role.expires = start_date + timedelta(days=role_interval)
 
     def sort_roles_targets_for_filenames(self):
         """
@@ -1840,7 +2599,7 @@ class MetadataRepository(Repository):
             raise TAFError(f"Role {role} does not exist")
         self.verify_signers_loaded([role])
         removed_paths = []
-        target_files = []
+        targets_data = []
         if target_paths:
             for target_path in target_paths:
                 full_path = self.path / TARGETS_DIRECTORY_NAME / target_path
@@ -1849,11 +2608,9 @@ class MetadataRepository(Repository):
                     removed_paths.append(target_path)
                 else:
                     custom_data = self.get_target_file_custom_data(target_path)
-                    target_file = self._create_target_object(
-                        full_path, target_path, custom_data
-                    )
-                    target_files.append(target_file)
+                    targets_data.append((full_path, target_path, custom_data))
 
+            target_files = self._create_target_objects(targets_data)
             self._modify_targets_role(target_files, removed_paths, role)
         elif force:
             with self.edit(role) as _:
@@ -1,8 +1,12 @@
+from collections import OrderedDict
 from contextlib import contextmanager
 import io
+import os
 from pathlib import Path
-from typing import IO, Dict, Optional
+import threading
+from typing import IO, Optional
 import pygit2
+import taf.settings as settings
 from taf.constants import METADATA_DIRECTORY_NAME
 from taf.exceptions import GitError, TAFError
 from taf.git import GitRepository
@@ -12,7 +16,86 @@ from securesystemslib.storage import FilesystemBackend
 from securesystemslib.exceptions import StorageError
 from taf.models.types import Commitish
 
-git_repos_cache: Dict[str, GitRepository] = {}
+
+class GitRepositoriesCache:
+    """
+    Thread-safe, bounded cache of repositories which contain files read by
+    GitStorageBackend, keyed by their resolved paths.
+
+    A path is resolved (which accesses the filesystem) only the first time it
+    is looked up. The repository is then found by looking up the resolved path
+    and its parents, so the longest matching repository path is found without
+    scanning all cached repositories. Least recently used repositories and
+    resolved paths are evicted first.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_resolved_paths: Optional[int] = None,
+    ):
+        if max_entries is None:
+            max_entries = settings.GIT_REPOS_CACHE_MAX_ENTRIES
+        if max_resolved_paths is None:
+            max_resolved_paths = settings.RESOLVED_PATHS_CACHE_MAX_ENTRIES
+        self.max_entries = max_entries
+        self.max_resolved_paths = max_resolved_paths
+        self._repos: OrderedDict = OrderedDict()
+        self._resolved_paths: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, path) -> bool:
+        with self._lock:
+            return str(path) in self._repos
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._repos)
+
+    def _resolve(self, path) -> str:
+        key = str(path)
+        with self._lock:
+            resolved = self._resolved_paths.get(key)
+            if resolved is not None:
+                self._resolved_paths.move_to_end(key)
+                return resolved
+        resolved = str(Path(path).resolve())
+        with self._lock:
+            self._resolved_paths[key] = resolved
+            while len(self._resolved_paths) > self.max_resolved_paths:
+                self._resolved_paths.popitem(last=False)
+        return resolved
+
+    def find(self, inner_path) -> Optional[GitRepository]:
+        """Return the cached repository which contains inner_path, if any"""
+        path = self._resolve(inner_path)
+        with self._lock:
+            while True:
+                repo = self._repos.get(path)
+                if repo is not None:
+                    self._repos.move_to_end(path)
+                    return repo
+                parent = os.path.dirname(path)
+                if parent == path:
+                    return None
+                path = parent
+
+    def add(self, repo: GitRepository) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._repos[str(repo.path)] = repo
+            self._repos.move_to_end(str(repo.path))
+            while len(self._repos) > self.max_entries:
+                self._repos.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._repos.clear()
+            self._resolved_paths.clear()
+
+
+git_repos_cache = GitRepositoriesCache()
 
 
 def is_subpath(path, potential_subpath):
@@ -33,9 +116,9 @@ def find_git_repository(inner_path):
     Enables smoother integration with TUF's default
     FilesystemBackend implementation
     """
-    for path in list(git_repos_cache.keys()):
-        if is_subpath(path, inner_path):
-            return git_repos_cache[path]
+    repo = git_repos_cache.find(inner_path)
+    if repo is not None:
+        return repo
     repo_path = pygit2.discover_repository(inner_path)
     repo = None
     if not repo_path:
@@ -53,7 +136,7 @@ def find_git_repository(inner_path):
         repo = GitRepository(path=repo_path)
 
     if repo:
-        git_repos_cache[repo.path] = repo
+        git_repos_cache.add(repo)
     return repo
 
 
@@ -73,37 +156,69 @@ class GitStorageBackend(FilesystemBackend):
         # parallel update of multiple repositories
         return super(FilesystemBackend, cls).__new__(cls, *args, **kwargs)
 
+    def __init__(self, max_files: Optional[int] = None):
+        if max_files is None:
+            max_files = settings.STORAGE_FILES_CACHE_MAX_ENTRIES
+        self.max_files = max_files
+        # (commit hash, file path) -> raw content of the file at that commit.
+        # Contents of a file at a commit never change, so entries are only
+        # evicted to bound memory usage
+        self._files: OrderedDict = OrderedDict()
+        self._files_lock = threading.Lock()
+
+    def _get_cached_file(self, commit: Commitish, filepath: str) -> Optional[bytes]:
+        key = (commit.hash, filepath)
+        with self._files_lock:
+            data = self._files.get(key)
+            if data is not None:
+                self._files.move_to_end(key)
+            return data
+
+    def _read_file(self, commit: Commitish, filepath: str) -> bytes:
+        data = self._get_cached_file(commit, filepath)
+        if data is not None:
+            return data
+        repo = find_git_repository(filepath)
+        relative_path = Path(filepath).relative_to(repo.path)
+        data = repo.get_file(commit, relative_path, raw=True)
+        if self.max_files > 0:
+            with self._files_lock:
+                self._files[(commit.hash, filepath)] = data
+                while len(self._files) > self.max_files:
+                    self._files.popitem(last=False)
+        return data
+
     @contextmanager
     def get(self, filepath: str):
         # If the commit is specified, read from Git.
         # If it is not specified, read from the filesystem.
-        if self.commit is None:
+        commit = self.commit
+        if commit is None:
             with super().get(filepath=filepath) as value_from_base:
                 yield value_from_base
         else:
             try:
-                repo = find_git_repository(filepath)
-                file_path = Path(filepath)
-                relative_path = file_path.relative_to(repo.path)
-                data = repo.get_file(self.commit, relative_path).encode()
-                yield io.BytesIO(data)
+                data = self._read_file(commit, filepath)
             except GitError as e:
                 raise StorageError(e)
             except TAFError as e:
                 raise StorageError(e)
+            yield io.BytesIO(data)
 
     def getsize(self, filepath: str) -> int:
-        # Get size of a file after reading it from Git or the filesystem.
+        # Get size of a file from Git or the filesystem.
         # If the commit is specified, read from Git.
         # If it is not specified, read from the filesystem.
-        if self.commit is None:
+        commit = self.commit
+        if commit is None:
             return super().getsize(filepath=filepath)
+        data = self._get_cached_file(commit, filepath)
+        if data is not None:
+            return len(data)
         try:
             repo = find_git_repository(filepath)
-            file_path = Path(filepath)
-            relative_path = file_path.relative_to(repo.path)
-            data = repo.get_file(self.commit, relative_path).encode()
-            return len(data)
+            relative_path = Path(filepath).relative_to(repo.path)
+            return repo.get_file_size(commit, relative_path)
         except GitError as e:
             raise StorageError(e)
         except TAFError as e:
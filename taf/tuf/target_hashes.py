@@ -0,0 +1,231 @@
+"""Persistent cache of target file hashes.
+
+Finding target files which were added or modified since they were last
+signed hashes every file inside the targets directory, although almost none
+of them change between two signing operations. ``TargetHashesCache`` stores
+the length and hashes of each target file together with the file's size,
+modification time and inode, and only hashes a file again if any of those
+changed. The cache is saved to ``.git/taf/target-hashes.json``, so it is
+never committed.
+
+A file modified within the same timestamp tick in which it was hashed would
+keep its modification time, so files modified less than
+``RACY_INTERVAL_NS`` before they were hashed are not cached, like git does
+for its index. If the cache file cannot be read, or was written by a
+different version of this module, all files are hashed again.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import taf.settings as settings
+from taf.log import taf_logger
+from taf.utils import get_file_details, get_files_details, safely_save_json_to_disk
+
+CACHE_VERSION = 1
+CACHE_FILENAME = "target-hashes.json"
+RACY_INTERVAL_NS = 2 * 10**9
+
+
+def _stat_key(stat: os.stat_result) -> List[int]:
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+class TargetHashesCache:
+    """
+    Lengths and hashes of files inside a targets directory, keyed by their
+    paths relative to that directory
+    """
+
+    def __init__(self, targets_path: Path, cache_path: Optional[Path]):
+        self.targets_path = Path(targets_path)
+        # None if the cache is only kept in memory
+        self.cache_path = cache_path
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._modified = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_repository(cls, repo_path: Path) -> "TargetHashesCache":
+        """
+        Create the cache of a repository's targets directory, stored in its
+        git directory if the repository has one and caching is enabled
+        """
+        repo_path = Path(repo_path)
+        git_dir = repo_path / ".git"
+        cache_path = None
+        if settings.TARGET_HASHES_CACHE and git_dir.is_dir():
+            cache_path = git_dir / "taf" / CACHE_FILENAME
+        return cls(repo_path / "targets", cache_path)
+
+    @property
+    def entries(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> Dict[str, Dict]:
+        if self.cache_path is None or not self.cache_path.is_file():
+            return {}
+        try:
+            data = json.loads(self.cache_path.read_text())
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return data["files"]
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            taf_logger.debug(f"Ignoring target hashes cache {self.cache_path}: {e}")
+            return {}
+
+    def save(self) -> None:
+        """Write the cache to disk if it was modified"""
+        if self.cache_path is None or not self._modified:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            safely_save_json_to_disk(
+                {"version": CACHE_VERSION, "files": self.entries}, self.cache_path
+            )
+            self._modified = False
+        except OSError as e:
+            taf_logger.debug(
+                f"Could not save target hashes cache {self.cache_path}: {e}"
+            )
+
+    def clear(self) -> None:
+        """Forget all cached hashes and delete the cache file"""
+        self._entries = {}
+        self._modified = False
+        if self.cache_path is not None and self.cache_path.is_file():
+            self.cache_path.unlink()
+
+    def get_cached_details(
+        self, target_path: str, hash_algorithms: List[str]
+    ) -> Optional[Tuple[int, Dict[str, str]]]:
+        """
+        Return the cached length and hashes of the target file if it did not
+        change since it was hashed, None otherwise
+        """
+        entry = self.entries.get(target_path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(self.targets_path / target_path)
+        except OSError:
+            return None
+        hashes = entry["hashes"]
+        if entry["stat"] != _stat_key(stat) or any(
+            algorithm not in hashes for algorithm in hash_algorithms
+        ):
+            return None
+        return entry["length"], {
+            algorithm: hashes[algorithm] for algorithm in hash_algorithms
+        }
+
+    def get_file_details(
+        self, target_path: str, hash_algorithms: List[str] = ["sha256"]
+    ) -> Tuple[int, Dict[str, str]]:
+        """
+        Return the length and hashes of the target file, as returned by
+        `taf.utils.get_file_details`, hashing it only if it changed
+        """
+        details = self.get_cached_details(target_path, hash_algorithms)
+        if details is not None:
+            self.hits += 1
+            return details
+        self.misses += 1
+        filepath = self.targets_path / target_path
+        stat_before = os.stat(filepath)
+        hashed_at = time.time_ns()
+        length, hashes = get_file_details(str(filepath), hash_algorithms)
+        self._store(target_path, stat_before, hashed_at, length, hashes)
+        return length, hashes
+
+    def get_files_details(
+        self, target_paths: Iterable[str], hash_algorithms: List[str] = ["sha256"]
+    ) -> Dict[str, Tuple[int, Dict[str, str]]]:
+        """
+        Return lengths and hashes of the target files, hashing those which
+        changed in a thread pool
+        """
+        files_details = {}
+        changed = []
+        for target_path in target_paths:
+            details = self.get_cached_details(target_path, hash_algorithms)
+            if details is None:
+                changed.append(target_path)
+            else:
+                files_details[target_path] = details
+        self.hits += len(files_details)
+        self.misses += len(changed)
+        if not changed:
+            return files_details
+
+        stats_before = [os.stat(self.targets_path / path) for path in changed]
+        hashed_at = time.time_ns()
+        hashed = get_files_details(
+            [str(self.targets_path / path) for path in changed], hash_algorithms
+        )
+        for target_path, stat_before, details in zip(
+            changed, stats_before, hashed.values()
+        ):
+            self._store(target_path, stat_before, hashed_at, *details)
+            files_details[target_path] = details
+        return files_details
+
+    def _store(
+        self,
+        target_path: str,
+        stat_before: os.stat_result,
+        hashed_at: int,
+        length: int,
+        hashes: Dict[str, str],
+    ) -> None:
+        try:
+            stat_after = os.stat(self.targets_path / target_path)
+        except OSError:
+            return
+        if _stat_key(stat_before) != _stat_key(stat_after):
+            # modified while it was being hashed
+            return
+        if stat_after.st_mtime_ns >= hashed_at - RACY_INTERVAL_NS:
+            # could be modified again without changing its modification time
+            self.forget([target_path])
+            return
+        self.entries[target_path] = {
+            "stat": _stat_key(stat_after),
+            "length": length,
+            "hashes": hashes,
+        }
+        self._modified = True
+
+    def forget(self, target_paths: Iterable[str]) -> None:
+        """Remove entries of the specified target files"""
+        for target_path in target_paths:
+            if self.entries.pop(target_path, None) is not None:
+                self._modified = True
+
+    def retain(self, target_paths: Iterable[str]) -> None:
+        """Remove entries of all target files except the specified ones"""
+        self.forget(set(self.entries) - set(target_paths))
+
+    def verify(self) -> List[str]:
+        """
+        Hash all cached target files which seem unchanged and return paths of
+        those whose cached length or hashes are not correct
+        """
+        invalid = []
+        for target_path, entry in list(self.entries.items()):
+            hash_algorithms = list(entry["hashes"])
+            if self.get_cached_details(target_path, hash_algorithms) is None:
+                # changed since it was cached, would be hashed again anyway
+                continue
+            details = get_file_details(
+                str(self.targets_path / target_path), hash_algorithms
+            )
+            if details != (entry["length"], entry["hashes"]):
+                invalid.append(target_path)
+        return invalid
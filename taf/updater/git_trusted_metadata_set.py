@@ -1,8 +1,196 @@
 import datetime
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Optional, Tuple
+
+import taf.settings as settings
+from tuf.api.metadata import Root
 from tuf.ngclient._internal import trusted_metadata_set
 from tuf.ngclient.config import EnvelopeType
 
 
+class VerifiedMetadataCache:
+    """
+    Signature verifications of metadata files which succeeded. TAF validates
+    every commit of an authentication repository, and most commits do not
+    modify root, targets or delegated metadata, so the same bytes are verified
+    against the same keys over and over again. An entry identifies the bytes
+    of a metadata file by their digest, together with the verified role and
+    the threshold and keys which its delegating role trusts for it, so cached
+    results cannot be reused once the metadata or the trusted keys change.
+    Failed verifications are not cached.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # number of verifications skipped and performed
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(digest: bytes, role_name: str, delegator) -> Optional[Tuple]:
+        """
+        Return the cache key of metadata of the specified role, identified by
+        the digest of its bytes, verified by the delegating role. None if the
+        role is not delegated.
+        """
+        try:
+            delegated_role = delegator.get_delegated_role(role_name)
+        except ValueError:
+            return None
+        keys = []
+        for keyid in sorted(delegated_role.keyids):
+            try:
+                key = delegator.get_key(keyid)
+            except ValueError:
+                continue
+            keys.append(
+                (keyid, key.keytype, key.scheme, tuple(sorted(key.keyval.items())))
+            )
+        return (
+            digest,
+            role_name,
+            delegated_role.threshold,
+            tuple(keys),
+        )
+
+    def is_verified(self, key: Optional[Tuple]) -> bool:
+        if key is None:
+            return False
+        with self._lock:
+            verified = key in self._entries
+            if verified:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return verified
+
+    def add(self, key: Optional[Tuple]) -> None:
+        if key is None or settings.VERIFIED_METADATA_CACHE_MAX_ENTRIES <= 0:
+            return
+        with self._lock:
+            self._entries[key] = True
+            while len(self._entries) > settings.VERIFIED_METADATA_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget all verifications and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class LoadedMetadataCache:
+    """
+    Metadata files deserialized by TUF's loading function (the signed object,
+    the signed payload bytes and the signatures), keyed by the role type and
+    the digest of the file's bytes. Commits which do not modify a metadata
+    file reuse the objects loaded at a previous commit instead of parsing the
+    file again. The objects are only read by the updater and must not be
+    modified.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[Tuple]:
+        with self._lock:
+            loaded = self._entries.get(key)
+            if loaded is not None:
+                self._entries.move_to_end(key)
+            return loaded
+
+    def add(self, key: Tuple, loaded: Tuple) -> None:
+        if settings.LOADED_METADATA_CACHE_MAX_ENTRIES <= 0:
+            return
+        with self._lock:
+            self._entries[key] = loaded
+            while len(self._entries) > settings.LOADED_METADATA_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+verified_metadata_cache = VerifiedMetadataCache()
+loaded_metadata_cache = LoadedMetadataCache()
+
+
+def _load_data_once(load_data: Callable, role, data: bytes, digest: bytes) -> Tuple:
+    """
+    Deserialize metadata bytes using TUF's loading function, without verifying
+    them, or return the objects loaded from the same bytes before
+    """
+    key = (role.type, digest)
+    loaded = loaded_metadata_cache.get(key)
+    if loaded is None:
+        loaded = load_data(role, data)
+        loaded_metadata_cache.add(key, loaded)
+    return loaded
+
+
+def _load_verified_data(
+    trusted_set: "GitTrustedMetadataSet",
+    load_data: Callable,
+    role,
+    data: bytes,
+    delegator=None,
+    role_name=None,
+):
+    """
+    Wraps TUF's function which loads metadata bytes and verifies them using
+    the delegating role. Metadata which did not change is not parsed again,
+    and its signatures are not verified again under the same trust state.
+    """
+    digest = hashlib.sha256(data).digest()
+    loaded = _load_data_once(load_data, role, data, digest)
+    if delegator is None:
+        return loaded
+    role_name = role_name or role.type
+    key = verified_metadata_cache.get_key(digest, role_name, delegator)
+    if verified_metadata_cache.is_verified(key):
+        trusted_set.skipped_verifications += 1
+    else:
+        _, signed_bytes, signatures = loaded
+        delegator.verify_delegate(role_name, signed_bytes, signatures)
+        verified_metadata_cache.add(key)
+    return loaded
+
+
+def _supports_verification_cache() -> bool:
+    """
+    GitTrustedMetadataSet wraps the loading function which python-tuf's
+    TrustedMetadataSet sets in its constructor and overrides its method which
+    loads the trusted root. If a tuf upgrade changes these private internals,
+    metadata is verified by TUF at every commit instead.
+    """
+    load_trusted_root = getattr(
+        trusted_metadata_set.TrustedMetadataSet, "_load_trusted_root", None
+    )
+    if load_trusted_root is None:
+        return False
+    try:
+        return list(inspect.signature(load_trusted_root).parameters) == [
+            "self",
+            "data",
+        ] and "self._load_data = " in inspect.getsource(
+            trusted_metadata_set.TrustedMetadataSet.__init__
+        )
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+VERIFICATION_CACHE_SUPPORTED = _supports_verification_cache()
+
+
 class GitTrustedMetadataSet(trusted_metadata_set.TrustedMetadataSet):
     """
     This class represents a "divergence" from TUF metadata validation.
@@ -14,11 +202,40 @@ class GitTrustedMetadataSet(trusted_metadata_set.TrustedMetadataSet):
     Instead, for each revision in commit history we override the "reference_time" attribute so that
     past metadata will not be considered expired.
 
+    Metadata which did not change since a previous commit is not parsed again
+    and its signatures are not verified again, see `LoadedMetadataCache` and
+    `VerifiedMetadataCache`. All other checks
+    (versions, hashes and lengths listed in snapshot and timestamp) are
+    still performed at every commit. The number of verifications skipped by
+    this set is stored in `skipped_verifications`.
+
     See: GitUpdater
     """
 
     def __init__(self, data, envelope_type=EnvelopeType.METADATA):
+        # must be set before super().__init__, which loads the trusted root
+        self.skipped_verifications = 0
         super(GitTrustedMetadataSet, self).__init__(data, envelope_type)
         self.reference_time = datetime.datetime.min.replace(
             tzinfo=datetime.timezone.utc
         )
+
+    def _load_trusted_root(self, data: bytes) -> None:
+        # called by TrustedMetadataSet.__init__ once the loading function is set
+        load_data = getattr(self, "_load_data", None)
+        if not VERIFICATION_CACHE_SUPPORTED or load_data is None:
+            super()._load_trusted_root(data)
+            return
+        verified_load_data: Callable = partial(_load_verified_data, self, load_data)
+        self._load_data = verified_load_data
+        digest = hashlib.sha256(data).digest()
+        new_root, new_root_bytes, new_root_signatures = _load_data_once(
+            load_data, Root, data, digest
+        )
+        key = verified_metadata_cache.get_key(digest, Root.type, new_root)
+        if verified_metadata_cache.is_verified(key):
+            self.skipped_verifications += 1
+        else:
+            new_root.verify_delegate(Root.type, new_root_bytes, new_root_signatures)
+            verified_metadata_cache.add(key)
+        self._trusted_set[Root.type] = new_root
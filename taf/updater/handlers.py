@@ -2,7 +2,7 @@ import os
 import shutil
 from functools import wraps
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 from urllib import parse
 
 from taf.models.types import Commitish
@@ -14,6 +14,7 @@ from taf.auth_repo import AuthenticationRepository
 from taf.exceptions import UpdateFailedError
 from taf.utils import on_rm_error
 from taf.updater.git_trusted_metadata_set import GitTrustedMetadataSet
+from taf.updater.validation_checkpoint import ValidationCheckpoint
 from taf.tuf.key_cache import enable_public_key_cache
 
 from tuf.ngclient.fetcher import FetcherInterface
@@ -64,6 +65,14 @@ class GitUpdater(FetcherInterface):
         - commits_indexes: a dictionary which stores index of the current commit
         per metadata file. The reason for separating the metadata files is that
         not all files are updated at the same time.
+        - checkpoint_path: location of the validation checkpoint journal (see
+        ValidationCheckpoint). If set, validation resumes from the checkpoint
+        of an interrupted validation which started from the same commit.
+        - checkpoint_commit: commit validation was resumed from, if any.
+        - end_commit: if set, only commits up to and including this one are
+        validated, and expiration of metadata is not validated at it, since it
+        is not the most recent commit (see validation of commits in parallel,
+        `_run_tuf_updater_in_parallel`).
     """
 
     @property
@@ -74,6 +83,15 @@ class GitUpdater(FetcherInterface):
     def previous_commit(self) -> Commitish:
         return self.commits[self.current_commit_index - 1]
 
+    @property
+    def validates_expiration(self) -> bool:
+        """Whether TUF validates expiration of metadata at the current commit,
+        which is only the case at the last one (see revert_tuf_patch_on_last_commit)"""
+        return (
+            trusted_metadata_set.TrustedMetadataSet
+            is self._original_tuf_trusted_metadata_set
+        )
+
     @property
     def metadata_dir(self) -> str:
         # the updater keeps metadata in memory (see metadata_store); this only
@@ -84,14 +102,26 @@ class GitUpdater(FetcherInterface):
     def targets_dir(self) -> str:
         return str(self.validation_auth_repo.path / "targets")
 
-    def __init__(self, auth_urls, repository_directory, repository_name):
+    def __init__(
+        self,
+        auth_urls,
+        repository_directory,
+        repository_name,
+        checkpoint_path=None,
+        end_commit=None,
+    ):
         """
         Args:
         auth_url: repository url of the git repository which we want to clone.
         repository_directory: the client's local repository's location
         repository_name: name of the repository in 'organization/namespace' format.
+        checkpoint_path: location of the validation checkpoint journal
+        end_commit: last commit to validate, if not the most recent one
         """
         self.repository_name = repository_name
+        self.checkpoint_path = checkpoint_path
+        self.end_commit: Optional[Commitish] = Commitish.from_hash(end_commit)
+        self.checkpoint_commit: Optional[Commitish] = None
         self._original_tuf_trusted_metadata_set = (
             trusted_metadata_set.TrustedMetadataSet
         )
@@ -102,6 +132,7 @@ class GitUpdater(FetcherInterface):
         self.set_validation_repo(validation_path, auth_urls)
 
         self._init_commits()
+        self._resume_from_checkpoint()
 
         self.repository_directory = str(repository_directory)
 
@@ -162,6 +193,10 @@ class GitUpdater(FetcherInterface):
         last_validated_commit = Commitish.from_hash(
             settings.last_validated_commit.get(self.repository_name)
         )
+        # recorded in validation checkpoints
+        self._base_commit = (
+            last_validated_commit.hash if last_validated_commit is not None else None
+        )
 
         commits_since = self.validation_auth_repo.all_commits_since_commit(
             last_validated_commit
@@ -170,10 +205,62 @@ class GitUpdater(FetcherInterface):
         # insert the current one at the beginning of the list
         if last_validated_commit is not None:
             commits_since.insert(0, last_validated_commit)
+        if self.end_commit is not None:
+            commits_since = commits_since[: commits_since.index(self.end_commit) + 1]
 
         self.commits = commits_since
         self.current_commit_index = 0
 
+    def _resume_from_checkpoint(self):
+        """
+        If the previous validation starting from the same last validated
+        commit was interrupted, start from the last commit it validated. The
+        list of commits is not modified, only the current commit. The
+        checkpoint is discarded if the remote history was rewritten (its
+        commit is no longer a descendant of the last validated commit). The
+        last commit is always validated, so that expiration of its metadata
+        is checked.
+        """
+        if self.checkpoint_path is None or settings.VALIDATION_CHECKPOINT_INTERVAL <= 0:
+            return
+        checkpoint = ValidationCheckpoint.load(self.checkpoint_path)
+        if checkpoint is None:
+            return
+        if checkpoint.base_commit != self._base_commit:
+            # validation started from a different last validated commit
+            ValidationCheckpoint.remove(self.checkpoint_path)
+            return
+        commit = Commitish.from_hash(checkpoint.commit)
+        try:
+            index = self.commits.index(commit, 1, len(self.commits) - 1)
+        except ValueError:
+            taf_logger.info(
+                f"{self.repository_name}: Discarding validation checkpoint at {commit} since history of the repository changed"
+            )
+            ValidationCheckpoint.remove(self.checkpoint_path)
+            return
+        taf_logger.info(
+            f"{self.repository_name}: Resuming validation from checkpoint at {commit}"
+        )
+        self.current_commit_index = index
+        self.checkpoint_commit = commit
+
+    def save_checkpoint(self, commit: Commitish):
+        """
+        Record that TUF validation passed at the given commit, so that an
+        interrupted validation can be resumed from it
+        """
+        if self.checkpoint_path is None:
+            return
+        try:
+            ValidationCheckpoint(self._base_commit, commit.hash).save(
+                self.checkpoint_path
+            )
+        except Exception as e:
+            taf_logger.debug(
+                f"{self.repository_name}: Could not save validation checkpoint at {commit}: {e}"
+            )
+
     @staticmethod
     def _metadata_store_key(filename: str) -> str:
         """Key under which a metadata file is stored in metadata_store.
@@ -191,13 +278,7 @@ class GitUpdater(FetcherInterface):
         It is kept in memory (metadata_store) instead of on disk to avoid
         per-revision file I/O (see InMemoryUpdater).
         """
-        metadata_files = self.validation_auth_repo.list_files_at_revision(
-            self.current_commit, "metadata"
-        )
-        for filename in metadata_files:
-            metadata = self.validation_auth_repo.get_file(
-                self.current_commit, "metadata/" + filename, raw=True
-            )
+        for filename, metadata in self.get_current_metadata_files().items():
             self.metadata_store[self._metadata_store_key(filename)] = metadata
 
     def _patch_tuf_metadata_set(self, cls):
@@ -216,12 +297,21 @@ class GitUpdater(FetcherInterface):
         wraps(f)
 
         def wrapper(self):
-            if self.current_commit_index + 1 == (len(self.commits) - 1):
+            if self.end_commit is None and self.current_commit_index + 1 == (
+                len(self.commits) - 1
+            ):
                 self._patch_tuf_metadata_set(self._original_tuf_trusted_metadata_set)
             return f(self)
 
         return wrapper
 
+    def restore_tuf_metadata_set(self):
+        """
+        Revert the metadata expiration patch if commits were not validated
+        using this instance (see revert_tuf_patch_on_last_commit)
+        """
+        self._patch_tuf_metadata_set(self._original_tuf_trusted_metadata_set)
+
     def set_validation_repo(self, path, urls):
         """
         Used outside of GitUpdater to access validation auth repo.
@@ -255,6 +345,40 @@ class GitUpdater(FetcherInterface):
         except GitError:
             return []
 
+    def get_metadata_changed_since(self, commit: Commitish):
+        """Return names of metadata files added, modified or removed after
+        the given commit, mapped to their blob ids at the current revision
+        (None if removed)"""
+        return self.validation_auth_repo.list_changed_files_between(
+            commit, self.current_commit, "metadata"
+        )
+
+    def get_targets_changed_since(self, commit: Commitish):
+        """Return paths of target files added, modified or removed after
+        the given commit, mapped to their blob ids at the current revision
+        (None if removed)"""
+        return self.validation_auth_repo.list_changed_files_between(
+            commit, self.current_commit, "targets"
+        )
+
+    def get_root_metadata_id(self, commit: Commitish):
+        """Return the blob id of root metadata at the given commit"""
+        git_id, _ = self.validation_auth_repo.get_file(
+            commit, "metadata/root.json", raw=True, with_id=True
+        )
+        return git_id
+
+    def get_current_metadata_files(self, raw=True):
+        """Read all metadata files at the current revision at once.
+        Returns a dictionary mapping file names (relative to the metadata
+        directory) to their contents."""
+        files = self.validation_auth_repo.get_files(
+            self.current_commit, prefix="metadata", raw=raw
+        )
+        return {
+            path[len("metadata/") :]: content for path, (_, content) in files.items()
+        }
+
     def get_current_target_data(self, filepath, raw=False):
         return self.validation_auth_repo.get_file(
             self.current_commit, f"targets/{filepath}", raw=raw
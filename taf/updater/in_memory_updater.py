@@ -1,6 +1,8 @@
 from typing import Dict
 from urllib import parse
 
+from tuf.api.metadata import Root
+from tuf.ngclient._internal import trusted_metadata_set
 from tuf.ngclient.updater import Updater
 
 from taf.exceptions import UpdateFailedError
@@ -24,29 +26,46 @@ class InMemoryUpdater(Updater):
     and persists the new trusted metadata back. It is *not* a cache of remote
     files taken on faith - it is the output of verification.
 
-    TAF validates every commit, running one Updater per commit, so this
-    trusted store is written and re-read thousands of times per update. We
-    replace the on-disk directory with a dict (``GitUpdater.metadata_store``)
-    that is handed to each successive Updater, so the trusted state carries
+    TAF validates every commit, refreshing the Updater once per commit, so
+    this trusted store is written and re-read thousands of times per update.
+    We replace the on-disk directory with a dict (``GitUpdater.metadata_store``)
+    that is read at the start of each revision, so the trusted state carries
     forward exactly as it would on disk - only the storage medium changes, not
     what is verified. Each commit's metadata is still fetched fresh (from git,
     via ``GitUpdater``) and re-validated against the store on every refresh, so
     the fact that metadata changes between commits is precisely what gets
     checked.
 
-    Only the two private load/persist methods are overridden; all verification
-    runs through unmodified python-tuf. ``test_in_memory_updater`` covers the
+    Only the two private load/persist methods are overridden and the trusted
+    metadata set is replaced between revisions; all verification runs through
+    python-tuf. ``test_in_memory_updater`` covers the
     store mechanics and the private-API guard, and the full ``test_updater``
     suite exercises real clone/update validation through this path. In
     ``--strict`` mode the store is additionally cross-checked against the
     on-disk metadata at each commit (see ``_validate_metadata_on_disk``).
+
+    A single updater is used for all commits: ``start_revision`` replaces its
+    trusted metadata set with a new one loaded from the store, exactly as
+    constructing a new Updater would, while the fetcher and configuration are
+    kept. Loading metadata which did not change since the previous commit
+    reuses the objects parsed and verified then (see
+    ``GitTrustedMetadataSet``).
     """
 
     def __init__(self, metadata_store: Dict[str, bytes], *args, **kwargs):
         # must be set before super().__init__, which loads the trusted root
         self._metadata_store = metadata_store
+        self._skipped_verifications = 0
         super().__init__(*args, **kwargs)
 
+    @property
+    def skipped_verifications(self) -> int:
+        """Number of signature verifications of unchanged metadata skipped
+        while validating all revisions (see ``GitTrustedMetadataSet``)"""
+        return self._skipped_verifications + getattr(
+            self._trusted_set, "skipped_verifications", 0
+        )
+
     def _load_local_metadata(self, rolename: str) -> bytes:
         try:
             return self._metadata_store[parse.quote(rolename, "")]
@@ -57,3 +76,13 @@ class InMemoryUpdater(Updater):
 
     def _persist_metadata(self, rolename: str, data: bytes) -> None:
         self._metadata_store[parse.quote(rolename, "")] = data
+
+    def start_revision(self) -> None:
+        """Start validating the next revision, trusting the metadata which
+        was persisted to the store while validating the previous one."""
+        self._skipped_verifications = self.skipped_verifications
+        # looked up at call time, since GitUpdater replaces the class to
+        # check expiration dates of the last revision only
+        self._trusted_set = trusted_metadata_set.TrustedMetadataSet(
+            self._load_local_metadata(Root.type), self.config.envelope_type
+        )
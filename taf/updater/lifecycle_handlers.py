@@ -17,6 +17,7 @@ from taf.utils import (
 )
 from taf.exceptions import GitError, ScriptExecutionError
 from taf.log import taf_logger
+from taf.models.types import Commitish
 from taf.updater.types.update import Update
 from cattr import structure
 
@@ -340,12 +341,20 @@ def _repo_update_data(
         "warnings": warnings or "",
         "auth_repo": {
             "data": auth_repo.to_json_dict(),
-            "commits": attr.asdict(commits_data),
+            "commits": attr.asdict(
+                commits_data, value_serializer=_serialize_commits_data_value
+            ),
         },
         "target_repos": targets_data,
     }
 
 
+def _serialize_commits_data_value(inst, field, value):
+    if isinstance(value, Commitish):
+        return value.to_dict()
+    return value
+
+
 def _print_data(repos_and_data, library_dir, lifecycle_stage):
     for repo, data in repos_and_data.items():
         path = Path(library_dir, "data", lifecycle_stage.value, f"{repo.name}.json")
@@ -34,6 +34,7 @@ from attr import define, field
 from logdecorator import log_on_error
 from taf.auth_repo import AuthenticationRepository
 from taf.git import GitRepository
+from taf.models.types import Commitish
 from taf.updater.types.update import OperationType, UpdateType
 from taf.updater.updater_pipeline import (
     AuthenticationRepositoryUpdatePipeline,
@@ -55,11 +56,14 @@ from taf.updater.lifecycle_handlers import (
     handle_update_event,
     Event,
 )
-from cattr import unstructure
+from cattr import register_unstructure_hook, unstructure
 import concurrent.futures
 from concurrent.futures import ThreadPoolExecutor
 from taf.updater.types.update import Update
 
+# commits are not attrs classes, keep returning them as dictionaries
+register_unstructure_hook(Commitish, Commitish.to_dict)
+
 
 def _check_update_status(repos_update_data: Dict[str, Any]) -> Tuple[Event, str]:
     # helper function to set update status of update handler based on repo status.
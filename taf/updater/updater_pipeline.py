@@ -1,10 +1,14 @@
 from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from enum import Enum
 import functools
+import math
+import multiprocessing
+import os
 from pathlib import Path
 import re
 import shutil
+from types import ModuleType
 from typing import Any, Dict, List, Optional
 
 from attr import attrs, define, field
@@ -30,9 +34,14 @@ from taf.updater.lifecycle_handlers import Event
 from taf.updater.types.update import OperationType, UpdateType
 from taf.utils import TempPartition, on_rm_error, ensure_pre_push_hook
 from taf.updater.in_memory_updater import InMemoryUpdater
-from taf.log import taf_logger
+from taf.updater.validation_checkpoint import ValidationCheckpoint
+from taf.log import configure_logging, get_logging_config, taf_logger
+from tuf.api.metadata import TargetFile
 
 EXPIRED_METADATA_ERROR = "ExpiredMetadataError"
+# metadata files which do not affect which target files are trusted once
+# TUF's refresh validated them
+_TOP_LEVEL_METADATA_PATTERN = re.compile(r"^((\d+\.)?root|timestamp)\.json$")
 
 
 class UpdateStatus(Enum):
@@ -156,6 +165,24 @@ class AuthCommitsData:
     new: Optional[List[str]] = field(default=list)
 
 
+@define
+class ValidatedTargets:
+    """
+    Target files verified at the last successfully validated commit of an
+    authentication repository. The next commit is compared to it, so that only
+    target files which changed since then are read and verified again.
+    """
+
+    # last validated commit, None if the next commit has to be fully validated
+    commit: Optional[Commitish] = field(default=None)
+    # target path -> target file info verified at that commit
+    target_files: Dict[str, TargetFile] = field(factory=dict)
+
+    def reset(self) -> None:
+        self.commit = None
+        self.target_files = {}
+
+
 @attrs
 class UpdateOutput:
     event: str = field()
@@ -1038,11 +1065,9 @@ class AuthenticationRepositoryUpdatePipeline(Pipeline):
                                     "\nRun 'taf repo reset' to sync your local repositories, or run the updater with the --force flag to validate from the first commit"
                                 )
                         else:
-                            commits_since = (
-                                self.state.users_auth_repo.all_commits_since_commit(
-                                    since_commit=self.state.last_validated_commit,
-                                    branch=default_branch,
-                                )
+                            commits_since = self.state.users_auth_repo.iter_commits(
+                                since_commit=self.state.last_validated_commit,
+                                branch=default_branch,
                             )
                             # if the user's head sha is newer than last validated commit
                             # that can mean that the changes were pulled manually
@@ -1074,7 +1099,10 @@ class AuthenticationRepositoryUpdatePipeline(Pipeline):
         try:
 
             self.state.update_handler = GitUpdater(
-                self.urls, self.library_dir, self.state.validation_auth_repo.name
+                self.urls,
+                self.library_dir,
+                self.state.validation_auth_repo.name,
+                checkpoint_path=self._get_validation_checkpoint_path(),
             )
             last_validated_remote_commit, error = _run_tuf_updater(
                 self.state.update_handler, self.state.auth_repo_name
@@ -1171,6 +1199,19 @@ class AuthenticationRepositoryUpdatePipeline(Pipeline):
                     urls=self.urls,
                 )
 
+    def _get_validation_checkpoint_path(self) -> Optional[Path]:
+        """
+        Validation checkpoints are stored next to the last validated commit
+        of the user's authentication repository. They are not used when only
+        validating a repository.
+        """
+        if self.only_validate or self.auth_path is None:
+            return None
+        return Path(
+            AuthenticationRepository.get_conf_dir_path(self.auth_path),
+            ValidationCheckpoint.FILENAME,
+        )
+
     def _validate_operation_type(self):
         if self.operation == OperationType.CLONE and self.state.existing_repo:
             raise UpdateFailedError(
@@ -2145,6 +2186,11 @@ but commit not on branch {current_branch}"
             self.state.users_auth_repo.set_last_validated_data(
                 last_validated_data,
             )
+            # the validation checkpoint started from the previous last
+            # validated commit and is of no use from now on
+            checkpoint_path = self._get_validation_checkpoint_path()
+            if checkpoint_path is not None:
+                ValidationCheckpoint.remove(checkpoint_path)
 
             return self.state.update_status
         except Exception as e:
@@ -2490,8 +2536,21 @@ def _run_tuf_updater(git_fetcher, auth_repo_name):
     auth_repo_name = auth_repo_name or ""
     taf_logger.info(f"{auth_repo_name}: Running TUF validation...")
 
-    def _init_updater():
+    segments = _get_validation_segments(git_fetcher)
+    if len(segments) > 1:
+        result = _run_tuf_updater_in_parallel(git_fetcher, auth_repo_name, segments)
+        if result is not None:
+            return result
+        taf_logger.debug(
+            f"{auth_repo_name}: Could not validate commits in parallel, validating them one by one"
+        )
+
+    def _init_updater(updater):
         try:
+            if updater is not None:
+                # trusted metadata of the previous commit carried forward
+                updater.start_revision()
+                return updater
             return InMemoryUpdater(
                 git_fetcher.metadata_store,
                 git_fetcher.metadata_dir,
@@ -2506,23 +2565,233 @@ def _run_tuf_updater(git_fetcher, auth_repo_name):
             )
             raise e
 
-    last_validated_commit = None
+    # commits before the checkpoint were validated by an interrupted update
+    last_validated_commit = git_fetcher.checkpoint_commit
+    checkpoint_commit = last_validated_commit
+    checkpoint_interval = settings.VALIDATION_CHECKPOINT_INTERVAL
+    validated_commits = 0
+    updater = None
+    validated_targets = ValidatedTargets()
     try:
         while not git_fetcher.update_done():
-            updater = _init_updater()
+            updater = _init_updater(updater)
             current_commit = _update_tuf_current_revision(
-                git_fetcher, updater, auth_repo_name
+                git_fetcher, updater, auth_repo_name, validated_targets
             )
-            del updater
             if current_commit is not None:
                 last_validated_commit = current_commit
+                validated_commits += 1
+                if (
+                    checkpoint_interval > 0
+                    and validated_commits % checkpoint_interval == 0
+                ):
+                    git_fetcher.save_checkpoint(current_commit)
+                    checkpoint_commit = current_commit
     except UpdateFailedError as e:
         return last_validated_commit, e
+    finally:
+        # also reached if validation is interrupted
+        if checkpoint_interval > 0 and last_validated_commit not in (
+            None,
+            checkpoint_commit,
+        ):
+            git_fetcher.save_checkpoint(last_validated_commit)
+        skipped_verifications = (
+            updater.skipped_verifications if updater is not None else 0
+        )
+        taf_logger.debug(
+            f"{auth_repo_name}: Skipped {skipped_verifications} signature verifications of unchanged metadata"
+        )
 
     return last_validated_commit, None
 
 
-def _update_tuf_current_revision(git_fetcher, updater, auth_repo_name):
+def _get_validation_segments(git_fetcher):
+    """
+    Split commits which still have to be validated into segments which can be
+    validated in parallel. A new segment starts at each commit which modifies
+    root metadata, so that the keys trusted within a segment do not change, and
+    long segments are split further so that all workers are used. Segments
+    shorter than TUF_VALIDATION_MIN_SEGMENT_COMMITS are merged with the previous
+    one. Returns a list of tuples containing the commit preceding a segment,
+    whose metadata is trusted when validating it, and the segment's commits.
+    The list is empty if commits should be validated in the calling process.
+    """
+    max_workers = settings.TUF_VALIDATION_MAX_WORKERS
+    if max_workers == 1:
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+    min_size = max(settings.TUF_VALIDATION_MIN_SEGMENT_COMMITS, 1)
+    start_index = git_fetcher.current_commit_index
+    commits = git_fetcher.commits[start_index + 1 :]
+    if len(commits) < 2 * min_size:
+        return []
+    max_size = max(min_size, math.ceil(len(commits) / max_workers))
+
+    spans: List[List[Commitish]] = []
+    try:
+        root_id = git_fetcher.get_root_metadata_id(git_fetcher.commits[start_index])
+        for commit in commits:
+            commit_root_id = git_fetcher.get_root_metadata_id(commit)
+            if commit_root_id != root_id or not spans:
+                spans.append([])
+                root_id = commit_root_id
+            spans[-1].append(commit)
+    except GitError:
+        # a commit without root metadata is invalid, which is reported
+        # when validating commits one by one
+        return []
+
+    segments: List[List[Commitish]] = []
+    for span in spans:
+        for index in range(0, len(span), max_size):
+            chunk = span[index : index + max_size]
+            if segments and (len(segments[-1]) < min_size or len(chunk) < min_size):
+                segments[-1].extend(chunk)
+            else:
+                segments.append(chunk)
+
+    start_commits = [git_fetcher.commits[start_index]]
+    start_commits.extend(segment[-1] for segment in segments[:-1])
+    return list(zip(start_commits, segments))
+
+
+def _run_tuf_updater_in_parallel(git_fetcher, auth_repo_name, segments):
+    """
+    Validate segments of commits (see `_get_validation_segments`) in separate
+    processes and stitch the results in order. Each segment is validated
+    speculatively, trusting metadata at the commit preceding it, which is only
+    correct if all commits before it are valid. The first failure therefore
+    determines the result and results of all later segments are discarded,
+    just like when validating commits one by one. Returns None if a segment
+    other than the last one was not validated up to its last commit without
+    an error, in which case commits have to be validated one by one.
+    """
+    max_workers = settings.TUF_VALIDATION_MAX_WORKERS or os.cpu_count() or 1
+    max_workers = min(max_workers, len(segments))
+    taf_logger.info(
+        f"{auth_repo_name}: Validating {len(segments)} segments of commits using {max_workers} processes"
+    )
+    last_validated_commit = git_fetcher.checkpoint_commit
+    start_index = git_fetcher.current_commit_index
+    repository_path = str(git_fetcher.validation_auth_repo.path)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_validation_worker,
+            initargs=(_get_settings_snapshot(), get_logging_config()),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _validate_commits_segment,
+                    repository_path,
+                    git_fetcher.repository_name,
+                    auth_repo_name,
+                    start_commit.hash,
+                    commits[-1].hash if index < len(segments) - 1 else None,
+                )
+                for index, (start_commit, commits) in enumerate(segments)
+            ]
+            for index, ((_, commits), future) in enumerate(zip(segments, futures)):
+                segment_commit, error = future.result()
+                if segment_commit is not None:
+                    last_validated_commit = Commitish.from_hash(segment_commit)
+                if error is not None:
+                    for pending_future in futures[index + 1 :]:
+                        pending_future.cancel()
+                    git_fetcher.restore_tuf_metadata_set()
+                    # point to the invalid commit, like when validating
+                    # commits one by one
+                    git_fetcher.current_commit_index = (
+                        git_fetcher.commits.index(last_validated_commit, start_index)
+                        if last_validated_commit is not None
+                        else start_index
+                    ) + 1
+                    return last_validated_commit, UpdateFailedError(error)
+                if index < len(segments) - 1 and last_validated_commit != commits[-1]:
+                    for pending_future in futures[index + 1 :]:
+                        pending_future.cancel()
+                    return None
+                if settings.VALIDATION_CHECKPOINT_INTERVAL > 0:
+                    git_fetcher.save_checkpoint(last_validated_commit)
+    except BaseException:
+        git_fetcher.restore_tuf_metadata_set()
+        raise
+    git_fetcher.restore_tuf_metadata_set()
+    # all commits were validated by the workers
+    git_fetcher.current_commit_index = len(git_fetcher.commits)
+    return last_validated_commit, None
+
+
+def _get_settings_snapshot() -> Dict[str, Any]:
+    """
+    Return values of all settings, which can be modified at runtime, so that
+    they can be applied in a spawned worker process, which imports the
+    settings module again and would otherwise only see its defaults
+    """
+    return {
+        name: value
+        for name, value in vars(settings).items()
+        if not name.startswith("_")
+        and not isinstance(value, ModuleType)
+        and not callable(value)
+    }
+
+
+def _initialize_validation_worker(
+    settings_snapshot: Dict[str, Any], logging_config: Dict[str, bool]
+) -> None:
+    """
+    Initializer of worker processes started by `_run_tuf_updater_in_parallel`.
+    Applies settings and logging configuration of the parent process.
+    """
+    for name, value in settings_snapshot.items():
+        setattr(settings, name, value)
+    configure_logging(logging_config)
+
+
+def _validate_commits_segment(
+    validation_repo_path,
+    repository_name,
+    auth_repo_name,
+    start_commit,
+    end_commit,
+):
+    """
+    Validate commits following start_commit up to and including end_commit
+    (the most recent commit if None), trusting metadata at start_commit. Runs
+    in a worker process of `_run_tuf_updater_in_parallel`. Returns the hash of
+    the last validated commit and the error message if validation failed.
+    """
+    settings.TUF_VALIDATION_MAX_WORKERS = 1
+    settings.validation_repo_path[repository_name] = Path(validation_repo_path)
+    settings.last_validated_commit[repository_name] = start_commit
+    git_fetcher = GitUpdater(
+        None,
+        Path(validation_repo_path).parent,
+        repository_name,
+        end_commit=end_commit,
+    )
+    try:
+        last_validated_commit, error = _run_tuf_updater(git_fetcher, auth_repo_name)
+    finally:
+        git_fetcher.validation_auth_repo.cleanup()
+    return (
+        last_validated_commit.hash if last_validated_commit is not None else None,
+        str(error) if error is not None else None,
+    )
+
+
+def _update_tuf_current_revision(
+    git_fetcher, updater, auth_repo_name, validated_targets=None
+):
+    """
+    Validate metadata and target files at the current revision. If target
+    files verified at the previous commit are passed in (validated_targets),
+    only target files which changed since then, or whose governing metadata
+    changed, are verified again. They are updated once the revision is valid.
+    """
     current_commit = git_fetcher.current_commit
     try:
         auth_repo_name = auth_repo_name or ""
@@ -2533,21 +2802,18 @@ def _update_tuf_current_revision(git_fetcher, updater, auth_repo_name):
         # using refresh, we have updated all main roles
         # we still need to update the delegated roles (if there are any)
         # and validate any target files
-
-        current_targets = git_fetcher.get_current_targets()
-        for target_path in current_targets:
-            target_filepath = target_path.replace("\\", "/")
-            targetinfo = updater.get_targetinfo(target_filepath)
-            target_data = git_fetcher.get_current_target_data(target_filepath, raw=True)
-            targetinfo.verify_length_and_hashes(target_data)
-
-            taf_logger.debug(
-                f"{auth_repo_name}: Successfully validated target file {target_filepath} at {current_commit}"
-            )
+        target_files = _validate_current_targets(
+            git_fetcher, updater, auth_repo_name, validated_targets
+        )
         if settings.strict:
             _validate_metadata_on_disk(git_fetcher)
+        if validated_targets is not None:
+            validated_targets.commit = current_commit
+            validated_targets.target_files = target_files
         return current_commit
     except Exception as e:
+        if validated_targets is not None:
+            validated_targets.reset()
         metadata_expired = EXPIRED_METADATA_ERROR in type(
             e
         ).__name__ or EXPIRED_METADATA_ERROR in str(e)
@@ -2564,6 +2830,69 @@ def _update_tuf_current_revision(git_fetcher, updater, auth_repo_name):
         )
 
 
+def _validate_current_targets(git_fetcher, updater, auth_repo_name, validated_targets):
+    """
+    Verify target files at the current revision and return their target file
+    infos. If the previous commit was validated, the trees of the two commits
+    are compared: a target file is only read and hashed if its blob changed or
+    if the info of its governing targets role changed. If no targets role
+    (nor snapshot) metadata changed, unchanged target files are not even
+    looked up, so such a commit is validated in O(changed files). Expiration
+    of delegated roles is checked at the last commit, so all target files are
+    looked up there.
+    """
+    current_commit = git_fetcher.current_commit
+    previous_commit = validated_targets.commit if validated_targets else None
+    changed_targets = None
+    if previous_commit is not None:
+        try:
+            changed_metadata = git_fetcher.get_metadata_changed_since(previous_commit)
+            changed_targets = git_fetcher.get_targets_changed_since(previous_commit)
+        except GitError as e:
+            taf_logger.debug(
+                f"{auth_repo_name}: Could not compare {current_commit} to {previous_commit}: {e}"
+            )
+
+    if changed_targets is None:
+        # full validation
+        previous_target_files: Dict[str, TargetFile] = {}
+        target_files: Dict[str, TargetFile] = {}
+        modified = target_paths = [
+            target_path.replace("\\", "/")
+            for target_path in git_fetcher.get_current_targets()
+        ]
+    else:
+        previous_target_files = validated_targets.target_files
+        modified = [path for path, blob_id in changed_targets.items() if blob_id]
+        target_files = {
+            path: target_file
+            for path, target_file in previous_target_files.items()
+            if path not in changed_targets
+        }
+        metadata_changed = git_fetcher.validates_expiration or any(
+            not _TOP_LEVEL_METADATA_PATTERN.match(metadata_file)
+            for metadata_file in changed_metadata
+        )
+        # unchanged target files have to be looked up again if any targets
+        # role changed, since that can change which role governs them
+        target_paths = list(target_files) + modified if metadata_changed else modified
+
+    modified_paths = set(modified)
+    for target_filepath in target_paths:
+        targetinfo = updater.get_targetinfo(target_filepath)
+        if (
+            target_filepath in modified_paths
+            or targetinfo != previous_target_files[target_filepath]
+        ):
+            target_data = git_fetcher.get_current_target_data(target_filepath, raw=True)
+            targetinfo.verify_length_and_hashes(target_data)
+            taf_logger.debug(
+                f"{auth_repo_name}: Successfully validated target file {target_filepath} at {current_commit}"
+            )
+        target_files[target_filepath] = targetinfo
+    return target_files
+
+
 def _check_if_commit_on_branch(repo, commit, branch, include_remotes=True):
     if not repo.commit_exists(commit=commit):
         return False
@@ -2593,7 +2922,11 @@ def _validate_metadata_on_disk(git_fetcher):
     as the ones in the auth repository's metadata folder at that revision
     """
     consistent_snaphost_pattern = r"\d+\.[^\.\s]+\.\w+"
-    for metadata_file_name in git_fetcher.get_current_metadata():
+    try:
+        current_metadata = git_fetcher.get_current_metadata_files()
+    except GitError:
+        current_metadata = {}
+    for metadata_file_name, metadata_content in current_metadata.items():
         # version (consistent snapshot files) are downloaded to remote
         # by the TUF updater, but saved to the main metadata file
         # so, 2.root.json is downloaded and saved to root.json
@@ -2614,9 +2947,6 @@ def _validate_metadata_on_disk(git_fetcher):
             #     f"Invalid metadata file {metadata_file_name}"
             # )
             continue
-        metadata_content = git_fetcher.get_current_metadata_data(
-            metadata_file_name, raw=True
-        )
         if metadata_content != tuf_metadata_content:
             raise UpdateFailedError(f"Invalid metadata file {metadata_file_name}")
 
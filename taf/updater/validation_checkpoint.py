@@ -0,0 +1,68 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from attr import define, field
+
+from taf.log import taf_logger
+
+
+@define
+class ValidationCheckpoint:
+    """
+    Journal of a validation of an authentication repository's history which
+    did not necessarily finish. It records the last commit whose TUF
+    validation passed and the root metadata trusted at that commit, so that
+    a later update which starts from the same last validated commit can
+    resume the validation from that commit instead of validating all commits
+    again.
+
+    A checkpoint can only be used if it was created starting from the same
+    last validated commit and if its commit is still a descendant of that
+    commit (the remote history was not rewritten). Content of the commit is
+    pinned by its id, so metadata at that commit is not recorded.
+    """
+
+    FILENAME = "validation_checkpoint.json"
+
+    # last validated commit the validation started from (None if all commits
+    # were validated)
+    base_commit: Optional[str] = field()
+    # last commit whose TUF validation passed
+    commit: str = field()
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["ValidationCheckpoint"]:
+        """Read the checkpoint, None if it does not exist or cannot be read"""
+        try:
+            data = json.loads(Path(path).read_text())
+            return cls(base_commit=data["base_commit"], commit=data["commit"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            taf_logger.debug(f"Could not read validation checkpoint {path}: {e}")
+            return None
+
+    def save(self, path: Path) -> None:
+        """
+        Write the checkpoint to a temporary file and move it over the old one,
+        so that an interrupted write does not leave a corrupted checkpoint
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.tmp")
+        temp_path.write_text(
+            json.dumps(
+                {
+                    "base_commit": self.base_commit,
+                    "commit": self.commit,
+                },
+                indent=4,
+            )
+        )
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def remove(path: Path) -> None:
+        Path(path).unlink(missing_ok=True)
@@ -2,9 +2,11 @@ import atexit
 import platform
 import click
 import errno
+import hashlib
 import datetime
 import time
 import json
+import mmap
 import os
 import stat
 import subprocess
@@ -435,6 +437,55 @@ def resolve_keystore_path(
     return str(keystore_path)
 
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _validate_hash_algorithms(hash_algorithms: List[str]) -> None:
+    if not isinstance(hash_algorithms, list):
+        raise ValueError("The hash_algorithms must be a list.")
+    for algo in hash_algorithms:
+        if algo not in ["sha256", "sha512"]:  # Add any other valid algorithms as needed
+            raise ValueError(f"Invalid hash algorithm: {algo}")
+
+
+def _hash_file_content(filepath: str, hash_algorithms: List[str]) -> Dict[str, str]:
+    """
+    Compute hashes of the file's content with normalized line endings, reading
+    it once for all algorithms. Large files are memory-mapped and, unless they
+    contain Windows line endings, hashed without copying their content.
+    """
+    digest_objects = [hashlib.new(algorithm) for algorithm in hash_algorithms]
+    with open(filepath, "rb") as fileobj:
+        size = os.fstat(fileobj.fileno()).st_size
+        if size < HASH_CHUNK_SIZE:
+            content = normalize_line_endings(fileobj.read())
+            for digest_object in digest_objects:
+                digest_object.update(content)
+        else:
+            with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if mapped.find(b"\r\n") != -1:
+                    content = normalize_line_endings(mapped[:])
+                    for digest_object in digest_objects:
+                        digest_object.update(content)
+                else:
+                    # normalization would only strip trailing newlines
+                    end = len(mapped)
+                    while end and mapped[end - 1] == ord("\n"):
+                        end -= 1
+                    with memoryview(mapped) as view:
+                        for offset in range(0, end, HASH_CHUNK_SIZE):
+                            with view[
+                                offset : min(end, offset + HASH_CHUNK_SIZE)
+                            ] as chunk:
+                                # hashlib releases the GIL while hashing chunks
+                                for digest_object in digest_objects:
+                                    digest_object.update(chunk)
+    return {
+        algorithm: digest_object.hexdigest()
+        for algorithm, digest_object in zip(hash_algorithms, digest_objects)
+    }
+
+
 def get_file_details(
     filepath: str,
     hash_algorithms: List[str] = ["sha256"],
@@ -445,11 +496,7 @@ def get_file_details(
     if not isinstance(filepath, str) or not filepath:
         raise ValueError("The filepath must be a non-empty string.")
 
-    if not isinstance(hash_algorithms, list):
-        raise ValueError("The hash_algorithms must be a list.")
-    for algo in hash_algorithms:
-        if algo not in ["sha256", "sha512"]:  # Add any other valid algorithms as needed
-            raise ValueError(f"Invalid hash algorithm: {algo}")
+    _validate_hash_algorithms(hash_algorithms)
 
     if storage_backend is None:
         storage_backend = FilesystemBackend()
@@ -464,6 +511,9 @@ def get_file_details(
 
     file_length = os.path.getsize(filepath)
 
+    if type(storage_backend) is FilesystemBackend:
+        return file_length, _hash_file_content(filepath, hash_algorithms)
+
     # Getting the file hashes
     file_hashes = {}
     with storage_backend.get(filepath) as fileobj:
@@ -480,6 +530,49 @@ def get_file_details(
     return file_length, file_hashes
 
 
+def get_files_details(
+    filepaths: List[str],
+    hash_algorithms: List[str] = ["sha256"],
+    max_workers: Optional[int] = None,
+) -> Dict[str, Tuple[int, Dict[str, str]]]:
+    """
+    Return lengths and hashes of files on the filesystem, as returned by
+    `get_file_details`, hashing them in a thread pool.
+
+    Arguments:
+        filepaths: Absolute paths of the files
+        hash_algorithms: Algorithms whose hashes should be calculated
+        max_workers (optional): Number of threads, `taf.settings.HASHING_MAX_WORKERS` if not specified
+
+    Returns:
+        A dictionary mapping file paths to their lengths and hashes
+    """
+    return dict(
+        zip(
+            filepaths,
+            map_in_thread_pool(
+                lambda filepath: get_file_details(filepath, hash_algorithms),
+                filepaths,
+                max_workers,
+            ),
+        )
+    )
+
+
+def map_in_thread_pool(func, items: List, max_workers: Optional[int] = None) -> List:
+    """
+    Apply func to all items using a thread pool whose size is determined by
+    `taf.settings.HASHING_MAX_WORKERS` if max_workers is not specified, and
+    return the results in the order of the items
+    """
+    if max_workers is None:
+        max_workers = taf.settings.HASHING_MAX_WORKERS or None
+    if len(items) <= 1 or max_workers == 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
+
+
 def ensure_pre_push_hook(auth_repo_path: Path) -> bool:
     hooks_dir = auth_repo_path / ".git" / "hooks"
     hooks_dir.mkdir(parents=True, exist_ok=True)
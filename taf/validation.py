@@ -1,8 +1,13 @@
+import json
 from pathlib import Path
 
-from taf.constants import CAPSTONE, METADATA_DIRECTORY_NAME, TARGETS_DIRECTORY_NAME
+from taf.constants import CAPSTONE
 from taf.exceptions import GitError, InvalidBranchError
-from taf.tuf.repository import MetadataRepository, get_target_path
+from taf.tuf.repository import (
+    MetadataRepository,
+    get_role_metadata_path,
+    get_target_path,
+)
 
 
 def validate_branch(
@@ -66,51 +71,93 @@ def validate_branch(
                     num_of_merged_commits, branch=merge_branches[target_repo]
                 )
             )
-    for updated_role in updated_roles:
-        branch_id = None
-        targets_version = None
-        for commit_index, auth_commit in enumerate(auth_commits):
+    # metadata and target files needed to validate a commit
+    validated_paths = [
+        get_role_metadata_path(role_name)
+        for role_name in {*updated_roles, *unmodified_roles_and_versions}
+    ]
+    validated_paths.extend(
+        get_target_path(target_repo.name) for target_repo in target_repos
+    )
+
+    if not updated_roles:
+        return
+
+    # versions of the updated roles' metadata and their branch ids at the
+    # previously checked commit
+    targets_versions = {role: None for role in updated_roles}
+    branch_ids = {role: None for role in updated_roles}
+    for commit_index, auth_commit in enumerate(auth_commits):
+        # read the files of this commit at once, parse them only when checked
+        auth_files = auth_repo.get_files(auth_commit, validated_paths, raw=True)
+        for updated_role in updated_roles:
             # load content of the updated role's targets metadata
-            updated_targets = auth_repo.get_json(
-                auth_commit, f"{METADATA_DIRECTORY_NAME}/{updated_role}.json"
+            updated_targets = _get_json_at_revision(
+                auth_repo,
+                auth_files,
+                auth_commit,
+                get_role_metadata_path(updated_role),
+            )
+            targets_versions[updated_role] = _check_updated_targets_version(
+                updated_targets,
+                updated_role,
+                auth_commit,
+                targets_versions[updated_role],
             )
-            targets_version = _check_updated_targets_version(
-                updated_targets, updated_role, auth_commit, targets_version
+        for (
+            role_name,
+            unmodified_roles_version,
+        ) in unmodified_roles_and_versions.items():
+            unmodified_target_metadata = _get_json_at_revision(
+                auth_repo,
+                auth_files,
+                auth_commit,
+                get_role_metadata_path(role_name),
             )
-            for (
+            version = _check_if_version_unmodified(
+                unmodified_target_metadata,
                 role_name,
+                auth_commit,
                 unmodified_roles_version,
-            ) in unmodified_roles_and_versions.items():
-                unmodified_target_metadata = auth_repo.get_json(
-                    auth_commit, f"{METADATA_DIRECTORY_NAME}/{role_name}.json"
-                )
-                version = _check_if_version_unmodified(
-                    unmodified_target_metadata,
-                    role_name,
-                    auth_commit,
-                    unmodified_roles_version,
-                )
-                if unmodified_roles_version is None:
-                    unmodified_roles_and_versions[role_name] = version
+            )
+            if unmodified_roles_version is None:
+                unmodified_roles_and_versions[role_name] = version
 
+        for updated_role in updated_roles:
             if updated_role in check_branch_roles:
                 no_initial_branch_id = check_branch_roles[updated_role]
-                branch_id = _check_branch_id(
+                branch_ids[updated_role] = _check_branch_id(
                     auth_repo,
                     auth_commit,
-                    branch_id,
+                    branch_ids[updated_role],
                     updated_role,
                     is_first_commit=no_initial_branch_id
                     and commit_index == len(auth_commits) - 1,
                 )
 
-            for target, target_commits in targets_and_commits.items():
-                target_commit = target_commits[commit_index]
+        for target, target_commits in targets_and_commits.items():
+            target_commit = target_commits[commit_index]
 
-                # targets' commits match the target commits specified in the authentication repository
-                _compare_commit_with_targets_metadata(
-                    auth_repo, auth_commit, target, target_commit
-                )
+            # targets' commits match the target commits specified in the authentication repository
+            _compare_commit_with_targets_metadata(
+                auth_repo,
+                auth_commit,
+                target,
+                target_commit,
+                auth_files,
+            )
+
+
+def _get_json_at_revision(auth_repo, files, auth_commit, path):
+    """
+    Parse the content of the file at the given path, read using `get_files`.
+    Raise GitError if the file does not exist at the revision.
+    """
+    if path not in files:
+        raise GitError(
+            auth_repo, message=f"fatal: Path '{path}' does not exist in '{auth_commit}'"
+        )
+    return json.loads(files[path][1])
 
 
 def _check_lengths_of_branches(targets_and_commits, branch_name):
@@ -212,15 +259,18 @@ def check_capstone(auth_repo, branch, role):
 
 
 def _compare_commit_with_targets_metadata(
-    tuf_repo, tuf_commit, target_repo, target_repo_commit
+    tuf_repo, tuf_commit, target_repo, target_repo_commit, files
 ):
     """
     Check if commit sha of a repository's speculative branch commit matches the
-    specified target value in its target file.
+    specified target value in its target file. `files` are the authentication
+    repository's files at `tuf_commit`, read using `get_files`.
     """
-    repo_name = f"{TARGETS_DIRECTORY_NAME}/{target_repo.name}"
+    repo_name = get_target_path(target_repo.name)
     try:
-        targets_head_sha = tuf_repo.get_json(tuf_commit, repo_name)["commit"]
+        targets_head_sha = _get_json_at_revision(
+            tuf_repo, files, tuf_commit, repo_name
+        )["commit"]
     except GitError:
         if target_repo_commit is not None:
             raise InvalidBranchError(